@@ -11,6 +11,7 @@ class NodeType(Enum):
     BlockStatement = "BlockStatement"
     ReturnStatement = "ReturnStatement"
     AssignStatement = "AssignStatement"
+    IndexAssignStatement = "IndexAssignStatement"
     IfStatement = "IfStatement"
     WhileStatement = "WhileStatement"
     BreakStatement = "BreakStatement"
@@ -23,6 +24,8 @@ class NodeType(Enum):
     CallExpression = "CallExpression"
     PrefixExpression = "PrefixExpression"
     PostfixExpression = "PostfixExpression"
+    CastExpression = "CastExpression"
+    IndexExpression = "IndexExpression"
     DotExpression = "DotExpression"
 
     # Literals
@@ -31,12 +34,18 @@ class NodeType(Enum):
     IdentifierLiteral = "IdentifierLiteral"
     BooleanLiteral = "BooleanLiteral"
     StringLiteral = "StringLiteral"
+    ArrayLiteral = "ArrayLiteral"
 
     # Helper
     FunctionParameter = "FunctionParameter"
 
 
 class Node(ABC):
+    # Nodes keep their fields in __slots__ (no per-instance __dict__) and expose their
+    # NodeType as the class level `kind` attribute, so dispatch doesn't need a method call
+    __slots__ = ()
+    kind: NodeType
+
     @abstractmethod
     def type(self) -> NodeType:
         """ Returns back the NodeType """
@@ -49,13 +58,16 @@ class Node(ABC):
 
 
 class Statement(Node):
-    pass
+    __slots__ = ()
 
 class Expression(Node):
-    pass
+    __slots__ = ()
 
 class Program(Node):
     """ The root node for the AST """
+    __slots__ = ("statements",)
+    kind = NodeType.Program
+
     def __init__(self) -> None:
         self.statements: list[Statement] = []
 
@@ -70,6 +82,9 @@ class Program(Node):
     
 # region Helpers
 class FunctionParameter(Expression):
+    __slots__ = ("name", "value_type")
+    kind = NodeType.FunctionParameter
+
     def __init__(self, name: str, value_type: str = None) -> None:
         self.name = name
         self.value_type = value_type
@@ -87,6 +102,9 @@ class FunctionParameter(Expression):
 
 # region Statements
 class ExpressionStatement(Statement):
+    __slots__ = ("expr",)
+    kind = NodeType.ExpressionStatement
+
     def __init__(self, expr: Expression = None) -> None:
         self.expr: Expression = expr
 
@@ -100,6 +118,9 @@ class ExpressionStatement(Statement):
         }
     
 class LetStatement(Statement):
+    __slots__ = ("name", "value", "value_type")
+    kind = NodeType.LetStatement
+
     def __init__(self, name: Expression = None, value: Expression = None, value_type: str = None) -> None:
         self.name = name
         self.value = value
@@ -117,6 +138,9 @@ class LetStatement(Statement):
         }
     
 class BlockStatement(Statement):
+    __slots__ = ("statements",)
+    kind = NodeType.BlockStatement
+
     def __init__(self, statements: list[Statement] = None) -> None:
         self.statements = statements if statements is not None else []
 
@@ -130,6 +154,9 @@ class BlockStatement(Statement):
         }
     
 class ReturnStatement(Statement):
+    __slots__ = ("return_value",)
+    kind = NodeType.ReturnStatement
+
     def __init__(self, return_value: Expression = None) -> None:
         self.return_value = return_value
 
@@ -143,6 +170,9 @@ class ReturnStatement(Statement):
         }
     
 class FunctionStatement(Statement):
+    __slots__ = ("parameters", "body", "name", "return_type")
+    kind = NodeType.FunctionStatement
+
     def __init__(self, parameters: list[FunctionParameter] = [], body: BlockStatement = None, name = None, return_type: str = None) -> None:
         self.parameters = parameters
         self.body = body
@@ -162,6 +192,9 @@ class FunctionStatement(Statement):
         }
     
 class AssignStatement(Statement):
+    __slots__ = ("ident", "operator", "right_value")
+    kind = NodeType.AssignStatement
+
     def __init__(self, ident: Expression = None, operator: str = None, right_value: Expression = None) -> None:
         self.ident = ident
         self.operator = operator
@@ -177,13 +210,40 @@ class AssignStatement(Statement):
             "operator": self.operator,
             "right_value": self.right_value.json()
         }
+
+class IndexAssignStatement(Statement):
+    """ Assignment to an array element, ex. `a[i] += 1;` """
+    __slots__ = ("target", "operator", "right_value")
+    kind = NodeType.IndexAssignStatement
+
+    def __init__(self, target: Expression = None, operator: str = None, right_value: Expression = None) -> None:
+        self.target = target
+        self.operator = operator
+        self.right_value = right_value
+
+    def type(self) -> NodeType:
+        return NodeType.IndexAssignStatement
+
+    def json(self) -> dict:
+        return {
+            "type": self.type().value,
+            "target": self.target.json(),
+            "operator": self.operator,
+            "right_value": self.right_value.json()
+        }
     
 class IfStatement(Statement):
-    def __init__(self, condition: Expression = None, consequence: BlockStatement = None, alternative: BlockStatement = None) -> None:
+    __slots__ = ("condition", "consequence", "alternative", "line_no")
+    kind = NodeType.IfStatement
+
+    def __init__(self, condition: Expression = None, consequence: BlockStatement = None, alternative: BlockStatement = None, line_no: int = 0) -> None:
         self.condition = condition
         self.consequence = consequence
         self.alternative = alternative
 
+        # Source line of the `if`, for instrumentation reports and profiles
+        self.line_no = line_no
+
     def type(self) -> NodeType:
         return NodeType.IfStatement
     
@@ -196,9 +256,13 @@ class IfStatement(Statement):
         }
     
 class WhileStatement(Statement):
-    def __init__(self, condition: Expression, body: BlockStatement = None) -> None:
+    __slots__ = ("condition", "body", "line_no")
+    kind = NodeType.WhileStatement
+
+    def __init__(self, condition: Expression, body: BlockStatement = None, line_no: int = 0) -> None:
         self.condition = condition
         self.body = body if body is not None else []
+        self.line_no = line_no
 
     def type(self) -> NodeType:
         return NodeType.WhileStatement
@@ -211,6 +275,9 @@ class WhileStatement(Statement):
         }
     
 class BreakStatement(Statement):
+    __slots__ = ()
+    kind = NodeType.BreakStatement
+
     def __init__(self) -> None:
         pass
 
@@ -223,6 +290,9 @@ class BreakStatement(Statement):
         }
     
 class ContinueStatement(Statement):
+    __slots__ = ()
+    kind = NodeType.ContinueStatement
+
     def __init__(self) -> None:
         pass
 
@@ -235,11 +305,15 @@ class ContinueStatement(Statement):
         }
     
 class ForStatement(Statement):
-    def __init__(self, var_declaration: LetStatement = None, condition: Expression = None, action: AssignStatement = None, body: BlockStatement = None) -> None:
+    __slots__ = ("var_declaration", "condition", "action", "body", "line_no")
+    kind = NodeType.ForStatement
+
+    def __init__(self, var_declaration: LetStatement = None, condition: Expression = None, action: AssignStatement = None, body: BlockStatement = None, line_no: int = 0) -> None:
         self.var_declaration = var_declaration
         self.condition = condition
         self.action = action
         self.body = body
+        self.line_no = line_no
 
     def type(self) -> NodeType:
         return NodeType.ForStatement
@@ -254,6 +328,9 @@ class ForStatement(Statement):
         }
     
 class ImportStatement(Statement):
+    __slots__ = ("file_path",)
+    kind = NodeType.ImportStatement
+
     def __init__(self, file_path: str) -> None:
         self.file_path = file_path
 
@@ -269,6 +346,9 @@ class ImportStatement(Statement):
     
 # region Expressions
 class InfixExpression(Expression):
+    __slots__ = ("left_node", "operator", "right_node")
+    kind = NodeType.InfixExpression
+
     def __init__(self, left_node: Expression, operator: str, right_node: Expression = None):
         self.left_node: Expression = left_node
         self.operator: str = operator
@@ -286,6 +366,9 @@ class InfixExpression(Expression):
         }
 
 class CallExpression(Expression):
+    __slots__ = ("function", "arguments")
+    kind = NodeType.CallExpression
+
     def __init__(self, function: Expression = None, arguments: list[Expression] = None) -> None:
         self.function = function # IdentifierLiteral
         self.arguments = arguments
@@ -301,6 +384,9 @@ class CallExpression(Expression):
         }
     
 class PrefixExpression(Expression):
+    __slots__ = ("operator", "right_node")
+    kind = NodeType.PrefixExpression
+
     def __init__(self, operator: str, right_node: Expression = None) -> None:
         self.operator = operator
         self.right_node = right_node
@@ -316,6 +402,9 @@ class PrefixExpression(Expression):
         }
     
 class PostfixExpression(Expression):
+    __slots__ = ("left_node", "operator")
+    kind = NodeType.PostfixExpression
+
     def __init__(self, left_node: Expression, operator: str) -> None:
         self.left_node = left_node
         self.operator = operator
@@ -330,6 +419,44 @@ class PostfixExpression(Expression):
             "operator": self.operator
         }
     
+class CastExpression(Expression):
+    """ Explicit conversion to a numeric type, ex. `i64(x)` """
+    __slots__ = ("value_type", "value")
+    kind = NodeType.CastExpression
+
+    def __init__(self, value_type: str, value: Expression = None) -> None:
+        self.value_type = value_type
+        self.value = value
+
+    def type(self) -> NodeType:
+        return NodeType.CastExpression
+
+    def json(self) -> dict:
+        return {
+            "type": self.type().value,
+            "value_type": self.value_type,
+            "value": self.value.json()
+        }
+
+class IndexExpression(Expression):
+    """ Element of an array or slice, ex. `a[i]` """
+    __slots__ = ("left_node", "index")
+    kind = NodeType.IndexExpression
+
+    def __init__(self, left_node: Expression, index: Expression = None) -> None:
+        self.left_node = left_node
+        self.index = index
+
+    def type(self) -> NodeType:
+        return NodeType.IndexExpression
+
+    def json(self) -> dict:
+        return {
+            "type": self.type().value,
+            "left_node": self.left_node.json(),
+            "index": self.index.json()
+        }
+
 # class DotExpression(Expression):
 #     def __init__(self, left_node: Expression, right_node: Expression) -> None:
 #         self.left_node = left_node
@@ -348,8 +475,14 @@ class PostfixExpression(Expression):
 
 # region Literals
 class IntegerLiteral(Expression):
-    def __init__(self, value: int = None) -> None:
+    __slots__ = ("value", "value_type")
+    kind = NodeType.IntegerLiteral
+
+    def __init__(self, value: int = None, value_type: str | None = None) -> None:
         self.value: int = value
+
+        # Type from a suffix (ex. `10i64`), unsuffixed literals (None) take the type their context needs
+        self.value_type: str | None = value_type
     
     def type(self) -> NodeType:
         return NodeType.IntegerLiteral
@@ -357,12 +490,19 @@ class IntegerLiteral(Expression):
     def json(self) -> dict:
         return {
             "type": self.type().value,
-            "value": self.value
+            "value": self.value,
+            "value_type": self.value_type
         }
     
 class FloatLiteral(Expression):
-    def __init__(self, value: float = None) -> None:
+    __slots__ = ("value", "value_type")
+    kind = NodeType.FloatLiteral
+
+    def __init__(self, value: float = None, value_type: str | None = None) -> None:
         self.value: float = value
+
+        # Type from a suffix (ex. `2.5f64`), unsuffixed literals (None) take the type their context needs
+        self.value_type: str | None = value_type
     
     def type(self) -> NodeType:
         return NodeType.FloatLiteral
@@ -370,12 +510,20 @@ class FloatLiteral(Expression):
     def json(self) -> dict:
         return {
             "type": self.type().value,
-            "value": self.value
+            "value": self.value,
+            "value_type": self.value_type
         }
     
 class IdentifierLiteral(Expression):
+    __slots__ = ("value", "depth", "index")
+    kind = NodeType.IdentifierLiteral
+
     def __init__(self, value: str = None) -> None:
         self.value: str = value
+
+        # Slot of the variable this name refers to, bound by the Resolver before codegen
+        self.depth: int | None = None
+        self.index: int | None = None
     
     def type(self) -> NodeType:
         return NodeType.IdentifierLiteral
@@ -387,6 +535,9 @@ class IdentifierLiteral(Expression):
         }
     
 class BooleanLiteral(Expression):
+    __slots__ = ("value",)
+    kind = NodeType.BooleanLiteral
+
     def __init__(self, value: bool = None) -> None:
         self.value: bool = value
     
@@ -400,6 +551,9 @@ class BooleanLiteral(Expression):
         }
     
 class StringLiteral(Expression):
+    __slots__ = ("value",)
+    kind = NodeType.StringLiteral
+
     def __init__(self, value: str = None) -> None:
         self.value: str = value
     
@@ -411,5 +565,24 @@ class StringLiteral(Expression):
             "type": self.type().value,
             "value": self.value
         }
+
+class ArrayLiteral(Expression):
+    """ `[1, 2, 3]`, or `[0; 1024]` which repeats one element """
+    __slots__ = ("elements", "repeat")
+    kind = NodeType.ArrayLiteral
+
+    def __init__(self, elements: list[Expression] = None, repeat: int | None = None) -> None:
+        self.elements: list[Expression] = elements if elements is not None else []
+        self.repeat: int | None = repeat
+
+    def type(self) -> NodeType:
+        return NodeType.ArrayLiteral
+
+    def json(self) -> dict:
+        return {
+            "type": self.type().value,
+            "elements": [e.json() for e in self.elements],
+            "repeat": self.repeat
+        }
 # endregion
 
@@ -0,0 +1,113 @@
+import AST
+from AST import Node, NodeType, Program
+from JITCache import hash_bytes, compiler_version_hash
+
+import marshal
+import os
+
+# Bump when the encoding itself changes (AST/Parser changes are covered by the compiler version hash)
+AST_FORMAT_VERSION: int = 1
+AST_MAGIC: bytes = b"LIMEAST" + bytes([AST_FORMAT_VERSION])
+
+# Every concrete node class, indexed by the position of its NodeType
+NODE_KINDS: list[NodeType] = list(NodeType)
+NODE_CLASSES: dict[NodeType, type] = {
+    cls.kind: cls for cls in vars(AST).values()
+    if isinstance(cls, type) and issubclass(cls, Node) and hasattr(cls, "kind")
+}
+NODE_FIELDS: list[tuple[type, tuple[str, ...]] | None] = [
+    (NODE_CLASSES[kind], NODE_CLASSES[kind].__slots__) if kind in NODE_CLASSES else None
+    for kind in NODE_KINDS
+]
+KIND_INDEX: dict[NodeType, int] = {kind: i for i, kind in enumerate(NODE_KINDS)}
+
+# region Encoding
+def encode(value):
+    """
+        Encodes an AST into plain marshal-able values:
+        nodes become tuples of (kind index, *slot values), lists stay lists and literals pass through.
+    """
+    if isinstance(value, Node):
+        return (KIND_INDEX[value.kind], *[encode(getattr(value, name, None)) for name in value.__slots__])
+    if isinstance(value, list):
+        return [encode(v) for v in value]
+
+    return value
+
+def decode(value):
+    """ Rebuilds AST nodes from the output of `encode` """
+    value_type: type = type(value)
+    if value_type is tuple:
+        return NODE_DECODERS[value[0]](value)
+    if value_type is list:
+        return [decode(v) for v in value]
+
+    return value
+
+def build_node_decoder(cls: type, fields: tuple[str, ...]):
+    """
+        Generates a straight-line decoder for one node class (like namedtuple does), it only
+        recurses into nested nodes/lists and skips the per-field setattr/zip work of a generic loop.
+    """
+    lines: list[str] = ["def decode_node(value):", "    node = new(cls)"]
+    for i, name in enumerate(fields, start=1):
+        lines.append(f"    field = value[{i}]")
+        lines.append(f"    node.{name} = decode(field) if type(field) in NESTED_TYPES else field")
+    lines.append("    return node")
+
+    namespace: dict = {"new": object.__new__, "cls": cls, "decode": decode, "NESTED_TYPES": (tuple, list)}
+    exec("\n".join(lines), namespace)
+
+    return namespace["decode_node"]
+
+NODE_DECODERS: list = [
+    build_node_decoder(*entry) if entry is not None else None
+    for entry in NODE_FIELDS
+]
+
+def serialize(program: Program) -> bytes:
+    return AST_MAGIC + marshal.dumps(encode(program))
+
+def deserialize(data: bytes) -> Program | None:
+    """ Returns the Program stored in data, or None if it was written by a different format version """
+    if not data.startswith(AST_MAGIC):
+        return None
+
+    return decode(marshal.loads(memoryview(data)[len(AST_MAGIC):]))
+# endregion
+
+
+class ASTCache:
+    """ On-disk cache of parsed pallets, keyed by the pallet's content hash """
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir: str = cache_dir
+        self.compiler_hash: str = compiler_version_hash()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __entry_path(self, source: str) -> str:
+        key: str = hash_bytes(f"{self.compiler_hash}|".encode("utf8") + source.encode("utf8"))
+        return os.path.join(self.cache_dir, f"{key}.ast")
+
+    def load(self, source: str) -> Program | None:
+        """ Returns the cached Program for this source, or None on a miss """
+        try:
+            with open(self.__entry_path(source), "rb") as f:
+                data: bytes = f.read()
+        except OSError:
+            return None
+
+        try:
+            return deserialize(data)
+        except (ValueError, EOFError, TypeError, IndexError):
+            # Corrupted entry, just parse again
+            return None
+
+    def store(self, source: str, program: Program) -> None:
+        entry_path: str = self.__entry_path(source)
+
+        # Write through a temp file so concurrent runs never read a half written entry
+        tmp_path: str = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(serialize(program))
+        os.replace(tmp_path, entry_path)
@@ -1,23 +1,146 @@
 from llvmlite import ir
 
-from AST import Node, NodeType, Program, Expression
-from AST import ExpressionStatement, LetStatement, FunctionStatement, ReturnStatement, BlockStatement, AssignStatement, IfStatement, WhileStatement, BreakStatement, ContinueStatement, ForStatement, ImportStatement
-from AST import InfixExpression, CallExpression, PrefixExpression, PostfixExpression
-from AST import IntegerLiteral, FloatLiteral, IdentifierLiteral, BooleanLiteral, StringLiteral
+from AST import Node, Program, Expression
+from AST import ExpressionStatement, LetStatement, FunctionStatement, ReturnStatement, BlockStatement, AssignStatement, IndexAssignStatement, IfStatement, WhileStatement, BreakStatement, ContinueStatement, ForStatement, ImportStatement
+from AST import InfixExpression, CallExpression, PrefixExpression, PostfixExpression, CastExpression, IndexExpression
+from AST import IntegerLiteral, FloatLiteral, IdentifierLiteral, BooleanLiteral, StringLiteral, ArrayLiteral
 from AST import FunctionParameter
 
 from Environment import Environment
+from Resolver import Resolver
+from ConstantFolder import ConstantFolder, ARITHMETIC_OPERATORS, unsuffixed_value
+from FunctionAttributes import FunctionAttributes
+from ASTCache import ASTCache
+from Profiler import Profiler
+from Instrumentation import Instrumentation
+from Types import UnsignedIntType, SliceType, NUMERIC_TYPES, literal_type, type_name, array_type_parts, vector_type_parts, is_int, is_float, is_numeric, is_unsigned, same_type, int_range, can_widen, common_type, convert
 
 from Lexer import Lexer
 from Parser import Parser
 
+from contextlib import AbstractContextManager, nullcontext
+from typing import Callable
 import os
 
+# region Operator Tables
+# Lowering for each (operand type class, operator): IRBuilder emitter and the resulting type (None: the operands' type)
+INFIX_OPERATIONS: dict[tuple[type, str], tuple[Callable, ir.Type | None]] = {
+    (ir.IntType, '+'): (ir.IRBuilder.add, None),
+    (ir.IntType, '-'): (ir.IRBuilder.sub, None),
+    (ir.IntType, '*'): (ir.IRBuilder.mul, None),
+    (ir.IntType, '/'): (ir.IRBuilder.sdiv, None),
+    (ir.IntType, '%'): (ir.IRBuilder.srem, None),
+    (ir.IntType, '<'): (lambda b, l, r: b.icmp_signed('<', l, r), ir.IntType(1)),
+    (ir.IntType, '<='): (lambda b, l, r: b.icmp_signed('<=', l, r), ir.IntType(1)),
+    (ir.IntType, '>'): (lambda b, l, r: b.icmp_signed('>', l, r), ir.IntType(1)),
+    (ir.IntType, '>='): (lambda b, l, r: b.icmp_signed('>=', l, r), ir.IntType(1)),
+    (ir.IntType, '=='): (lambda b, l, r: b.icmp_signed('==', l, r), ir.IntType(1)),
+
+    (UnsignedIntType, '/'): (ir.IRBuilder.udiv, None),
+    (UnsignedIntType, '%'): (ir.IRBuilder.urem, None),
+    (UnsignedIntType, '<'): (lambda b, l, r: b.icmp_unsigned('<', l, r), ir.IntType(1)),
+    (UnsignedIntType, '<='): (lambda b, l, r: b.icmp_unsigned('<=', l, r), ir.IntType(1)),
+    (UnsignedIntType, '>'): (lambda b, l, r: b.icmp_unsigned('>', l, r), ir.IntType(1)),
+    (UnsignedIntType, '>='): (lambda b, l, r: b.icmp_unsigned('>=', l, r), ir.IntType(1)),
+
+    (ir.FloatType, '+'): (ir.IRBuilder.fadd, None),
+    (ir.FloatType, '-'): (ir.IRBuilder.fsub, None),
+    (ir.FloatType, '*'): (ir.IRBuilder.fmul, None),
+    (ir.FloatType, '/'): (ir.IRBuilder.fdiv, None),
+    (ir.FloatType, '%'): (ir.IRBuilder.frem, None),
+    (ir.FloatType, '<'): (lambda b, l, r: b.fcmp_ordered('<', l, r), ir.IntType(1)),
+    (ir.FloatType, '<='): (lambda b, l, r: b.fcmp_ordered('<=', l, r), ir.IntType(1)),
+    (ir.FloatType, '>'): (lambda b, l, r: b.fcmp_ordered('>', l, r), ir.IntType(1)),
+    (ir.FloatType, '>='): (lambda b, l, r: b.fcmp_ordered('>=', l, r), ir.IntType(1)),
+    (ir.FloatType, '=='): (lambda b, l, r: b.fcmp_ordered('==', l, r), ir.IntType(1)),
+}
+
+PREFIX_OPERATIONS: dict[tuple[type, str], tuple[Callable, ir.Type | None]] = {
+    (ir.IntType, '-'): (lambda b, v: b.mul(v, ir.Constant(v.type, -1)), None),
+    (ir.IntType, '!'): (ir.IRBuilder.not_, None),
+
+    (ir.FloatType, '-'): (lambda b, v: b.fmul(v, ir.Constant(v.type, -1.0)), None),
+    (ir.FloatType, '!'): (lambda b, v: ir.Constant(ir.IntType(1), 0), None),
+}
+
+# Compound assignment operators lower to the matching infix operation
+ASSIGN_OPERATIONS: dict[tuple[type, str], Callable] = {
+    (ir.IntType, '+='): ir.IRBuilder.add,
+    (ir.IntType, '-='): ir.IRBuilder.sub,
+    (ir.IntType, '*='): ir.IRBuilder.mul,
+    (ir.IntType, '/='): ir.IRBuilder.sdiv,
+
+    (UnsignedIntType, '/='): ir.IRBuilder.udiv,
+
+    (ir.FloatType, '+='): ir.IRBuilder.fadd,
+    (ir.FloatType, '-='): ir.IRBuilder.fsub,
+    (ir.FloatType, '*='): ir.IRBuilder.fmul,
+    (ir.FloatType, '/='): ir.IRBuilder.fdiv,
+}
+
+# Unsigned ints only differ in division, remainder and the comparisons, doubles lower exactly like floats
+for table in (INFIX_OPERATIONS, PREFIX_OPERATIONS, ASSIGN_OPERATIONS):
+    for (cls, operator), operation in list(table.items()):
+        if cls is ir.IntType:
+            table.setdefault((UnsignedIntType, operator), operation)
+        elif cls is ir.FloatType:
+            table[(ir.DoubleType, operator)] = operation
+
+# Infix operators that work lane by lane on vectors (comparisons would give a vector of bools, Lime has no use for one)
+VECTOR_OPERATORS: frozenset[str] = frozenset(['+', '-', '*', '/', '%'])
+
+# Builtins that reduce every lane of a vector to one value -> the `llvm.vector.reduce.*` intrinsic for (int, unsigned, float) lanes
+VECTOR_REDUCTIONS: dict[str, tuple[str, str, str]] = {
+    'reduce_add': ('add', 'add', 'fadd'),
+    'reduce_mul': ('mul', 'mul', 'fmul'),
+    'reduce_min': ('smin', 'umin', 'fmin'),
+    'reduce_max': ('smax', 'umax', 'fmax'),
+}
+
+def operation_class(Type: ir.Type) -> type:
+    """ The key of a type in the operator tables, vectors use the instructions of their lanes """
+    return Type.element.__class__ if isinstance(Type, ir.VectorType) else Type.__class__
+# endregion
+
+# Largest `!prof` branch weight (weights are i32), profile counts get scaled down to fit
+MAX_BRANCH_WEIGHT: int = 0xFFFFFFFE
+
+# With `--pgo`, functions called at least this fraction as often as the most called function get `inlinehint`
+HOT_CALL_FRACTION: float = 0.1
+
+# Calls the Compiler lowers itself instead of calling a function
+BUILTIN_FUNCTIONS: frozenset[str] = frozenset(['printf', 'len', *VECTOR_REDUCTIONS])
+
+def assigned_slots(node: Node) -> set[tuple[int, int]]:
+    """ The (depth, index) slot of every variable written anywhere inside the node (assignments, `++` / `--`, lets) """
+    slots: set[tuple[int, int]] = set()
+
+    stack: list = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+        elif isinstance(current, Node):
+            ident: IdentifierLiteral | None = None
+            if current.__class__ is AssignStatement:
+                ident = current.ident
+            elif current.__class__ is PostfixExpression and current.left_node.__class__ is IdentifierLiteral:
+                # `a[i]++` writes an element, like `a[i] += 1` it leaves the variable's slot alone
+                ident = current.left_node
+            elif current.__class__ is LetStatement:
+                ident = current.name
+            if ident is not None:
+                slots.add((ident.depth, ident.index))
+
+            stack.extend(getattr(current, name, None) for name in current.__slots__)
+
+    return slots
+
 class Compiler:
-    def __init__(self, env: Environment | None = None) -> None:
+    def __init__(self, env: Environment | None = None, ast_cache: ASTCache | None = None, pallets: dict[str, Program] | None = None, module_name: str = 'main', inline_imports: bool = True, fold_constants: bool = True, fn_attrs: bool = True, bounds_checks: bool = True, profiler: Profiler | None = None, instrument: bool = False, profile: dict | None = None) -> None:
         self.type_map: dict[str, ir.Type] = {
-            'int': ir.IntType(32),
-            'float': ir.FloatType(),
+            # int, float, i8, i16, i64, u32, u64, f64
+            **NUMERIC_TYPES,
             'bool': ir.IntType(1),
 
             # Episode 11 NEW
@@ -26,7 +149,11 @@ class Compiler:
         }
 
         # Initialize the main module
-        self.module: ir.Module = ir.Module('main')
+        self.module: ir.Module = ir.Module(module_name)
+
+        # When False, import statements don't compile the pallet into this module (incremental builds
+        # compile each pallet into its own module and declare the imported functions instead)
+        self.inline_imports: bool = inline_imports
 
         # Current Builder
         self.builder: ir.IRBuilder = ir.IRBuilder()
@@ -37,6 +164,9 @@ class Compiler:
         # Environment reference for the currently compiling scope
         self.env: Environment = env if env is not None else Environment()
 
+        # Every open scope indexed by depth, resolved identifiers read `scopes[depth].slots[index]`
+        self.scopes: list[Environment] = [self.env]
+
         # Temporary keeping track of errors
         self.errors: list[str] = []
 
@@ -47,9 +177,107 @@ class Compiler:
         self.breakpoints: list[ir.Block] = []
         self.continues: list[ir.Block] = []
 
+        # Where a self tail call of the compiling function jumps to: (block after the parameter stores, parameter pointers)
+        self.tail_recursion: tuple[ir.Block, list[ir.AllocaInstr]] | None = None
+
         # Keeps a reference to parsed pallets
         self.global_parsed_pallets: dict[str, Program] = {}
 
+        # On-disk cache of parsed pallets (None disables it)
+        self.ast_cache: ASTCache | None = ast_cache
+
+        # Pallets already parsed ahead of codegen by the PalletLoader pre-pass, keyed by import path
+        self.pallets: dict[str, Program] = pallets if pallets is not None else {}
+
+        # Internal linkage + fastcc for every function but `main`, and the attribute inference pass after codegen
+        # (None disables it, kept around for its stats)
+        self.fn_attrs: bool = fn_attrs
+        self.function_attributes: FunctionAttributes | None = FunctionAttributes(self.module) if fn_attrs else None
+
+        # Array indexes get checked against the length (out of bounds traps), except where the index provably fits
+        self.bounds_checks: bool = bounds_checks
+
+        # Stats, checks emitted into the IR and checks left out because the index provably fits
+        self.bounds_check_stats: dict[str, int] = {'emitted': 0, 'elided': 0}
+
+        # Loop variable slot -> (lowest value, exclusive bound) inside the compiling `for` bodies.
+        # The bound is a constant or the slot of the slice whose `len` it is
+        self.index_ranges: dict[tuple[int, int], tuple[int, int | tuple[int, int]]] = {}
+
+        # The block failed bounds checks of each function branch to
+        self.trap_blocks: dict[ir.Function, ir.Block] = {}
+
+        # `--instrument` counters at every function entry, branch and loop (None disables them)
+        self.instrumentation: Instrumentation | None = Instrumentation(self.module) if instrument else None
+
+        # `--pgo`: counts an instrumented run recorded per site (None disables profile guided codegen), see Instrumentation
+        self.profile: dict[str, dict] | None = profile["sites"] if profile is not None else None
+
+        # Functions called at least this often are hot (a fraction of the most called one's calls)
+        self.hot_calls: int = max(
+            [1] + [int(site["counts"]["calls"] * HOT_CALL_FRACTION) for site in (self.profile or {}).values() if site["kind"] == 'function']
+        )
+
+        # Stats, branches that got `!prof` weights and functions marked hot / cold from the profile
+        self.pgo_stats: dict[str, int] = {'weighted': 0, 'hot': 0, 'cold': 0}
+
+        # Branches and loops seen so far in each function, they number the sites (`main/while0`, `main/while1`, ...)
+        self.site_ordinals: dict[tuple[str, str], int] = {}
+
+        # Import path of the pallet being compiled, None inside the entry file
+        self.pallet_path: str | None = None
+
+        # AST constant folding pass (None disables it), kept around for its stats
+        self.folder: ConstantFolder | None = ConstantFolder(load_pallet=self.__load_pallet) if fold_constants else None
+
+        # Visitor for every node class, looked up once per node instead of walking a `match` chain
+        self.visitors: dict[type, Callable[[Node], None]] = {
+            Program: self.__visit_program,
+
+            # Statements
+            ExpressionStatement: self.__visit_expression_statement,
+            LetStatement: self.__visit_let_statement,
+            FunctionStatement: self.__visit_function_statement,
+            BlockStatement: self.__visit_block_statement,
+            ReturnStatement: self.__visit_return_statement,
+            AssignStatement: self.__visit_assign_statement,
+            IndexAssignStatement: self.__visit_index_assign_statement,
+            IfStatement: self.__visit_if_statement,
+            WhileStatement: self.__visit_while_statement,
+            BreakStatement: self.__visit_break_statement,
+            ContinueStatement: self.__visit_continue_statement,
+            ForStatement: self.__visit_for_statement,
+            ImportStatement: self.__visit_import_statement,
+
+            # Expressions
+            InfixExpression: self.__visit_infix_expression,
+            CallExpression: self.__visit_call_expression,
+            PostfixExpression: self.__visit_postfix_expression,
+        }
+
+        # Resolver for every node class that produces a value
+        self.resolvers: dict[type, Callable[[Expression], tuple[ir.Value, ir.Type]]] = {
+            # Literals
+            IntegerLiteral: self.__resolve_integer_literal,
+            FloatLiteral: self.__resolve_float_literal,
+            IdentifierLiteral: self.__resolve_identifier_literal,
+            BooleanLiteral: self.__resolve_boolean_literal,
+            StringLiteral: self.__resolve_string_literal,
+
+            # Expression Values
+            InfixExpression: self.__visit_infix_expression,
+            CallExpression: self.__visit_call_expression,
+            PrefixExpression: self.__visit_prefix_expression,
+            CastExpression: self.__visit_cast_expression,
+            IndexExpression: self.__visit_index_expression,
+            ArrayLiteral: self.__visit_array_literal,
+        }
+
+        # `--profile` spans for the compile phases, every function and every pallet (None disables them)
+        self.profiler: Profiler | None = profiler
+        if self.profiler is not None:
+            self.__profile_visitors()
+
     def __initialize_builtins(self) -> None:
         def __init_print() -> ir.Function:
             fnty: ir.FunctionType = ir.FunctionType(
@@ -62,13 +290,16 @@ class Compiler:
         def __init_booleans() -> tuple[ir.GlobalVariable, ir.GlobalVariable]:
             bool_type: ir.Type = self.type_map['bool']
 
+            # Internal so every pallet module can carry its own copy and still link together
             true_var = ir.GlobalVariable(self.module, bool_type, 'true')
             true_var.initializer = ir.Constant(bool_type, 1)
             true_var.global_constant = True
+            true_var.linkage = 'internal'
 
             false_var = ir.GlobalVariable(self.module, bool_type, 'false')
             false_var.initializer = ir.Constant(bool_type, 0)
             false_var.global_constant = True
+            false_var.linkage = 'internal'
 
             return true_var, false_var
         
@@ -87,6 +318,11 @@ class Compiler:
         #     self.env.define('strcpy', strcpy_func, ir.IntType(8).as_pointer())
         
         self.env.define('printf', __init_print(), ir.IntType(32))
+
+        # Lowered inline (see __builtin_len and __builtin_reduce), the names only have to resolve
+        self.env.define('len', None, ir.IntType(32))
+        for name in VECTOR_REDUCTIONS:
+            self.env.define(name, None, None)
         
         true_var, false_var = __init_booleans()
         self.env.define('true', true_var, true_var.type)
@@ -94,55 +330,198 @@ class Compiler:
 
         # __init_c_std_library()
 
+    def declare_function(self, name: str, param_types: list[str], return_type: str) -> ir.Function:
+        """ Declares a function defined in another module (ex. an imported pallet) so calls to it can be compiled """
+        fnty: ir.FunctionType = ir.FunctionType(self.__resolve_type(return_type), [self.__resolve_type(t) for t in param_types])
+        func: ir.Function = ir.Function(self.module, fnty, name=name)
+        if self.fn_attrs and name != 'main':
+            # Has to match the calling convention the defining module compiled it with
+            func.calling_convention = 'fastcc'
+
+        self.env.define(name, func, fnty.return_type)
+        return func
+
+    def declare_global(self, name: str, value_type: str) -> ir.GlobalVariable:
+        """ Declares a global variable defined in another module (ex. an imported pallet) so it can be used """
+        Type: ir.Type = self.__resolve_type(value_type)
+        global_var: ir.GlobalVariable = ir.GlobalVariable(self.module, Type, name=name)
+
+        self.env.define(name, global_var, Type)
+        return global_var
+
+    def __resolve_type(self, name: str) -> ir.Type | None:
+        """ The IR type of a type name, array (`[int; 4]`), slice (`[int]`) and vector (`vec4<float>`) types get built on first use """
+        Type: ir.Type | None = self.type_map.get(name)
+        if Type is not None:
+            return Type
+
+        vector: tuple[str, int] | None = vector_type_parts(name)
+        if vector is not None:
+            lane_name, count = vector
+            lane: ir.Type | None = self.__resolve_type(lane_name)
+            if lane is None:
+                return None
+            if not is_numeric(lane):
+                self.errors.append(f"COMPILE ERROR: `{name}` isn't a type, vector lanes are numbers (ex. `vec4<float>`)")
+                return None
+
+            Type = ir.VectorType(lane, count)
+            self.type_map[name] = Type
+            return Type
+
+        parts: tuple[str, int | None] | None = array_type_parts(name)
+        if parts is None:
+            self.errors.append(f"COMPILE ERROR: `{name}` isn't a type")
+            return None
+
+        element_name, length = parts
+        element: ir.Type | None = self.__resolve_type(element_name)
+        if element is None:
+            return None
+        if isinstance(element, (ir.VoidType, SliceType)):
+            self.errors.append(f"COMPILE ERROR: `{name}` isn't a type, arrays hold values (not `void` or slices)")
+            return None
+
+        Type = SliceType(element) if length is None else ir.ArrayType(element, length)
+        self.type_map[name] = Type
+        return Type
+
+    def __push_scope(self) -> Environment:
+        self.env = Environment(parent=self.env)
+        self.scopes.append(self.env)
+        return self.env
+
+    def __pop_scope(self) -> None:
+        self.scopes.pop()
+        self.env = self.scopes[-1]
+
+    def __slot(self, ident: IdentifierLiteral) -> tuple[ir.Value, ir.Type]:
+        """ The (value, type) record the Resolver bound this identifier to """
+        return self.scopes[ident.depth].slots[ident.index]
+
+    def __span(self, name: str) -> AbstractContextManager:
+        """ A profiler span around a compile phase, does nothing when not profiling """
+        return self.profiler.span(name) if self.profiler is not None else nullcontext()
+
+    def __profile_visitors(self) -> None:
+        """ Wraps the function and import visitors in spans, so compiles that aren't profiled keep calling them directly """
+        visit_function: Callable[[FunctionStatement], None] = self.visitors[FunctionStatement]
+        visit_import: Callable[[ImportStatement], None] = self.visitors[ImportStatement]
+
+        def profiled_function(node: FunctionStatement) -> None:
+            with self.profiler.span(node.name.value, "function"):
+                visit_function(node)
+
+        def profiled_import(node: ImportStatement) -> None:
+            with self.profiler.span(node.file_path, "pallet"):
+                visit_import(node)
+
+        self.visitors[FunctionStatement] = profiled_function
+        self.visitors[ImportStatement] = profiled_import
+
+    def __site(self, kind: str, line_no: int) -> str | None:
+        """
+            The key of a branch or loop in the compiling function (declared as an instrumentation site when instrumenting),
+            None when neither instrumenting nor using a profile. Instrumented and profile guided compiles number them the same.
+        """
+        if self.instrumentation is None and self.profile is None:
+            return None
+
+        function: str = self.builder.function.name
+        ordinal: int = self.site_ordinals.get((function, kind), 0)
+        self.site_ordinals[(function, kind)] = ordinal + 1
+
+        key: str = f"{function}/{kind}{ordinal}"
+        if self.instrumentation is not None:
+            location: str = f"{self.pallet_path}:{line_no}" if self.pallet_path is not None else f"line {line_no}"
+            self.instrumentation.site(key, kind, function, location)
+
+        return key
+
+    def __count(self, key: str | None, counter: str, condition: ir.Value | None = None) -> None:
+        if key is not None and self.instrumentation is not None:
+            self.instrumentation.count(self.builder, key, counter, condition)
+
+    def __site_counts(self, key: str | None, kind: str) -> dict[str, int] | None:
+        """ The recorded counts of a site, None without a profile or when the profile doesn't line up with the source anymore """
+        if key is None or self.profile is None:
+            return None
+
+        site: dict | None = self.profile.get(key)
+        if site is None or site["kind"] != kind:
+            return None
+        return site["counts"]
+
+    def __weigh(self, branch: ir.Instruction, taken: int, not_taken: int) -> None:
+        """ `!prof` branch weights, scaled to fit an i32 and +1 (like clang) so a side the run never took isn't impossible """
+        scale: int = max(1, -(-max(taken, not_taken) // MAX_BRANCH_WEIGHT))
+        branch.set_weights([max(taken, 0) // scale + 1, max(not_taken, 0) // scale + 1])
+        self.pgo_stats['weighted'] += 1
+
+    def __apply_function_profile(self, func: ir.Function) -> None:
+        """ Entry count metadata, `cold` on functions the run never called and `inlinehint` on the hot ones """
+        counts: dict[str, int] | None = self.__site_counts(func.name, 'function')
+        if counts is None:
+            return
+
+        calls: int = counts["calls"]
+        func.set_metadata('prof', self.module.add_metadata([ir.MetaDataString(self.module, "function_entry_count"), ir.Constant(ir.IntType(64), calls)]))
+        if func.name == 'main':
+            return
+
+        if calls == 0:
+            func.attributes.add('cold')
+            self.pgo_stats['cold'] += 1
+        elif calls >= self.hot_calls:
+            # llvmlite doesn't know LLVM's `hot` attribute, what it changes for the inliner `inlinehint` does too
+            func.attributes.add('inlinehint')
+            self.pgo_stats['hot'] += 1
+
     def __increment_counter(self) -> int:
         self.counter += 1
         return self.counter
 
-    def compile(self, node: Node) -> None:
-        """ Main Recursive loop for compiling the AST """
-        match node.type():
-            case NodeType.Program:
-                self.__visit_program(node)
+    def __alloca(self, typ: ir.Type, name: str = '') -> ir.AllocaInstr:
+        """ Allocates stack space in the entry block of the current function so loops don't grow the stack """
+        current_block: ir.Block = self.builder.block
 
-            # Statements
-            case NodeType.ExpressionStatement:
-                self.__visit_expression_statement(node)
-            case NodeType.LetStatement:
-                self.__visit_let_statement(node)
-            case NodeType.FunctionStatement:
-                self.__visit_function_statement(node)
-            case NodeType.BlockStatement:
-                self.__visit_block_statement(node)
-            case NodeType.ReturnStatement:
-                self.__visit_return_statement(node)
-            case NodeType.AssignStatement:
-                self.__visit_assign_statement(node)
-            case NodeType.IfStatement:
-                self.__visit_if_statement(node)
-            case NodeType.WhileStatement:
-                self.__visit_while_statement(node)
-            case NodeType.BreakStatement:
-                self.__visit_break_statement(node)
-            case NodeType.ContinueStatement:
-                self.__visit_continue_statement(node)
-            case NodeType.ForStatement:
-                self.__visit_for_statement(node)
-            case NodeType.ImportStatement:
-                self.__visit_import_statement(node)
+        self.builder.position_at_start(self.builder.function.entry_basic_block)
+        ptr: ir.AllocaInstr = self.builder.alloca(typ, name=name)
 
-            # Expressions
-            case NodeType.InfixExpression:
-                self.__visit_infix_expression(node)
-            case NodeType.CallExpression:
-                self.__visit_call_expression(node)
-            case NodeType.PostfixExpression:
-                self.__visit_postfix_expression(node)
+        # The builder only ever appends, so we can safely return to the end of the block we were compiling
+        self.builder.position_at_end(current_block)
+
+        return ptr
+
+    def compile(self, node: Node) -> None:
+        """ Main Recursive loop for compiling the AST """
+        visitor: Callable[[Node], None] | None = self.visitors.get(node.__class__)
+        if visitor is not None:
+            visitor(node)
 
     # region Visit Methods
     def __visit_program(self, node: Program) -> None:
+        # Folding runs first, pruned branches may take `let` statements (and their slots) with them
+        if self.folder is not None:
+            with self.__span("Constant folding"):
+                self.folder.fold(node)
+
+        # Bind every identifier (pallets included) to its slot and report every undeclared name before emitting IR
+        with self.__span("Resolved"):
+            resolver: Resolver = Resolver(global_names=list(self.env.records), load_pallet=self.__load_pallet)
+            resolver.resolve(node)
+        if len(resolver.errors) > 0:
+            self.errors.extend(resolver.errors)
+            return
+
         # Compile the body
-        for stmt in node.statements:
-            self.compile(stmt)
+        with self.__span("Generated IR"):
+            for stmt in node.statements:
+                self.compile(stmt)
+
+        if self.function_attributes is not None and len(self.errors) == 0:
+            with self.__span("Inferred function attributes"):
+                self.function_attributes.infer()
 
     # region Statements
     def __visit_expression_statement(self, node: ExpressionStatement) -> None:
@@ -153,28 +532,81 @@ class Compiler:
         value: Expression = node.value
         value_type: str  = node.value_type # TODO: We'll use this more for type checking and other types like int64 later on
 
-        value, Type = self.__resolve_value(node=value)
+        if self.builder.block is None:
+            # Top level, outside of any function
+            self.__define_global(node)
+            return
+
+        scope: Environment = self.scopes[node.name.depth]
+        if node.name.index == len(scope.slots):
+            Type: ir.Type | None = self.__resolve_type(value_type)
+            if isinstance(Type, ir.ArrayType):
+                ptr = self.__alloca(Type, name=name)
+                self.__store_array(value, ptr, Type, f"`let {name}`")
+                scope.define(name, ptr, Type)
+                return
+
+            value, Type = self.__resolve_as(value, Type, f"`let {name}`")
 
-        if self.env.lookup(name) is None:
             # Define and allocate the variable
-            ptr = self.builder.alloca(Type)
+            ptr = self.__alloca(Type, name=name)
 
             # Storing the value to the pointer
             self.builder.store(value, ptr)
 
-            # Add the variable to the environment
-            self.env.define(name, ptr, Type)
+            # Add the variable to the environment (this is the slot the Resolver handed out)
+            scope.define(name, ptr, Type)
         else:
-            ptr, _ = self.env.lookup(name)
+            ptr, Type = scope.slots[node.name.index]
+            if isinstance(Type, ir.ArrayType):
+                self.__store_array(value, ptr, Type, f"`let {name}`")
+                return
+
+            value, _ = self.__resolve_as(value, Type, f"`let {name}`")
             self.builder.store(value, ptr)
 
+    def __define_global(self, node: LetStatement) -> None:
+        """ Top level `let`, a global variable initialized with a constant (ex. `let table: [int; 256] = [0; 256];`) """
+        name: str = node.name.value
+        context: str = f"`let {name}`"
+
+        scope: Environment = self.scopes[0]
+        if node.name.index != len(scope.slots):
+            self.errors.append(f"COMPILE ERROR: Global {context} is already defined")
+            return
+
+        Type: ir.Type | None = self.__resolve_type(node.value_type)
+        if Type is None or isinstance(Type, (ir.VoidType, SliceType)):
+            self.errors.append(f"COMPILE ERROR: Global {context} can't be a `{node.value_type}`")
+            Type = self.type_map['int']
+
+        global_var: ir.GlobalVariable = ir.GlobalVariable(self.module, Type, name=name)
+        if self.inline_imports:
+            # Only modules that get linked with others have to share their globals
+            global_var.linkage = 'internal'
+
+        if self.__is_constant_expression(node.value):
+            global_var.initializer, _ = self.__resolve_as(node.value, Type, context)
+        else:
+            self.errors.append(f"COMPILE ERROR: Global {context} needs a constant value (literals, or arrays of them)")
+            global_var.initializer = ir.Constant(Type, None)
+
+        scope.define(name, global_var, Type)
+
     def __visit_block_statement(self, node: BlockStatement) -> None:
         for stmt in node.statements:
             self.compile(stmt)
     
     def __visit_return_statement(self, node: ReturnStatement) -> None:
         value: Expression = node.return_value
-        value, Type = self.__resolve_value(value)
+
+        if isinstance(value, CallExpression) and value.function.value not in BUILTIN_FUNCTIONS:
+            func, ret_type = self.__slot(value.function)
+            if not isinstance(ret_type, ir.PointerType):
+                self.__visit_tail_call(value, func, ret_type)
+                return
+
+        value, Type = self.__resolve_as(value, self.builder.function.function_type.return_type, "`return`")
 
         if isinstance(Type, ir.PointerType):
             ptr_to_array = self.builder.gep(value, [ir.IntType(32)(0), ir.IntType(32)(0)])
@@ -190,13 +622,26 @@ class Compiler:
         # Keep track of the names of each parameter
         param_names: list[str] = [p.name for p in params]
 
-        # Keep track of the types for each parameter
-        param_types: list[ir.Type] = [self.type_map[p.value_type] for p in params]
+        # Keep track of the types for each parameter (unknown types were reported, int keeps the compile going)
+        param_types: list[ir.Type] = [self.__resolve_type(p.value_type) or self.type_map['int'] for p in params]
 
-        return_type: ir.Type = self.type_map[node.return_type]
+        return_type: ir.Type = self.__resolve_type(node.return_type) or self.type_map['int']
+        if isinstance(return_type, (ir.ArrayType, SliceType)):
+            # A slice would point into the returning function's stack
+            self.errors.append(f"COMPILE ERROR: `{name}` can't return `{node.return_type}`, pass a slice for it to fill instead")
+            return_type = self.type_map['int']
 
         fnty: ir.FunctionType = ir.FunctionType(return_type, param_types)
         func: ir.Function = ir.Function(self.module, fnty, name=name)
+        if self.fn_attrs and name != 'main':
+            # Only `main` is called from outside of Lime code
+            func.calling_convention = 'fastcc'
+            if self.inline_imports:
+                # This module is the whole program, modules that get linked with others keep their functions
+                # external until after linking (see IncrementalBuilder)
+                func.linkage = 'internal'
+
+        self.__apply_function_profile(func)
 
         block: ir.Block = func.append_basic_block(f'{name}_entry')
 
@@ -207,13 +652,25 @@ class Compiler:
         # Storing the pointers to each parameter
         params_ptr = []
         for i, typ in enumerate(param_types):
-            ptr = self.builder.alloca(typ)
+            ptr = self.__alloca(typ, name=param_names[i])
             self.builder.store(func.args[i], ptr)
             params_ptr.append(ptr)
 
+        if self.instrumentation is not None:
+            # Counted before the jump to the body, self tail calls looping back aren't new calls
+            self.instrumentation.site(name, 'function', name, self.pallet_path or '')
+            self.__count(name, 'calls')
+
+        # Self tail calls store the new arguments and jump back here instead of recursing
+        body_block: ir.Block = func.append_basic_block(f'{name}_body')
+        self.builder.branch(body_block)
+        self.builder.position_at_end(body_block)
+
+        previous_tail_recursion = self.tail_recursion
+        self.tail_recursion = (body_block, params_ptr)
+
         # Adding the parameters to the environment
-        previous_env = self.env
-        self.env = Environment(parent=previous_env)
+        self.__push_scope()
         for i, x in enumerate(zip(param_types, param_names)):
             typ = param_types[i]
             ptr = params_ptr[i]
@@ -228,61 +685,97 @@ class Compiler:
         if node.return_type == "void":
             self.builder.ret_void()
 
-        self.env = previous_env
+        self.__pop_scope()
         self.env.define(name, func, return_type)
 
         self.builder = previous_builder
+        self.tail_recursion = previous_tail_recursion
+
+    def __visit_tail_call(self, node: CallExpression, func: ir.Function, ret_type: ir.Type) -> None:
+        """
+            `return f(...)`. Self recursion becomes a loop (no frames, at every optimization level), any other call
+            is marked `musttail` when the prototypes match so the backend has to reuse the frame, `tail` otherwise.
+        """
+        args: list[ir.Value] = self.__resolve_arguments(node.arguments, func)
+        caller: ir.Function = self.builder.function
+
+        if func is caller and self.tail_recursion is not None and len(args) == len(self.tail_recursion[1]):
+            body_block, params_ptr = self.tail_recursion
+
+            # Every argument was evaluated above, before any parameter gets overwritten
+            for arg, ptr in zip(args, params_ptr):
+                self.builder.store(arg, ptr)
+            self.builder.branch(body_block)
+            return
+
+        # Both markers promise the callee won't touch the caller's stack, so pointers and slices (which may point into it) opt out
+        tail: str | bool = False
+        if not any(isinstance(arg.type, (ir.PointerType, SliceType)) for arg in args):
+            same_prototype: bool = func.function_type == caller.function_type and func.calling_convention == caller.calling_convention
+            tail = 'musttail' if same_prototype else 'tail'
+
+        ret: ir.Instruction = self.builder.call(func, args, tail=tail)
+        if isinstance(ret_type, ir.VoidType):
+            self.builder.ret_void()
+        else:
+            self.builder.ret(self.__widen(ret, ret_type, caller.function_type.return_type, "`return`"))
 
     def __visit_assign_statement(self, node: AssignStatement) -> None:
         name: str = node.ident.value
         operator: str = node.operator
         right_value: Expression = node.right_value
 
-        if self.env.lookup(name) is None:
-            self.errors.append(f"COMPILE ERROR: Identifier {name} has not been declared before it was re-assigned.")
+        var_ptr, var_type = self.__slot(node.ident)
+
+        if isinstance(var_type, ir.ArrayType) and operator == '=':
+            self.__store_array(right_value, var_ptr, var_type, f"`{name} {operator}`")
             return
-        
-        right_value, right_type = self.__resolve_value(right_value)
-        
-        var_ptr, _ = self.env.lookup(name)
-        orig_value = self.builder.load(var_ptr)
-        
-        if isinstance(orig_value.type, ir.IntType) and isinstance(right_type, ir.FloatType):
-            orig_value = self.builder.sitofp(orig_value, ir.FloatType())
-        if isinstance(orig_value.type, ir.FloatType) and isinstance(right_type, ir.IntType):
-            right_value = self.builder.sitofp(right_value, ir.FloatType())
 
-        value = None
-        Type = None
-        match operator:
-            case '=':
-                value = right_value
-            case '+=':
-                if isinstance(orig_value.type, ir.IntType) and isinstance(right_type, ir.IntType):
-                    value = self.builder.add(orig_value, right_value)
-                else:
-                    value = self.builder.fadd(orig_value, right_value)
-            case '-=':
-                if isinstance(orig_value.type, ir.IntType) and isinstance(right_type, ir.IntType):
-                    value = self.builder.sub(orig_value, right_value)
-                else:
-                    value = self.builder.fsub(orig_value, right_value)
-            case '*=':
-                if isinstance(orig_value.type, ir.IntType) and isinstance(right_type, ir.IntType):
-                    value = self.builder.mul(orig_value, right_value)
-                else:
-                    value = self.builder.fmul(orig_value, right_value)
-            case '/=':
-                if isinstance(orig_value.type, ir.IntType) and isinstance(right_type, ir.IntType):
-                    value = self.builder.sdiv(orig_value, right_value)
-                else:
-                    value = self.builder.fdiv(orig_value, right_value)
-            case '_':
-                print("Unsupported Assignment Operator")
+        # The result is stored back into the variable, so the right side has to fit its type
+        right_value, right_type = self.__resolve_as(right_value, var_type, f"`{name} {operator}`")
 
-    
-        ptr, _ = self.env.lookup(name)
-        self.builder.store(value, ptr)
+        if operator == '=':
+            value = right_value
+        else:
+            orig_value = self.builder.load(var_ptr)
+            emit: Callable | None = ASSIGN_OPERATIONS.get((operation_class(var_type), operator))
+            if emit is None:
+                self.errors.append(f"COMPILE ERROR: Unsupported assignment operator `{operator}` for {name}")
+                return
+
+            value = emit(self.builder, orig_value, right_value)
+
+        self.builder.store(value, var_ptr)
+
+    def __visit_index_assign_statement(self, node: IndexAssignStatement) -> None:
+        operator: str = node.operator
+
+        if isinstance(self.__place_type(node.target.left_node), ir.VectorType):
+            self.__assign_vector_lane(node)
+            return
+
+        element_ptr, element_type = self.__index_pointer(node.target)
+        if element_ptr is None:
+            return
+
+        if isinstance(element_type, ir.ArrayType) and operator == '=':
+            self.__store_array(node.right_value, element_ptr, element_type, f"`[...] {operator}`")
+            return
+
+        right_value, _ = self.__resolve_as(node.right_value, element_type, f"`[...] {operator}`")
+
+        if operator == '=':
+            value = right_value
+        else:
+            orig_value = self.builder.load(element_ptr)
+            emit: Callable | None = ASSIGN_OPERATIONS.get((operation_class(element_type), operator))
+            if emit is None:
+                self.errors.append(f"COMPILE ERROR: Unsupported assignment operator `{operator}` for {type_name(element_type)} elements")
+                return
+
+            value = emit(self.builder, orig_value, right_value)
+
+        self.builder.store(value, element_ptr)
 
     def __visit_if_statement(self, node: IfStatement) -> None:
         condition = node.condition
@@ -291,6 +784,13 @@ class Compiler:
 
         test, Type = self.__resolve_value(condition)
 
+        site: str | None = self.__site('if', node.line_no)
+        self.__count(site, 'evaluated')
+        self.__count(site, 'taken', test)
+
+        # The block `if_then` / `if_else` put the branch at the end of
+        header: ir.Block = self.builder.block
+
         # If there is no else block
         if alternative is None:
             with self.builder.if_then(test):
@@ -310,12 +810,20 @@ class Compiler:
                 with otherwise:
                     self.compile(alternative)
 
+        counts: dict[str, int] | None = self.__site_counts(site, 'if')
+        if counts is not None:
+            self.__weigh(header.terminator, counts['taken'], counts['evaluated'] - counts['taken'])
+
     def __visit_while_statement(self, node: WhileStatement) -> None:
         condition: Expression = node.condition
         body: BlockStatement = node.body
 
         test, _ = self.__resolve_value(condition)
 
+        site: str | None = self.__site('while', node.line_no)
+        self.__count(site, 'reached')
+        self.__count(site, 'entered', test)
+
         # Entry block that runs if the condition is true
         while_loop_entry = self.builder.append_basic_block(f"while_loop_entry_{self.__increment_counter()}")
 
@@ -333,7 +841,7 @@ class Compiler:
         #       /   \
         #      /     \
         # true block  false block
-        self.builder.cbranch(test, while_loop_entry, while_loop_otherwise)
+        guard: ir.Instruction = self.builder.cbranch(test, while_loop_entry, while_loop_otherwise)
 
         # Setting the builder position-at-start
         self.builder.position_at_start(while_loop_entry)
@@ -342,13 +850,25 @@ class Compiler:
         self.compile(body)
 
         test, _ = self.__resolve_value(condition)
+        self.__count(site, 'backedges', test)
 
-        self.builder.cbranch(test, while_loop_entry, while_loop_otherwise)
+        latch: ir.Instruction = self.builder.cbranch(test, while_loop_entry, while_loop_otherwise)
+        self.__weigh_loop(site, 'while', guard, latch)
         self.builder.position_at_start(while_loop_otherwise)
 
         self.breakpoints.pop()
         self.continues.pop()
 
+    def __weigh_loop(self, site: str | None, kind: str, guard: ir.Instruction, latch: ir.Instruction) -> None:
+        """ Weighs the condition before the first iteration (entered or skipped) and at the end of every iteration (loop back or exit) """
+        counts: dict[str, int] | None = self.__site_counts(site, kind)
+        if counts is None:
+            return
+
+        self.__weigh(guard, counts['entered'], counts['reached'] - counts['entered'])
+        # Every entered loop leaves once, through the condition unless it broke out
+        self.__weigh(latch, counts['backedges'], counts['entered'])
+
     def __visit_break_statement(self, node: BreakStatement) -> None:
         self.builder.branch(self.breakpoints[-1])
 
@@ -362,8 +882,7 @@ class Compiler:
         body: BlockStatement = node.body
 
         # Creating a new environment specifically for the for statement
-        previous_env = self.env
-        self.env = Environment(parent=previous_env)
+        self.__push_scope()
 
         # Compile the let statement
         self.compile(var_declaration)
@@ -374,125 +893,148 @@ class Compiler:
         self.breakpoints.append(for_loop_otherwise)
         self.continues.append(for_loop_entry)
 
-        self.builder.branch(for_loop_entry)
+        # The body only ever runs while the condition holds, the first time included
+        test, _ = self.__resolve_value(condition)
+
+        site: str | None = self.__site('for', node.line_no)
+        self.__count(site, 'reached')
+        self.__count(site, 'entered', test)
+
+        guard: ir.Instruction = self.builder.cbranch(test, for_loop_entry, for_loop_otherwise)
         self.builder.position_at_start(for_loop_entry)
 
+        induction: tuple[tuple[int, int], tuple[int, int | tuple[int, int]]] | None = self.__induction_range(node)
+        if induction is not None:
+            self.index_ranges[induction[0]] = induction[1]
+
         self.compile(body)
 
+        if induction is not None:
+            del self.index_ranges[induction[0]]
+
         self.compile(action)
 
         test, _ = self.__resolve_value(condition)
+        self.__count(site, 'backedges', test)
 
-        self.builder.cbranch(test, for_loop_entry, for_loop_otherwise)
+        latch: ir.Instruction = self.builder.cbranch(test, for_loop_entry, for_loop_otherwise)
+        self.__weigh_loop(site, 'for', guard, latch)
 
         self.builder.position_at_start(for_loop_otherwise)
 
         self.breakpoints.pop()
         self.continues.pop()
 
+        self.__pop_scope()
+
     def __visit_import_statement(self, node: ImportStatement) -> None:
         file_path: str = node.file_path
 
+        if not self.inline_imports:
+            return
+
         if self.global_parsed_pallets.get(file_path) is not None:
             print(f"[Lime Warning]: `{file_path}` is already imported globally\n")
             return
 
+        # Already loaded (and resolved) by the Resolver, the pallet compiles straight into this scope
+        program: Program = self.__load_pallet(file_path)
+
+        previous_pallet_path: str | None = self.pallet_path
+        self.pallet_path = file_path
+        for stmt in program.statements:
+            self.compile(stmt)
+        self.pallet_path = previous_pallet_path
+
+        self.global_parsed_pallets[file_path] = program
+
+    def __load_pallet(self, file_path: str) -> Program | None:
+        """ Returns the parsed pallet (pre-parsed, from the AST cache or parsed now), None if imports aren't inlined """
+        if not self.inline_imports:
+            return None
+
+        program: Program | None = self.pallets.get(file_path)
+        if program is not None:
+            return program
+
         with open(os.path.abspath(f"{file_path}"), "r") as f:
             pallet_code: str = f.read()
 
-        l: Lexer = Lexer(source=pallet_code)
-        p: Parser = Parser(lexer=l)
+        # Unchanged pallets load their AST from the cache without touching the Lexer or Parser
+        program = self.ast_cache.load(pallet_code) if self.ast_cache is not None else None
+        if program is None:
+            l: Lexer = Lexer(source=pallet_code)
+            p: Parser = Parser(lexer=l)
 
-        program: Program = p.parse_program()
-        if len(p.errors) > 0:
-            print(f"Error with imported pallet: {file_path}")
-            for err in p.errors:
-                print(err)
-            exit(1)
+            program = p.parse_program()
+            if len(p.errors) > 0:
+                print(f"Error with imported pallet: {file_path}")
+                for err in p.errors:
+                    print(err)
+                exit(1)
 
-        self.compile(node=program)
+            if self.ast_cache is not None:
+                self.ast_cache.store(pallet_code, program)
 
-        self.global_parsed_pallets[file_path] = program
+        self.pallets[file_path] = program
+        return program
     # endregion
         
     # region Expressions
     def __visit_infix_expression(self, node: InfixExpression) -> None:
         operator: str = node.operator
-        left_value, left_type = self.__resolve_value(node.left_node)
-        right_value, right_type = self.__resolve_value(node.right_node)
-
-        if isinstance(left_type, ir.IntType) and isinstance(right_type, ir.FloatType):
-            left_value = self.builder.sitofp(left_value, ir.FloatType())
-            left_type = ir.FloatType()
-        if isinstance(left_type, ir.FloatType) and isinstance(right_type, ir.IntType):
-            right_value = self.builder.sitofp(right_value, ir.FloatType())
-            right_type = ir.FloatType()
+        left_node: Expression = node.left_node
+        right_node: Expression = node.right_node
 
-        value = None
-        Type = None
-        if isinstance(right_type, ir.IntType) and isinstance(left_type, ir.IntType):
-            Type = self.type_map['int']
-            match operator:
-                case '+':
-                    value = self.builder.add(left_value, right_value)
-                case '-':
-                    value = self.builder.sub(left_value, right_value)
-                case '*':
-                    value = self.builder.mul(left_value, right_value)
-                case '/':
-                    value = self.builder.sdiv(left_value, right_value)
-                case '%':
-                    value = self.builder.srem(left_value, right_value)
-                case '^':
-                    # TODO: Implement this (Having an issue off camera implementing this)
-                    pass
-                case '<':
-                    value = self.builder.icmp_signed('<', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '<=':
-                    value = self.builder.icmp_signed('<=', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '>':
-                    value = self.builder.icmp_signed('>', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '>=':
-                    value = self.builder.icmp_signed('>=', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '==':
-                    value = self.builder.icmp_signed('==', left_value, right_value)
-                    Type = ir.IntType(1)
-                
-        elif isinstance(right_type, ir.FloatType) and isinstance(left_type, ir.FloatType):
-            Type = ir.FloatType()
-            match operator:
-                case '+':
-                    value = self.builder.fadd(left_value, right_value)
-                case '-':
-                    value = self.builder.fsub(left_value, right_value)
-                case '*':
-                    value = self.builder.fmul(left_value, right_value)
-                case '/':
-                    value = self.builder.fdiv(left_value, right_value)
-                case '%':
-                    value = self.builder.frem(left_value, right_value)
-                case '^':
-                    # TODO: Implement this (Having an issue off camera implementing this)
-                    pass
-                case '<':
-                    value = self.builder.fcmp_ordered('<', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '<=':
-                    value = self.builder.fcmp_ordered('<=', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '>':
-                    value = self.builder.fcmp_ordered('>', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '>=':
-                    value = self.builder.fcmp_ordered('>=', left_value, right_value)
-                    Type = ir.IntType(1)
-                case '==':
-                    value = self.builder.fcmp_ordered('==', left_value, right_value)
-                    Type = ir.IntType(1)
+        # An unsuffixed literal takes the type of the other operand (literals emit no code, so the order doesn't matter).
+        # The exponent of `^` keeps its own type, an int exponent stays an int
+        left_value = right_value = None
+        if self.__is_unsuffixed_literal(left_node) and not self.__is_unsuffixed_literal(right_node):
+            right_value, right_type = self.__resolve_value(right_node)
+            left_value = self.__adapt_literal(left_node, right_type)
+            left_type = right_type
+        elif operator != '^' and self.__is_unsuffixed_literal(right_node) and not self.__is_unsuffixed_literal(left_node):
+            left_value, left_type = self.__resolve_value(left_node)
+            right_value = self.__adapt_literal(right_node, left_type)
+            right_type = left_type
+
+        if left_value is None:
+            left_value, left_type = self.__resolve_value(left_node)
+        if right_value is None:
+            right_value, right_type = self.__resolve_value(right_node)
+
+        if isinstance(left_type, ir.VectorType) or isinstance(right_type, ir.VectorType):
+            return self.__visit_vector_infix(operator, left_value, left_type, right_value, right_type)
+
+        if operator == '^':
+            return self.__visit_power(left_value, left_type, right_value, right_type)
+
+        if is_numeric(left_type) and is_numeric(right_type) and not same_type(left_type, right_type):
+            Type: ir.Type | None = common_type(left_type, right_type)
+            if Type is None:
+                self.errors.append(
+                    f"COMPILE ERROR: Can't mix {type_name(left_type)} and {type_name(right_type)} in `{operator}`, convert one side explicitly (ex. `{type_name(right_type)}(...)`)"
+                )
+                return ir.Constant(left_type, 0), left_type
+
+            left_value, left_type = convert(self.builder, left_value, left_type, Type), Type
+            right_value, right_type = convert(self.builder, right_value, right_type, Type), Type
+
+        # After widening both sides share a type, anything else (ex. strings) isn't supported
+        operation: tuple[Callable, ir.Type | None] | None = None
+        if left_type.__class__ is right_type.__class__:
+            operation = INFIX_OPERATIONS.get((left_type.__class__, operator))
+        if operation is None:
+            if left_type is None or right_type is None:
+                # An operand that couldn't be resolved has reported its error already
+                return None, None
+            self.errors.append(f"COMPILE ERROR: `{operator}` isn't supported between {type_name(left_type)} and {type_name(right_type)}")
+            return None, None
+
+        emit, Type = operation
+        value = emit(self.builder, left_value, right_value)
+        if Type is None:
+            Type = left_type
 
         # Strings
         # elif isinstance(right_type, ir.PointerType) and isinstance(left_type, ir.PointerType):
@@ -544,25 +1086,59 @@ class Compiler:
 
         return value, Type
     
+    def __visit_power(self, base: ir.Value, base_type: ir.Type, exponent: ir.Value, exponent_type: ir.Type) -> tuple[ir.Value, ir.Type]:
+        """
+            `^`: exponentiation by squaring (unrolled for constant int exponents, `llvm.powi` for constant float ones), `llvm.pow` for float exponents.
+            An int exponent (of any int type) leaves the base's type alone, a float exponent makes the result a float.
+        """
+        if not is_numeric(base_type) or not is_numeric(exponent_type):
+            return None, None
+
+        if is_int(exponent_type):
+            if is_int(base_type) and isinstance(exponent, ir.Constant) and exponent.constant >= 0:
+                return self.__unrolled_int_power(base, exponent.constant), base_type
+
+            low, high = int_range(ir.IntType(32))
+            if is_float(base_type) and isinstance(exponent, ir.Constant) and low <= exponent.constant <= high:
+                # Constant exponents get expanded into a multiply chain by the backend
+                powi: ir.Function = self.module.declare_intrinsic(
+                    'llvm.powi', [base_type, ir.IntType(32)],
+                    fnty=ir.FunctionType(base_type, [base_type, ir.IntType(32)])
+                )
+                return self.builder.call(powi, [base, ir.Constant(ir.IntType(32), exponent.constant)]), base_type
+
+            # `llvm.powi` with a runtime exponent becomes a compiler-rt/libgcc call (`__powisf2`) the JIT can't always resolve
+            return self.builder.call(self.__power_function(base_type, exponent_type), [base, exponent]), base_type
+
+        Type: ir.Type = exponent_type if is_int(base_type) else common_type(base_type, exponent_type)
+        base = convert(self.builder, base, base_type, Type)
+        exponent = convert(self.builder, exponent, exponent_type, Type)
+
+        pow_func: ir.Function = self.module.declare_intrinsic('llvm.pow', [Type])
+        return self.builder.call(pow_func, [base, exponent]), Type
+
     def __visit_call_expression(self, node: CallExpression) -> tuple[ir.Instruction, ir.Type]:
         name: str = node.function.value
         params: list[Expression] = node.arguments
 
-        args = []
-        types = []
-        if len(params) > 0:
-            for x in params:
-                p_val, p_type = self.__resolve_value(x)
-                args.append(p_val)
-                types.append(p_type)
-
         match name:
             case 'printf':
+                args = []
+                types = []
+                for x in params:
+                    p_val, p_type = self.__resolve_value(x)
+                    args.append(p_val)
+                    types.append(p_type)
+
                 ret = self.builtin_printf(params=args, return_type=types[0])
                 ret_type = self.type_map['int']
+            case 'len':
+                ret, ret_type = self.__builtin_len(params)
+            case _ if name in VECTOR_REDUCTIONS:
+                ret, ret_type = self.__builtin_reduce(name, params)
             case _:
-                func, ret_type = self.env.lookup(name)
-                ret = self.builder.call(func, args)
+                func, ret_type = self.__slot(node.function)
+                ret = self.builder.call(func, self.__resolve_arguments(params, func))
         
         return ret, ret_type
     
@@ -572,48 +1148,74 @@ class Compiler:
 
         right_value, right_type = self.__resolve_value(right_node)
 
-        Type = None
-        value = None
-        if isinstance(right_type, ir.FloatType):
-            Type = ir.FloatType()
-            match operator:
-                case '-':
-                    value = self.builder.fmul(right_value, ir.Constant(ir.FloatType(), -1.0))
-                case '!':
-                    value = ir.Constant(ir.IntType(1), 0)
-        elif isinstance(right_type, ir.IntType):
-            Type = ir.IntType(32)
-            match operator:
-                case '-':
-                    value = self.builder.mul(right_value, ir.Constant(ir.IntType(32), -1))
-                case '!':
-                    value = self.builder.not_(right_value)
-
-        return value, Type
+        operation: tuple[Callable, ir.Type | None] | None = PREFIX_OPERATIONS.get((operation_class(right_type), operator))
+        if operation is None:
+            return None, None
+
+        emit, Type = operation
+        return emit(self.builder, right_value), Type if Type is not None else right_type
+
+    def __visit_cast_expression(self, node: CastExpression) -> tuple[ir.Value, ir.Type]:
+        """ Explicit conversion `T(x)`, truncates / extends / rounds towards zero where the implicit ones wouldn't """
+        Type: ir.Type | None = self.__resolve_type(node.value_type)
+        if isinstance(Type, ir.VectorType):
+            return self.__visit_vector_cast(node, Type)
+        if Type is None or not is_numeric(Type):
+            self.errors.append(f"COMPILE ERROR: Can't convert a value to `{node.value_type}`")
+            return None, None
+
+        # `f64(0.1)` is the double closest to 0.1, not the float closest to it widened
+        constant: ir.Constant | None = self.__adapt_literal(node.value, Type)
+        if constant is not None:
+            return constant, Type
+
+        value, value_type = self.__resolve_value(node.value)
+        converted: ir.Value | None = convert(self.builder, value, value_type, Type) if isinstance(value_type, ir.IntType) or is_float(value_type) else None
+        if converted is None:
+            self.errors.append(f"COMPILE ERROR: Can't convert {type_name(value_type)} to {type_name(Type)}")
+            return ir.Constant(Type, 0), Type
+
+        return converted, Type
     
+    def __visit_index_expression(self, node: IndexExpression) -> tuple[ir.Value, ir.Type]:
+        if not isinstance(self.__place_type(node.left_node), (ir.ArrayType, SliceType)):
+            return self.__visit_vector_lane(node)
+
+        element_ptr, element_type = self.__index_pointer(node)
+        if element_ptr is None:
+            return None, None
+
+        return self.builder.load(element_ptr), element_type
+
+    def __visit_array_literal(self, node: ArrayLiteral) -> tuple[ir.Value, ir.Type]:
+        # Only reached where nothing says what the elements are, declared variables and parameters resolve them (__resolve_as)
+        self.errors.append("COMPILE ERROR: Array literals need a declared type (ex. `let a: [int; 3] = [1, 2, 3];`)")
+        return None, None
+
     def __visit_postfix_expression(self, node: PostfixExpression) -> None:
-        left_node: IdentifierLiteral = node.left_node
+        left_node: IdentifierLiteral | IndexExpression = node.left_node
         operator: str = node.operator
 
-        if self.env.lookup(left_node.value) is None:
-            self.errors.append(f"COMPILE ERROR: Identifier {left_node.value} has not been declared before it was used in a PostfixExpression.")
+        if left_node.__class__ is IndexExpression:
+            # Elements and vector lanes get the bounds check and load / store of `a[i] += 1`
+            self.__visit_index_assign_statement(IndexAssignStatement(target=left_node, operator=f"{operator[0]}=", right_value=IntegerLiteral(value=1)))
             return
 
-        var_ptr, _ = self.env.lookup(left_node.value)
+        var_ptr, _ = self.__slot(left_node)
         orig_value = self.builder.load(var_ptr)
 
         value = None
         match operator:
             case "++":
                 if isinstance(orig_value.type, ir.IntType):
-                    value = self.builder.add(orig_value, ir.Constant(ir.IntType(32), 1))
-                elif isinstance(orig_value.type, ir.FloatType):
-                    value = self.builder.fadd(orig_value, ir.Constant(ir.FloatType(), 1.0))
+                    value = self.builder.add(orig_value, ir.Constant(orig_value.type, 1))
+                elif is_float(orig_value.type):
+                    value = self.builder.fadd(orig_value, ir.Constant(orig_value.type, 1.0))
             case "--":
                 if isinstance(orig_value.type, ir.IntType):
-                    value = self.builder.sub(orig_value, ir.Constant(ir.IntType(32), 1))
-                elif isinstance(orig_value.type, ir.FloatType):
-                    value = self.builder.fsub(orig_value, ir.Constant(ir.FloatType(), 1.0))
+                    value = self.builder.sub(orig_value, ir.Constant(orig_value.type, 1))
+                elif is_float(orig_value.type):
+                    value = self.builder.fsub(orig_value, ir.Constant(orig_value.type, 1.0))
 
         self.builder.store(value, var_ptr)
 
@@ -624,35 +1226,200 @@ class Compiler:
     # region Helper Methods
     def __resolve_value(self, node: Expression) -> tuple[ir.Value, ir.Type]:
         """ Resolves a value and returns a tuple (ir_value, ir_type) """
-        match node.type():
-            # Literals
-            case NodeType.IntegerLiteral:
-                node: IntegerLiteral = node
-                value, Type = node.value, self.type_map['int']
-                return ir.Constant(Type, value), Type
-            case NodeType.FloatLiteral:
-                node: FloatLiteral = node
-                value, Type = node.value, self.type_map['float']
-                return ir.Constant(Type, value), Type
-            case NodeType.IdentifierLiteral:
-                node: IdentifierLiteral = node
-                ptr, Type = self.env.lookup(node.value)
-                return self.builder.load(ptr), Type
-            case NodeType.BooleanLiteral:
-                node: BooleanLiteral = node
-                return ir.Constant(ir.IntType(1), 1 if node.value else 0), ir.IntType(1)
-            case NodeType.StringLiteral:
-                node: StringLiteral = node
-                string, Type = self.__convert_string(node.value)
-                return string, Type
-            
-            # Expression Values
-            case NodeType.InfixExpression:
-                return self.__visit_infix_expression(node)
-            case NodeType.CallExpression:
-                return self.__visit_call_expression(node)
-            case NodeType.PrefixExpression:
-                return self.__visit_prefix_expression(node)
+        resolver: Callable[[Expression], tuple[ir.Value, ir.Type]] | None = self.resolvers.get(node.__class__)
+        if resolver is not None:
+            return resolver(node)
+
+    def __resolve_integer_literal(self, node: IntegerLiteral) -> tuple[ir.Value, ir.Type]:
+        Type: ir.Type = self.type_map[literal_type(node)]
+        return ir.Constant(Type, node.value), Type
+
+    def __resolve_float_literal(self, node: FloatLiteral) -> tuple[ir.Value, ir.Type]:
+        Type: ir.Type = self.type_map[literal_type(node)]
+        return ir.Constant(Type, node.value), Type
+
+    def __resolve_identifier_literal(self, node: IdentifierLiteral) -> tuple[ir.Value, ir.Type]:
+        ptr, Type = self.__slot(node)
+        return self.builder.load(ptr), Type
+
+    def __resolve_boolean_literal(self, node: BooleanLiteral) -> tuple[ir.Value, ir.Type]:
+        return ir.Constant(ir.IntType(1), 1 if node.value else 0), ir.IntType(1)
+
+    def __resolve_string_literal(self, node: StringLiteral) -> tuple[ir.Value, ir.Type]:
+        return self.__convert_string(node.value)
+
+    def __is_unsuffixed_literal(self, node: Expression) -> bool:
+        """ `5`, `2.5`, their negations and arithmetic between them (`2 * 3`) take the type their context needs """
+        if node.__class__ is PrefixExpression and node.operator == '-':
+            return self.__is_unsuffixed_literal(node.right_node)
+        if node.__class__ is InfixExpression and node.operator in ARITHMETIC_OPERATORS:
+            return self.__is_unsuffixed_literal(node.left_node) and self.__is_unsuffixed_literal(node.right_node)
+        return node.__class__ in (IntegerLiteral, FloatLiteral) and node.value_type is None
+
+    def __adapt_literal(self, node: Expression, Type: ir.Type) -> ir.Constant | None:
+        """ The constant of an unsuffixed literal as the given type (in every lane of a vector), None if it isn't one or doesn't fit """
+        if isinstance(Type, ir.VectorType):
+            lane: ir.Constant | None = self.__adapt_literal(node, Type.element)
+            return ir.Constant(Type, [lane] * Type.count) if lane is not None else None
+
+        if not is_numeric(Type) or not self.__is_unsuffixed_literal(node):
+            return None
+
+        # Int arithmetic is exact, floats are computed in the float type of the context
+        value: int | float | None = unsuffixed_value(node, type_name(Type) if is_float(Type) else 'float')
+        if value is None:
+            return None
+        if is_float(Type):
+            return ir.Constant(Type, float(value))
+
+        if isinstance(value, float):
+            return None
+
+        low, high = int_range(Type)
+        return ir.Constant(Type, value) if low <= value <= high else None
+
+    def __widen(self, value: ir.Value, Type: ir.Type, target: ir.Type, context: str) -> ir.Value:
+        """ Implicit conversion of a value going into a slot of the target type (only numbers are converted) """
+        if not is_numeric(Type) or not is_numeric(target) or same_type(Type, target):
+            return value
+
+        if not can_widen(Type, target):
+            self.errors.append(
+                f"COMPILE ERROR: Can't implicitly convert {type_name(Type)} to {type_name(target)} in {context}, convert it explicitly (ex. `{type_name(target)}(...)`)"
+            )
+            return ir.Constant(target, 0)
+
+        return convert(self.builder, value, Type, target)
+
+    def __resolve_as(self, node: Expression, target: ir.Type | None, context: str) -> tuple[ir.Value, ir.Type]:
+        """ Resolves a value going into a slot of the target type: literals become constants of it, numbers widen to it """
+        if target is None:
+            return self.__resolve_value(node)
+
+        if isinstance(target, SliceType):
+            return self.__resolve_slice(node, target, context), target
+        if isinstance(target, ir.ArrayType):
+            return self.__resolve_array(node, target, context), target
+        if isinstance(target, ir.VectorType):
+            return self.__resolve_vector(node, target, context), target
+
+        constant: ir.Constant | None = self.__adapt_literal(node, target)
+        if constant is not None:
+            return constant, target
+
+        value, Type = self.__resolve_value(node)
+        if Type is None:
+            # The error is already reported, a placeholder keeps codegen going so the rest get reported too
+            return ir.Constant(target, None), target
+        if not is_numeric(Type) or not is_numeric(target):
+            return value, Type
+
+        return self.__widen(value, Type, target, context), target
+
+    def __resolve_arguments(self, arguments: list[Expression], func: ir.Function) -> list[ir.Value]:
+        """ Call arguments, each converted to the type of its parameter """
+        param_types: list[ir.Type] = list(func.function_type.args)
+        args: list[ir.Value] = [
+            self.__resolve_as(arg, param_type, f"argument {i + 1} of `{func.name}`")[0]
+            for i, (arg, param_type) in enumerate(zip(arguments, param_types))
+        ]
+
+        # Extra arguments are passed along as they are, the call itself reports the mismatch
+        return args + [self.__resolve_value(arg)[0] for arg in arguments[len(param_types):]]
+
+    def __is_constant_expression(self, node: Expression) -> bool:
+        """ Values that resolve to constants without emitting code: literals, their conversions and arrays of them """
+        if node.__class__ in (IntegerLiteral, FloatLiteral, BooleanLiteral):
+            return True
+        if node.__class__ is PrefixExpression:
+            return node.operator == '-' and node.right_node.__class__ in (IntegerLiteral, FloatLiteral)
+        if node.__class__ is CastExpression:
+            return self.__is_constant_expression(node.value)
+        if node.__class__ is ArrayLiteral:
+            return all(self.__is_constant_expression(element) for element in node.elements)
+
+        return False
+
+    def __unrolled_int_power(self, base: ir.Value, exponent: int) -> ir.Value:
+        """ Square-and-multiply chain for a constant exponent, ~2 * log2(exponent) multiplies and no loop """
+        result: ir.Value | None = None
+        power: ir.Value = base
+        while exponent > 0:
+            if exponent & 1:
+                result = power if result is None else self.builder.mul(result, power)
+            exponent >>= 1
+            if exponent > 0:
+                power = self.builder.mul(power, power)
+
+        return result if result is not None else ir.Constant(base.type, 1)
+
+    def __power_function(self, value_type: ir.Type, exponent_type: ir.IntType) -> ir.Function:
+        """
+            Defines (once per module and type pair) the runtime power helper for an int or float base and an int exponent, exponentiation by squaring.
+            Negative exponents give `1 / base^-exponent`, truncated for ints: 1 and -1 keep their power, everything else is 0.
+        """
+        name: str = f'__lime_pow_{type_name(value_type)}_{type_name(exponent_type)}'
+        if name in self.module.globals:
+            return self.module.globals[name]
+
+        func: ir.Function = ir.Function(self.module, ir.FunctionType(value_type, [value_type, exponent_type]), name=name)
+        func.linkage = 'internal'
+        base, exponent = func.args
+
+        entry: ir.Block = func.append_basic_block('entry')
+        loop: ir.Block = func.append_basic_block('loop')
+        body: ir.Block = func.append_basic_block('body')
+        done: ir.Block = func.append_basic_block('done')
+
+        zero: ir.Constant = ir.Constant(exponent_type, 0)
+
+        builder: ir.IRBuilder = ir.IRBuilder(entry)
+        negative: ir.Value | None = None
+        magnitude: ir.Value = exponent
+        if not is_unsigned(exponent_type):
+            negative = builder.icmp_signed('<', exponent, zero)
+            magnitude = builder.select(negative, builder.neg(exponent), exponent)
+        builder.branch(loop)
+
+        builder.position_at_end(loop)
+        acc: ir.PhiInstr = builder.phi(value_type, name='acc')
+        power: ir.PhiInstr = builder.phi(value_type, name='power')
+        remaining: ir.PhiInstr = builder.phi(exponent_type, name='remaining')
+        builder.cbranch(builder.icmp_signed('==', remaining, zero), done, body)
+
+        builder.position_at_end(body)
+        multiply: Callable = builder.fmul if is_float(value_type) else builder.mul
+        next_acc: ir.Value = builder.select(builder.trunc(remaining, ir.IntType(1)), multiply(acc, power), acc)
+        next_power: ir.Value = multiply(power, power)
+        # Unsigned shift so the magnitude of INT_MIN still terminates
+        next_remaining: ir.Value = builder.lshr(remaining, ir.Constant(exponent_type, 1))
+        builder.branch(loop)
+
+        acc.add_incoming(ir.Constant(value_type, 1), entry)
+        acc.add_incoming(next_acc, body)
+        power.add_incoming(base, entry)
+        power.add_incoming(next_power, body)
+        remaining.add_incoming(magnitude, entry)
+        remaining.add_incoming(next_remaining, body)
+
+        builder.position_at_end(done)
+        if negative is None:
+            builder.ret(acc)
+            return func
+
+        one: ir.Constant = ir.Constant(value_type, 1)
+        if is_float(value_type):
+            inverse: ir.Value = builder.fdiv(one, acc)
+        else:
+            inverse = ir.Constant(value_type, 0)
+            if not is_unsigned(value_type):
+                minus_one: ir.Constant = ir.Constant(value_type, -1)
+                minus_one_power: ir.Value = builder.select(builder.trunc(exponent, ir.IntType(1)), minus_one, one)
+                inverse = builder.select(builder.icmp_signed('==', base, minus_one), minus_one_power, inverse)
+            inverse = builder.select(builder.icmp_signed('==', base, one), one, inverse)
+        builder.ret(builder.select(negative, inverse, acc))
+
+        return func
 
     def __convert_string(self, string: str) -> tuple[ir.Constant, ir.ArrayType]:
         string = string.replace('\\n', '\n\0')
@@ -668,13 +1435,496 @@ class Compiler:
 
         return global_fmt, global_fmt.type
     # endregion
+
+    # region Vectors
+    def __resolve_vector(self, node: Expression, Type: ir.VectorType, context: str) -> ir.Value:
+        """ A vector value: lanes from an array literal (`[1.0, 2.0, 3.0, 4.0]`, `[x; 4]`), another vector, or a number in every lane """
+        if node.__class__ is ArrayLiteral:
+            if self.__array_length(node) != Type.count:
+                self.errors.append(f"COMPILE ERROR: Expected {Type.count} lane(s) in {context}, got {self.__array_length(node)}")
+                return ir.Constant(Type, None)
+
+            lanes: list[ir.Value] = [self.__resolve_as(element, Type.element, context)[0] for element in node.elements]
+            if node.repeat is not None:
+                return self.__splat(lanes[0], Type)
+            if all(isinstance(lane, ir.Constant) for lane in lanes):
+                return ir.Constant(Type, lanes)
+
+            vector: ir.Value = ir.Constant(Type, ir.Undefined)
+            for i, lane in enumerate(lanes):
+                vector = self.builder.insert_element(vector, lane, ir.Constant(ir.IntType(32), i))
+            return vector
+
+        constant: ir.Constant | None = self.__adapt_literal(node, Type)
+        if constant is not None:
+            return constant
+
+        value, value_type = self.__resolve_value(node)
+        if value_type is None:
+            return ir.Constant(Type, None)
+
+        if not is_numeric(value_type):
+            if not same_type(value_type, Type):
+                self.errors.append(f"COMPILE ERROR: Expected {type_name(Type)} in {context}, got {type_name(value_type)}")
+                return ir.Constant(Type, None)
+            return value
+
+        return self.__splat(self.__widen(value, value_type, Type.element, context), Type)
+
+    def __splat(self, value: ir.Value, Type: ir.VectorType) -> ir.Value:
+        """ The value in every lane: inserted into lane 0, then shuffled into the others """
+        if isinstance(value, ir.Constant):
+            return ir.Constant(Type, [value] * Type.count)
+
+        undefined: ir.Constant = ir.Constant(Type, ir.Undefined)
+        first_lane: ir.Value = self.builder.insert_element(undefined, value, ir.Constant(ir.IntType(32), 0))
+        mask: ir.Constant = ir.Constant(ir.VectorType(ir.IntType(32), Type.count), [0] * Type.count)
+        return self.builder.shuffle_vector(first_lane, undefined, mask)
+
+    def __visit_vector_infix(self, operator: str, left_value: ir.Value, left_type: ir.Type, right_value: ir.Value, right_type: ir.Type) -> tuple[ir.Value, ir.Type]:
+        """ Lane by lane `+ - * / %` of two vectors of the same type, a number on either side goes into every lane """
+        Type: ir.VectorType = left_type if isinstance(left_type, ir.VectorType) else right_type
+
+        if operator not in VECTOR_OPERATORS:
+            self.errors.append(f"COMPILE ERROR: `{operator}` doesn't work on vectors, use it on their lanes (ex. `v[0] {operator} w[0]`)")
+            return ir.Constant(Type, None), Type
+
+        operands: list[ir.Value] = []
+        for value, value_type in ((left_value, left_type), (right_value, right_type)):
+            if is_numeric(value_type):
+                value = self.__splat(self.__widen(value, value_type, Type.element, f"`{operator}`"), Type)
+            elif value_type is None or not same_type(value_type, Type):
+                self.errors.append(
+                    f"COMPILE ERROR: Can't mix {type_name(left_type)} and {type_name(right_type)} in `{operator}`, convert one side explicitly (ex. `{type_name(Type)}(...)`)"
+                )
+                return ir.Constant(Type, None), Type
+            operands.append(value)
+
+        emit, _ = INFIX_OPERATIONS[(Type.element.__class__, operator)]
+        return emit(self.builder, *operands), Type
+
+    def __visit_vector_cast(self, node: CastExpression, Type: ir.VectorType) -> tuple[ir.Value, ir.Type]:
+        """ `vec4<float>(x)`: a vector with as many lanes converted lane by lane, or a number converted to the lane type in every lane """
+        if node.value.__class__ is ArrayLiteral:
+            return self.__resolve_vector(node.value, Type, f"`{type_name(Type)}(...)`"), Type
+
+        constant: ir.Constant | None = self.__adapt_literal(node.value, Type)
+        if constant is not None:
+            return constant, Type
+
+        value, value_type = self.__resolve_value(node.value)
+        converted: ir.Value | None = None
+        if isinstance(value_type, ir.VectorType):
+            converted = convert(self.builder, value, value_type, Type)
+        elif isinstance(value_type, ir.IntType) or is_float(value_type):
+            lane: ir.Value | None = convert(self.builder, value, value_type, Type.element)
+            converted = self.__splat(lane, Type) if lane is not None else None
+
+        if converted is None:
+            self.errors.append(f"COMPILE ERROR: Can't convert {type_name(value_type) if value_type is not None else 'nothing'} to {type_name(Type)}")
+            return ir.Constant(Type, None), Type
+
+        return converted, Type
+
+    def __lane_index(self, node: IndexExpression, Type: ir.VectorType) -> ir.Value | None:
+        """ The lane index of `v[i]`, bounds checked like array indexes (a lane past the end would be poison) """
+        index: ir.Value | None = self.__resolve_index(node)
+        if index is not None and self.__needs_bounds_check(node, Type, index):
+            self.__bounds_check(index, ir.Constant(ir.IntType(64), Type.count))
+
+        return index
+
+    def __visit_vector_lane(self, node: IndexExpression) -> tuple[ir.Value, ir.Type]:
+        vector, Type = self.__resolve_value(node.left_node)
+        if not isinstance(Type, ir.VectorType):
+            self.errors.append("COMPILE ERROR: Only arrays, slices and vectors can be indexed")
+            return None, None
+
+        index: ir.Value | None = self.__lane_index(node, Type)
+        if index is None:
+            return None, None
+
+        return self.builder.extract_element(vector, index), Type.element
+
+    def __assign_vector_lane(self, node: IndexAssignStatement) -> None:
+        """ `v[i] = x` (or `v[i] += x`), the vector is loaded, gets the lane replaced and is stored back """
+        operator: str = node.operator
+
+        place: tuple[ir.Value, ir.Type] | None = self.__place(node.target.left_node)
+        if place is None:
+            return
+        ptr, Type = place
+
+        index: ir.Value | None = self.__lane_index(node.target, Type)
+        if index is None:
+            return
+
+        vector: ir.Value = self.builder.load(ptr)
+        right_value, _ = self.__resolve_as(node.right_value, Type.element, f"`[...] {operator}`")
+
+        if operator == '=':
+            value = right_value
+        else:
+            emit: Callable | None = ASSIGN_OPERATIONS.get((Type.element.__class__, operator))
+            if emit is None:
+                self.errors.append(f"COMPILE ERROR: Unsupported assignment operator `{operator}` for {type_name(Type.element)} lanes")
+                return
+
+            value = emit(self.builder, self.builder.extract_element(vector, index), right_value)
+
+        self.builder.store(self.builder.insert_element(vector, value, index), ptr)
+
+    def __builtin_reduce(self, name: str, params: list[Expression]) -> tuple[ir.Value, ir.Type]:
+        """ `reduce_add(v)` and friends, one value out of every lane. Float sums and products add up the lanes in order """
+        value, Type = self.__resolve_value(params[0]) if len(params) == 1 else (None, None)
+        if not isinstance(Type, ir.VectorType):
+            self.errors.append(f"COMPILE ERROR: `{name}` takes one vector")
+            return ir.Constant(self.type_map['int'], 0), self.type_map['int']
+
+        lane: ir.Type = Type.element
+        int_op, unsigned_op, float_op = VECTOR_REDUCTIONS[name]
+        op: str = float_op if is_float(lane) else unsigned_op if is_unsigned(lane) else int_op
+        intrinsic: str = f"llvm.vector.reduce.{op}.v{Type.count}{lane.intrinsic_name}"
+
+        if op in ('fadd', 'fmul'):
+            # Ordered reductions start from a value (the identity, -0.0 keeps the sign of an all -0.0 sum)
+            func: ir.Function = self.module.declare_intrinsic(intrinsic, fnty=ir.FunctionType(lane, [lane, Type]))
+            start: ir.Constant = ir.Constant(lane, -0.0 if op == 'fadd' else 1.0)
+            return self.builder.call(func, [start, value]), lane
+
+        func = self.module.declare_intrinsic(intrinsic, fnty=ir.FunctionType(lane, [Type]))
+        return self.builder.call(func, [value]), lane
+    # endregion
+
+    # region Arrays
+    def __array_length(self, node: ArrayLiteral) -> int:
+        return node.repeat if node.repeat is not None else len(node.elements)
+
+    def __resolve_array(self, node: Expression, Type: ir.ArrayType, context: str) -> ir.Value:
+        """ An array value of the given type: literals become constants where they can, other arrays have to match exactly """
+        if node.__class__ is not ArrayLiteral:
+            value, value_type = self.__resolve_value(node)
+            if value_type is not None and not same_type(value_type, Type):
+                self.errors.append(f"COMPILE ERROR: Expected {type_name(Type)} in {context}, got {type_name(value_type)}")
+                return ir.Constant(Type, None)
+            return value
+
+        if self.__array_length(node) != Type.count:
+            self.errors.append(f"COMPILE ERROR: Expected {Type.count} element(s) in {context}, got {self.__array_length(node)}")
+            return ir.Constant(Type, None)
+
+        values: list[ir.Value] = [self.__resolve_as(element, Type.element, context)[0] for element in node.elements]
+        if node.repeat is not None:
+            if self.__is_zero(values[0]):
+                # `zeroinitializer` instead of spelling out every element
+                return ir.Constant(Type, None)
+            values = values * node.repeat
+
+        if all(isinstance(value, ir.Constant) for value in values):
+            return ir.Constant(Type, values)
+
+        array: ir.Value = ir.Constant(Type, ir.Undefined)
+        for i, value in enumerate(values):
+            array = self.builder.insert_value(array, value, i)
+        return array
+
+    def __store_array(self, node: Expression, ptr: ir.Value, Type: ir.ArrayType, context: str) -> None:
+        """
+            Initializes array memory. Literals are lowered to memset (all zeroes), a memcpy from a constant copy or a fill loop,
+            storing a large array as one IR value would turn into one store per element.
+        """
+        if node.__class__ is not ArrayLiteral or self.__array_length(node) != Type.count:
+            # Copies of other arrays, and the length mismatch error
+            self.builder.store(self.__resolve_array(node, Type, context), ptr)
+            return
+
+        size: ir.Constant = self.__size_of(Type)
+        byte_ptr: ir.Value = self.builder.bitcast(ptr, ir.IntType(8).as_pointer())
+
+        if node.repeat is not None:
+            value, _ = self.__resolve_as(node.elements[0], Type.element, context)
+            if self.__is_zero(value):
+                memset: ir.Function = self.module.declare_intrinsic('llvm.memset', [byte_ptr.type, size.type])
+                self.builder.call(memset, [byte_ptr, ir.Constant(ir.IntType(8), 0), size, ir.Constant(ir.IntType(1), 0)])
+            else:
+                self.__fill_array(ptr, Type, value)
+            return
+
+        value: ir.Value = self.__resolve_array(node, Type, context)
+        if not isinstance(value, ir.Constant):
+            self.builder.store(value, ptr)
+            return
+
+        # The initial values live in a constant global, copied in on every `let`
+        initial: ir.GlobalVariable = ir.GlobalVariable(self.module, Type, name=f'__array_{self.__increment_counter()}')
+        initial.linkage = 'internal'
+        initial.global_constant = True
+        initial.initializer = value
+
+        memcpy: ir.Function = self.module.declare_intrinsic('llvm.memcpy', [byte_ptr.type, byte_ptr.type, size.type])
+        source: ir.Value = self.builder.bitcast(initial, byte_ptr.type)
+        self.builder.call(memcpy, [byte_ptr, source, size, ir.Constant(ir.IntType(1), 0)])
+
+    def __fill_array(self, ptr: ir.Value, Type: ir.ArrayType, value: ir.Value) -> None:
+        """ Stores the same value into every element (`[x; N]` with a runtime x) """
+        index_type: ir.IntType = ir.IntType(64)
+
+        entry: ir.Block = self.builder.block
+        loop: ir.Block = self.builder.append_basic_block(f"array_fill_{self.__increment_counter()}")
+        done: ir.Block = self.builder.append_basic_block(f"array_fill_done_{self.counter}")
+        self.builder.branch(loop)
+
+        self.builder.position_at_start(loop)
+        index: ir.PhiInstr = self.builder.phi(index_type)
+        index.add_incoming(ir.Constant(index_type, 0), entry)
+
+        self.builder.store(value, self.builder.gep(ptr, [ir.Constant(ir.IntType(32), 0), index], inbounds=True))
+
+        next_index: ir.Value = self.builder.add(index, ir.Constant(index_type, 1))
+        index.add_incoming(next_index, loop)
+        self.builder.cbranch(self.builder.icmp_unsigned('<', next_index, ir.Constant(index_type, Type.count)), loop, done)
+
+        self.builder.position_at_start(done)
+
+    def __is_zero(self, value: ir.Value) -> bool:
+        """ Constants whose bytes are all zero (`-0.0` isn't) """
+        if not isinstance(value, ir.Constant):
+            return False
+        if value.constant is None:
+            return True
+        if isinstance(value.constant, (list, tuple)):
+            return all(self.__is_zero(element) for element in value.constant)
+
+        return isinstance(value.constant, (int, float)) and value.constant == 0 and str(value.constant)[0] != '-'
+
+    def __size_of(self, Type: ir.Type) -> ir.Constant:
+        """ Size in bytes as a constant expression (`gep null, 1`), the target data layout decides the value """
+        end: ir.Constant = ir.Constant(Type.as_pointer(), None).gep([ir.Constant(ir.IntType(32), 1)])
+        return end.ptrtoint(ir.IntType(64))
+
+    def __resolve_slice(self, node: Expression, Type: SliceType, context: str) -> ir.Value:
+        """ A `[T]` value: slices pass through, arrays (variables, elements or literals) get viewed as one """
+        if node.__class__ is ArrayLiteral:
+            array_type: ir.ArrayType = ir.ArrayType(Type.element, self.__array_length(node))
+            ptr: ir.Value = self.__alloca(array_type)
+            self.__store_array(node, ptr, array_type, context)
+            place: tuple[ir.Value, ir.Type] | None = (ptr, array_type)
+        else:
+            place = self.__array_place(node)
+
+        if place is None:
+            value_type: ir.Type | None = self.__resolve_value(node)[1]
+            self.errors.append(f"COMPILE ERROR: Expected {type_name(Type)} in {context}, got {type_name(value_type) if value_type is not None else 'nothing'}")
+            return ir.Constant(Type, None)
+
+        ptr, place_type = place
+        if not same_type(place_type.element, Type.element):
+            self.errors.append(f"COMPILE ERROR: Expected {type_name(Type)} in {context}, got {type_name(place_type)}")
+            return ir.Constant(Type, None)
+
+        if isinstance(place_type, SliceType):
+            return self.builder.load(ptr)
+
+        data: ir.Value = self.builder.gep(ptr, [ir.Constant(ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)], inbounds=True)
+        slice_value: ir.Value = self.builder.insert_value(ir.Constant(Type, ir.Undefined), data, 0)
+        return self.builder.insert_value(slice_value, ir.Constant(ir.IntType(32), place_type.count), 1)
+
+    def __place_type(self, node: Expression) -> ir.Type | None:
+        """ The type of a variable or (nested) array element without emitting any code, None for other expressions and vector lanes """
+        if node.__class__ is IdentifierLiteral:
+            return self.__slot(node)[1]
+        if node.__class__ is IndexExpression:
+            Type: ir.Type | None = self.__place_type(node.left_node)
+            return Type.element if isinstance(Type, (ir.ArrayType, SliceType)) else None
+
+        return None
+
+    def __place(self, node: Expression) -> tuple[ir.Value, ir.Type] | None:
+        """ Where a variable or array element lives (the pointer, nothing gets loaded), None for any other expression """
+        if node.__class__ is IdentifierLiteral:
+            return self.__slot(node)
+        if self.__place_type(node) is None:
+            return None
+
+        ptr, Type = self.__index_pointer(node)
+        return (ptr, Type) if ptr is not None else None
+
+    def __array_place(self, node: Expression) -> tuple[ir.Value, ir.ArrayType | SliceType] | None:
+        """ Where an array or slice lives (the variable or element pointer), None for anything else """
+        if not isinstance(self.__place_type(node), (ir.ArrayType, SliceType)):
+            return None
+
+        return self.__place(node)
+
+    def __resolve_index(self, node: IndexExpression) -> ir.Value | None:
+        """ The index as an i64, sign or zero extended by the index type (GEP would sign extend a `u32`) """
+        index, index_type = self.__resolve_value(node.index)
+        if index_type is None or not is_int(index_type):
+            self.errors.append(f"COMPILE ERROR: Indexes have to be integers, got {type_name(index_type) if index_type is not None else 'nothing'}")
+            return None
+
+        if isinstance(index, ir.Constant):
+            return ir.Constant(ir.IntType(64), index.constant)
+        return convert(self.builder, index, index_type, UnsignedIntType(64) if is_unsigned(index_type) else ir.IntType(64))
+
+    def __index_pointer(self, node: IndexExpression) -> tuple[ir.Value | None, ir.Type | None]:
+        """ Pointer to the indexed element (bounds checked unless the index provably fits) and the element type """
+        place: tuple[ir.Value, ir.ArrayType | SliceType] | None = self.__array_place(node.left_node)
+        if place is None:
+            self.errors.append("COMPILE ERROR: Only arrays, slices and vectors can be indexed")
+            return None, None
+        ptr, Type = place
+
+        index: ir.Value | None = self.__resolve_index(node)
+        if index is None:
+            return None, None
+        index_ptr_type: ir.IntType = ir.IntType(64)
+
+        if isinstance(Type, SliceType):
+            slice_value: ir.Value = self.builder.load(ptr)
+            data: ir.Value = self.builder.extract_value(slice_value, 0)
+            if self.__needs_bounds_check(node, Type, index):
+                length: ir.Value = self.builder.zext(self.builder.extract_value(slice_value, 1), index_ptr_type)
+                self.__bounds_check(index, length)
+
+            return self.builder.gep(data, [index], inbounds=True), Type.element
+
+        if self.__needs_bounds_check(node, Type, index):
+            self.__bounds_check(index, ir.Constant(index_ptr_type, Type.count))
+
+        return self.builder.gep(ptr, [ir.Constant(ir.IntType(32), 0), index], inbounds=True), Type.element
+
+    def __needs_bounds_check(self, node: IndexExpression, Type: ir.ArrayType | SliceType | ir.VectorType, index: ir.Value) -> bool:
+        """ False for constant indexes into arrays and vectors and `for` loop variables whose range fits (or with bounds checks off) """
+        if isinstance(index, ir.Constant) and isinstance(Type, (ir.ArrayType, ir.VectorType)):
+            if not 0 <= index.constant < Type.count:
+                self.errors.append(f"COMPILE ERROR: Index {index.constant} is out of bounds for {type_name(Type)}")
+            self.bounds_check_stats['elided'] += 1
+            return False
+
+        if not self.bounds_checks:
+            return False
+
+        induction: tuple[int, int | tuple[int, int]] | None = None
+        if node.index.__class__ is IdentifierLiteral:
+            induction = self.index_ranges.get((node.index.depth, node.index.index))
+
+        if induction is not None:
+            low, bound = induction
+            if isinstance(bound, int):
+                fits: bool = isinstance(Type, (ir.ArrayType, ir.VectorType)) and low >= 0 and bound <= Type.count
+            else:
+                # `i < len(a)`, indexing that same `a`
+                left: Expression = node.left_node
+                fits = left.__class__ is IdentifierLiteral and (left.depth, left.index) == bound and low >= 0
+
+            if fits:
+                self.bounds_check_stats['elided'] += 1
+                return False
+
+        self.bounds_check_stats['emitted'] += 1
+        return True
+
+    def __bounds_check(self, index: ir.Value, length: ir.Value) -> None:
+        # Unsigned compare, negative indexes wrap around to huge ones
+        in_bounds: ir.Value = self.builder.icmp_unsigned('<', index, length)
+
+        next_block: ir.Block = self.builder.append_basic_block(f"in_bounds_{self.__increment_counter()}")
+        self.builder.cbranch(in_bounds, next_block, self.__trap_block())
+        self.builder.position_at_start(next_block)
+
+    def __trap_block(self) -> ir.Block:
+        """ One `llvm.trap` block per function that every failed bounds check branches to """
+        func: ir.Function = self.builder.function
+
+        block: ir.Block | None = self.trap_blocks.get(func)
+        if block is None:
+            block = func.append_basic_block(f"{func.name}_out_of_bounds")
+            trap_builder: ir.IRBuilder = ir.IRBuilder(block)
+            trap: ir.Function = self.module.declare_intrinsic('llvm.trap', fnty=ir.FunctionType(ir.VoidType(), []))
+            trap_builder.call(trap, [])
+            trap_builder.unreachable()
+            self.trap_blocks[func] = block
+
+        return block
+
+    def __induction_range(self, node: ForStatement) -> tuple[tuple[int, int], tuple[int, int | tuple[int, int]]] | None:
+        """
+            `for (let i: T = start; i < bound; i++)` with a constant start and a constant (or `len(a)`) bound: inside the body
+            `start <= i < bound` holds as long as the body never writes i (or a). Returns (slot of i, (start, bound)).
+        """
+        declaration: LetStatement = node.var_declaration
+        condition: Expression = node.condition
+        action: Expression = node.action
+
+        loop_slot: tuple[int, int] = (declaration.name.depth, declaration.name.index)
+        loop_type: ir.Type | None = self.type_map.get(declaration.value_type)
+
+        def is_loop_variable(ident: Expression) -> bool:
+            return ident.__class__ is IdentifierLiteral and (ident.depth, ident.index) == loop_slot
+
+        if loop_type is None or not is_int(loop_type) or declaration.value.__class__ is not IntegerLiteral:
+            return None
+        if not (action.__class__ is PostfixExpression and action.operator == '++' and is_loop_variable(action.left_node)):
+            return None
+        if not (condition.__class__ is InfixExpression and condition.operator in ('<', '<=') and is_loop_variable(condition.left_node)):
+            return None
+
+        written: set[tuple[int, int]] = assigned_slots(node.body)
+        if loop_slot in written:
+            return None
+
+        # i never gets past the bound, so `i++` can't wrap around as long as the bound fits the type
+        _, high = int_range(loop_type)
+        bound_node: Expression = condition.right_node
+        bound: int | tuple[int, int]
+        if bound_node.__class__ is IntegerLiteral:
+            bound = bound_node.value + (1 if condition.operator == '<=' else 0)
+        elif (
+            bound_node.__class__ is CallExpression and bound_node.function.value == 'len' and condition.operator == '<'
+            and len(bound_node.arguments) == 1 and bound_node.arguments[0].__class__ is IdentifierLiteral
+        ):
+            array: IdentifierLiteral = bound_node.arguments[0]
+            _, array_type = self.__slot(array)
+            if isinstance(array_type, (ir.ArrayType, ir.VectorType)):
+                bound = array_type.count
+            elif isinstance(array_type, SliceType) and (array.depth, array.index) not in written:
+                bound = (array.depth, array.index)
+            else:
+                return None
+        else:
+            return None
+
+        # A slice can be as long as an `int` goes
+        if (bound if isinstance(bound, int) else int_range(self.type_map['int'])[1]) > high:
+            return None
+
+        return loop_slot, (declaration.value.value, bound)
+
+    def __builtin_len(self, params: list[Expression]) -> tuple[ir.Value, ir.Type]:
+        """ `len(a)`: a constant for arrays and vectors, the stored length for slices """
+        Type: ir.Type = self.type_map['int']
+
+        place_type: ir.Type | None = self.__place_type(params[0]) if len(params) == 1 else None
+        if isinstance(place_type, (ir.ArrayType, ir.VectorType)):
+            return ir.Constant(Type, place_type.count), Type
+        if not isinstance(place_type, SliceType):
+            self.errors.append("COMPILE ERROR: `len` takes one array, slice or vector")
+            return ir.Constant(Type, 0), Type
+
+        place: tuple[ir.Value, ir.Type] | None = self.__place(params[0])
+        if place is None:
+            return ir.Constant(Type, 0), Type
+
+        return self.builder.extract_value(self.builder.load(place[0]), 1), Type
+    # endregion
         
     # region
     def builtin_printf(self, params: list[ir.Instruction], return_type: ir.Type) -> None:
         """ Basic C builtin printf """
         func, _ = self.env.lookup('printf')
 
-        c_str = self.builder.alloca(return_type)
+        c_str = self.__alloca(return_type)
         self.builder.store(params[0], c_str)
 
         rest_params = params[1:]
@@ -692,7 +1942,8 @@ class Compiler:
             """ Printing from a normal string declared within printf """
             # print("yeet %i", 23)
             # TODO: HANDLE PRINTING FLOATS
-            fmt_arg = self.builder.bitcast(self.module.get_global(f"__str_{self.counter}"), ir.IntType(8).as_pointer())
+            # The `__str_N` global resolved for the literal, the counter may have moved on since (bounds checks, array fills)
+            fmt_arg = self.builder.bitcast(params[0], ir.IntType(8).as_pointer())
 
             return self.builder.call(func, [fmt_arg, *rest_params])
 
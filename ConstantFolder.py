@@ -0,0 +1,555 @@
+from AST import Node, Statement, Expression, Program
+from AST import ExpressionStatement, LetStatement, FunctionStatement, ReturnStatement, BlockStatement, AssignStatement, IfStatement, WhileStatement, BreakStatement, ContinueStatement, ForStatement, ImportStatement
+from AST import InfixExpression, CallExpression, PrefixExpression, CastExpression, IndexExpression
+from AST import IndexAssignStatement
+from AST import IntegerLiteral, FloatLiteral, BooleanLiteral, ArrayLiteral, IdentifierLiteral
+from Types import NUMERIC_TYPES, literal_type, is_int, is_float, int_range, common_type, type_name
+
+from typing import Callable
+import math
+import struct
+
+# Statements after one of these in the same block can never run
+TERMINATORS: tuple[type, ...] = (ReturnStatement, BreakStatement, ContinueStatement)
+
+NUMBER_LITERALS: tuple[type, ...] = (IntegerLiteral, FloatLiteral)
+
+# Infix operators whose result is a number of the type of their operands
+ARITHMETIC_OPERATORS: tuple[str, ...] = ('+', '-', '*', '/', '%', '^')
+
+# region Lime Arithmetic
+# Folded values have to match what the IR would have computed: ints wrap around at their width
+# (unsigned ones are kept as their non-negative value) and `float` is an f32
+def wrap_int(value: int, bits: int = 32, signed: bool = True) -> int:
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if signed and value >= (1 << (bits - 1)) else value
+
+def wrapper(value_type: str) -> Callable[[int], int]:
+    typ = NUMERIC_TYPES[value_type]
+    low, _ = int_range(typ)
+    return lambda value: wrap_int(value, typ.width, low < 0)
+
+def round_float(value: float, value_type: str = 'float') -> float:
+    # `f64` is a Python float already
+    return struct.unpack("f", struct.pack("f", value))[0] if value_type == 'float' else value
+
+def fits(literal: IntegerLiteral | FloatLiteral, value_type: str) -> bool:
+    """ Whether an unsuffixed literal can take the type, same rule as the Compiler's `__adapt_literal` """
+    if is_float(NUMERIC_TYPES[value_type]):
+        return True
+    if literal.__class__ is FloatLiteral:
+        return False
+
+    low, high = int_range(NUMERIC_TYPES[value_type])
+    return low <= literal.value <= high
+
+def make_literal(value: int | float, value_type: str | None) -> IntegerLiteral | FloatLiteral:
+    literal: IntegerLiteral | FloatLiteral = IntegerLiteral(value=value) if isinstance(value, int) else FloatLiteral(value=value)
+    literal.value_type = value_type
+    return literal
+
+def convert_value(value: int | float, source: str, target: str) -> int | float | None:
+    """ Value of a `T(x)` conversion (see Types.convert), None where the IR result is poison (float out of int range) """
+    if is_float(NUMERIC_TYPES[source]):
+        # Unsuffixed float literals still hold the value as written
+        value = round_float(value, source)
+
+    if is_float(NUMERIC_TYPES[target]):
+        try:
+            result: float = round_float(float(value), target)
+        except OverflowError:
+            return None
+        return result if math.isfinite(result) else None
+
+    if is_float(NUMERIC_TYPES[source]):
+        if not math.isfinite(value):
+            return None
+        value = int(value)
+        low, high = int_range(NUMERIC_TYPES[target])
+        return value if low <= value <= high else None
+
+    return wrapper(target)(value)
+
+def int_div(left: int, right: int, wrap: Callable[[int], int]) -> int | None:
+    """ `sdiv` / `udiv`, truncates towards zero. Division by zero and INT_MIN / -1 are left to the runtime """
+    if right == 0:
+        return None
+    quotient: int = abs(left) // abs(right)
+    quotient = quotient if (left < 0) == (right < 0) else -quotient
+    return quotient if wrap(quotient) == quotient else None
+
+def int_rem(left: int, right: int, wrap: Callable[[int], int]) -> int | None:
+    """ `srem` / `urem`, the result takes the sign of the dividend """
+    quotient: int | None = int_div(left, right, wrap)
+    return None if quotient is None else left - right * quotient
+
+def int_pow(base: int, exponent: int, wrap: Callable[[int], int]) -> int:
+    """ Matches the Compiler's `__lime_pow_*` helpers: squaring with wrap-around, negative exponents truncate """
+    if exponent < 0:
+        if base == 1:
+            return 1
+        if base == -1:
+            return -1 if exponent & 1 else 1
+        return 0
+
+    result: int = 1
+    while exponent > 0:
+        if exponent & 1:
+            result = wrap(result * base)
+        base = wrap(base * base)
+        exponent >>= 1
+
+    return result
+
+# Operations get the operands plus the wrap-around of the type they are computed in
+INT_OPERATIONS: dict[str, Callable[[int, int, Callable[[int], int]], int | bool | None]] = {
+    '+': lambda l, r, wrap: wrap(l + r),
+    '-': lambda l, r, wrap: wrap(l - r),
+    '*': lambda l, r, wrap: wrap(l * r),
+    '/': int_div,
+    '%': int_rem,
+    '^': int_pow,
+    '<': lambda l, r, wrap: l < r,
+    '<=': lambda l, r, wrap: l <= r,
+    '>': lambda l, r, wrap: l > r,
+    '>=': lambda l, r, wrap: l >= r,
+    '==': lambda l, r, wrap: l == r,
+}
+
+FLOAT_OPERATIONS: dict[str, Callable[[float, float], float | bool | None]] = {
+    '+': lambda l, r: l + r,
+    '-': lambda l, r: l - r,
+    '*': lambda l, r: l * r,
+    '/': lambda l, r: l / r if r != 0 else None,
+    '%': lambda l, r: math.fmod(l, r) if r != 0 else None,
+    '<': lambda l, r: l < r,
+    '<=': lambda l, r: l <= r,
+    '>': lambda l, r: l > r,
+    '>=': lambda l, r: l >= r,
+    '==': lambda l, r: l == r,
+}
+
+def unsuffixed_operation(left: int | float, operator: str, right: int | float, float_type: str = 'float') -> int | float | None:
+    """
+        Arithmetic between unsuffixed constants before they take a type: ints are exact (None past 64 bits, no type could
+        hold that), anything with a float is computed in the float type. None where the IR would trap or not be finite
+    """
+    if isinstance(left, int) and isinstance(right, int):
+        if operator == '^' and right > 64 and abs(left) > 1:
+            return None
+        result: int | None = INT_OPERATIONS[operator](left, right, lambda value: value)
+        return result if result is None or -(1 << 63) <= result < (1 << 64) else None
+
+    # Like the Compiler, only int powers are known
+    if operator == '^':
+        return None
+    value: float | None = FLOAT_OPERATIONS[operator](round_float(float(left), float_type), round_float(float(right), float_type))
+    if value is None:
+        return None
+    try:
+        value = round_float(value, float_type)
+    except OverflowError:
+        return None
+    return value if math.isfinite(value) else None
+
+def unsuffixed_value(node: Expression, float_type: str = 'float') -> int | float | None:
+    """ Value of `5`, `2.5`, their negations and arithmetic between them (`2 * 3 + 1`), None for anything else """
+    if node.__class__ in NUMBER_LITERALS:
+        return node.value if node.value_type is None else None
+    if node.__class__ is PrefixExpression and node.operator == '-':
+        value: int | float | None = unsuffixed_value(node.right_node, float_type)
+        return -value if value is not None else None
+    if node.__class__ is InfixExpression and node.operator in ARITHMETIC_OPERATORS:
+        left: int | float | None = unsuffixed_value(node.left_node, float_type)
+        right: int | float | None = unsuffixed_value(node.right_node, float_type)
+        if left is None or right is None:
+            return None
+        return unsuffixed_operation(left, node.operator, right, float_type)
+
+    return None
+# endregion
+
+def count_nodes(node) -> int:
+    """ Counts the AST nodes in a subtree (lists of nodes included) """
+    count: int = 0
+
+    stack: list = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+        elif isinstance(current, Node):
+            count += 1
+            stack.extend(getattr(current, name, None) for name in current.__slots__)
+
+    return count
+
+
+class ConstantFolder:
+    """
+        AST optimization pass that runs before name resolution: folds operators on Integer/Float/Boolean literals,
+        applies algebraic identities and prunes `if` statements with constant conditions (and code after a terminator).
+        Only identities that hold for every operand type are applied (ex. `x * 1`, never `x * 0` or `x + 0` which
+        aren't identities for floats), so the folded program computes exactly what the unfolded one did.
+    """
+    def __init__(self, load_pallet: Callable[[str], Program | None]) -> None:
+        # Returns the Program of an imported pallet, or None when imports aren't inlined into this module
+        self.load_pallet: Callable[[str], Program | None] = load_pallet
+        self.imported: set[str] = set()
+
+        # Name -> declared type for every open scope, opened like the Resolver's (functions and `for` loops).
+        # None for names that aren't a variable of one known type (functions, lets redeclaring a name with another type)
+        self.scopes: list[dict[str, str | None]] = [{}]
+
+        # Stats
+        self.folded: int = 0
+        self.pruned: int = 0
+        self.removed: int = 0
+
+        self.statement_folders: dict[type, Callable[[Statement], list[Statement]]] = {
+            ExpressionStatement: self.__fold_expression_statement,
+            LetStatement: self.__fold_let_statement,
+            FunctionStatement: self.__fold_function_statement,
+            BlockStatement: self.__fold_block_statement,
+            ReturnStatement: self.__fold_return_statement,
+            AssignStatement: self.__fold_assign_statement,
+            IndexAssignStatement: self.__fold_index_assign_statement,
+            IfStatement: self.__fold_if_statement,
+            WhileStatement: self.__fold_while_statement,
+            ForStatement: self.__fold_for_statement,
+            ImportStatement: self.__fold_import_statement,
+        }
+        self.expression_folders: dict[type, Callable[[Expression], Expression]] = {
+            InfixExpression: self.__fold_infix_expression,
+            PrefixExpression: self.__fold_prefix_expression,
+            CallExpression: self.__fold_call_expression,
+            CastExpression: self.__fold_cast_expression,
+            IndexExpression: self.__fold_index_expression,
+            ArrayLiteral: self.__fold_array_literal,
+        }
+
+    def fold(self, program: Program) -> None:
+        program.statements = self.__fold_statements(program.statements)
+
+    def __fold_statements(self, statements: list[Statement]) -> list[Statement]:
+        folded: list[Statement] = []
+        for i, stmt in enumerate(statements):
+            folded.extend(self.__fold_statement(stmt))
+
+            if len(folded) > 0 and isinstance(folded[-1], TERMINATORS) and i + 1 < len(statements):
+                # Unreachable, and a pruned `if` may have just spliced a `return` into this block
+                self.removed += count_nodes(statements[i + 1:])
+                break
+
+        return folded
+
+    def __fold_statement(self, node: Statement) -> list[Statement]:
+        """ Returns the statements that replace the node (none when it was pruned) """
+        folder: Callable[[Statement], list[Statement]] | None = self.statement_folders.get(node.__class__)
+        return folder(node) if folder is not None else [node]
+
+    def __fold_expression(self, node: Expression | None) -> Expression | None:
+        if node is None:
+            return None
+
+        folder: Callable[[Expression], Expression] | None = self.expression_folders.get(node.__class__)
+        return folder(node) if folder is not None else node
+
+    # region Scopes
+    def __declare(self, name: str, value_type: str | None) -> None:
+        """ Lets of a name that is already visible store to the existing variable, so it keeps its type """
+        for scope in reversed(self.scopes):
+            if name in scope:
+                if scope[name] != value_type:
+                    scope[name] = None
+                return
+
+        self.scopes[-1][name] = value_type
+
+    def __declared_type(self, name: str) -> str | None:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+
+        return None
+    # endregion
+
+    # region Statements
+    def __fold_expression_statement(self, node: ExpressionStatement) -> list[Statement]:
+        if isinstance(node.expr, Statement):
+            # `if` is parsed as an expression, so it arrives wrapped in an ExpressionStatement
+            folded: list[Statement] = self.__fold_statement(node.expr)
+            return [node] if folded == [node.expr] else folded
+
+        node.expr = self.__fold_expression(node.expr)
+        return [node]
+
+    def __fold_let_statement(self, node: LetStatement) -> list[Statement]:
+        node.value = self.__fold_expression(node.value)
+        self.__declare(node.name.value, node.value_type)
+        return [node]
+
+    def __fold_function_statement(self, node: FunctionStatement) -> list[Statement]:
+        self.scopes.append({param.name: param.value_type for param in node.parameters})
+        self.scopes[-1][node.name.value] = None
+        self.__fold_block_statement(node.body)
+        self.scopes.pop()
+
+        self.scopes[-1][node.name.value] = None
+        return [node]
+
+    def __fold_block_statement(self, node: BlockStatement) -> list[Statement]:
+        node.statements = self.__fold_statements(node.statements)
+        return [node]
+
+    def __fold_return_statement(self, node: ReturnStatement) -> list[Statement]:
+        node.return_value = self.__fold_expression(node.return_value)
+        return [node]
+
+    def __fold_assign_statement(self, node: AssignStatement) -> list[Statement]:
+        node.right_value = self.__fold_expression(node.right_value)
+        return [node]
+
+    def __fold_index_assign_statement(self, node: IndexAssignStatement) -> list[Statement]:
+        node.target = self.__fold_expression(node.target)
+        node.right_value = self.__fold_expression(node.right_value)
+        return [node]
+
+    def __fold_if_statement(self, node: IfStatement) -> list[Statement]:
+        node.condition = self.__fold_expression(node.condition)
+
+        if not isinstance(node.condition, BooleanLiteral):
+            self.__fold_block_statement(node.consequence)
+            if node.alternative is not None:
+                self.__fold_block_statement(node.alternative)
+            return [node]
+
+        # Constant condition, only the branch that runs survives (spliced into the enclosing block, ifs have no scope)
+        taken, dropped = (node.consequence, node.alternative) if node.condition.value else (node.alternative, node.consequence)
+
+        self.pruned += 1
+        self.removed += 1 + count_nodes(node.condition) + count_nodes(dropped)
+        if taken is None:
+            return []
+
+        self.removed += 1
+        return self.__fold_statements(taken.statements)
+
+    def __fold_while_statement(self, node: WhileStatement) -> list[Statement]:
+        node.condition = self.__fold_expression(node.condition)
+        self.__fold_block_statement(node.body)
+        return [node]
+
+    def __fold_for_statement(self, node: ForStatement) -> list[Statement]:
+        # Same order the Resolver binds the loop in
+        self.scopes.append({})
+
+        self.__fold_let_statement(node.var_declaration)
+        self.__fold_block_statement(node.body)
+        if isinstance(node.action, Statement):
+            # `i += 2 * 4`
+            self.__fold_statement(node.action)
+        else:
+            node.action = self.__fold_expression(node.action)
+        node.condition = self.__fold_expression(node.condition)
+
+        self.scopes.pop()
+        return [node]
+
+    def __fold_import_statement(self, node: ImportStatement) -> list[Statement]:
+        if node.file_path not in self.imported:
+            program: Program | None = self.load_pallet(node.file_path)
+            if program is not None:
+                self.imported.add(node.file_path)
+                self.fold(program)
+
+        return [node]
+    # endregion
+
+    # region Expressions
+    def __fold_call_expression(self, node: CallExpression) -> Expression:
+        node.arguments = [self.__fold_expression(arg) for arg in node.arguments]
+        return node
+
+    def __fold_index_expression(self, node: IndexExpression) -> Expression:
+        node.left_node = self.__fold_expression(node.left_node)
+        node.index = self.__fold_expression(node.index)
+        return node
+
+    def __fold_array_literal(self, node: ArrayLiteral) -> Expression:
+        node.elements = [self.__fold_expression(element) for element in node.elements]
+        return node
+
+    def __fold_infix_expression(self, node: InfixExpression) -> Expression:
+        left: Expression = self.__fold_expression(node.left_node)
+        right: Expression = self.__fold_expression(node.right_node)
+        node.left_node, node.right_node = left, right
+
+        folded: Expression | None = self.__fold_constants(left, node.operator, right)
+        if folded is None:
+            folded = self.__apply_identity(left, node.operator, right)
+        if folded is None:
+            return node
+
+        self.folded += 1
+        self.removed += count_nodes(node) - count_nodes(folded)
+        return folded
+
+    def __fold_constants(self, left: Expression, operator: str, right: Expression) -> Expression | None:
+        if left.__class__ not in NUMBER_LITERALS or right.__class__ not in NUMBER_LITERALS:
+            return None
+        if left.value_type is None and right.value_type is None and operator in ARITHMETIC_OPERATORS:
+            return self.__fold_unsuffixed(left, operator, right)
+
+        # Operand types exactly like the Compiler picks them: an unsuffixed literal takes the type of a suffixed one
+        # (except the exponent of `^`), otherwise both widen to their common type
+        left_type, right_type = literal_type(left), literal_type(right)
+        if left.value_type is None and right.value_type is not None and fits(left, right_type):
+            left_type = right_type
+        elif operator != '^' and right.value_type is None and left.value_type is not None and fits(right, left_type):
+            right_type = left_type
+
+        if operator == '^':
+            # Only int powers are folded, they keep the type of the base
+            if not is_int(NUMERIC_TYPES[left_type]) or not is_int(NUMERIC_TYPES[right_type]):
+                return None
+            value_type: str = left_type
+        else:
+            common = common_type(NUMERIC_TYPES[left_type], NUMERIC_TYPES[right_type])
+            if common is None:
+                # The Compiler reports the mix
+                return None
+            value_type = type_name(common)
+
+        if is_int(NUMERIC_TYPES[value_type]):
+            operation = INT_OPERATIONS.get(operator)
+            result = operation(left.value, right.value, wrapper(value_type)) if operation is not None else None
+        else:
+            # Int operands get converted first, just like `sitofp` / `uitofp` does in the Compiler
+            operation = FLOAT_OPERATIONS.get(operator)
+            result = operation(round_float(left.value, value_type), round_float(right.value, value_type)) if operation is not None else None
+            if isinstance(result, float):
+                try:
+                    result = round_float(result, value_type)
+                except OverflowError:
+                    return None
+                if not math.isfinite(result):
+                    return None
+
+        if result is None:
+            return None
+        if isinstance(result, bool):
+            return BooleanLiteral(value=result)
+
+        # The result of an operation on a suffixed literal is a value of its type, it doesn't adapt to its context anymore
+        return make_literal(result, value_type)
+
+    def __fold_unsuffixed(self, left: IntegerLiteral | FloatLiteral, operator: str, right: IntegerLiteral | FloatLiteral) -> Expression | None:
+        """
+            `2 * 3` is an unsuffixed `6` that still takes the type its context needs. Only folded where every type it can
+            take has the same value: ints that fit an `int` (no wrap-around in the IR without a context), floats that are
+            the same as a `float` and an `f64`. Anything else is left for the Compiler to compute in its context
+        """
+        if left.__class__ is IntegerLiteral and right.__class__ is IntegerLiteral:
+            value: int | float | None = unsuffixed_operation(left.value, operator, right.value)
+            low, high = int_range(NUMERIC_TYPES['int'])
+            if value is None or not all(low <= v <= high for v in (left.value, right.value, value)):
+                return None
+            return make_literal(value, None)
+
+        value = unsuffixed_operation(left.value, operator, right.value, 'float')
+        if value is None or value != unsuffixed_operation(left.value, operator, right.value, 'f64'):
+            return None
+        return make_literal(float(value), None)
+
+    def __apply_identity(self, left: Expression, operator: str, right: Expression) -> Expression | None:
+        """ `x * 1`, `1 * x`, `x / 1`, `x - 0` and `x ^ 1` are x (for x of any scalar numeric type) """
+        def is_unsuffixed(node: Expression, value: int) -> bool:
+            # Only unsuffixed integer literals, they take the type of x. `x * 1.0` or `x * 1i64` could change it
+            return node.__class__ is IntegerLiteral and node.value_type is None and node.value == value
+
+        match operator:
+            case '*':
+                if is_unsuffixed(right, 1) and self.__is_scalar_number(left):
+                    return left
+                if is_unsuffixed(left, 1) and self.__is_scalar_number(right):
+                    return right
+            case '/':
+                if is_unsuffixed(right, 1) and self.__is_scalar_number(left):
+                    return left
+            case '-':
+                if is_unsuffixed(right, 0) and self.__is_scalar_number(left):
+                    return left
+            case '^':
+                # The result has the type of the base whatever type the exponent has
+                if right.__class__ is IntegerLiteral and right.value == 1 and self.__is_scalar_number(left):
+                    return left
+
+        return None
+
+    def __is_scalar_number(self, node: Expression) -> bool:
+        """
+            Whether the node is a scalar number, variables count by their declared type. The folder doesn't know what a call
+            returns, so `f() * 1` (like `s * 1` of a string or a vector) has to reach the Compiler to be type checked
+        """
+        if node.__class__ in NUMBER_LITERALS:
+            return True
+        if node.__class__ is IdentifierLiteral:
+            return self.__declared_type(node.value) in NUMERIC_TYPES
+        if node.__class__ is CastExpression:
+            # The cast is kept, the Compiler still checks what is converted
+            return node.value_type in NUMERIC_TYPES
+        if node.__class__ is PrefixExpression:
+            return node.operator == '-' and self.__is_scalar_number(node.right_node)
+        if node.__class__ is InfixExpression:
+            return node.operator in ARITHMETIC_OPERATORS and self.__is_scalar_number(node.left_node) and self.__is_scalar_number(node.right_node)
+        return False
+
+    def __fold_prefix_expression(self, node: PrefixExpression) -> Expression:
+        # `-5` of a literal written as such adapts to its context like `5` does, and so does `-(2 * 3)` unless it wraps around
+        written: bool = node.right_node.__class__ in NUMBER_LITERALS
+
+        right: Expression = self.__fold_expression(node.right_node)
+        node.right_node = right
+
+        folded: Expression | None = None
+        if node.operator == '-' and right.__class__ in NUMBER_LITERALS:
+            value_type: str = literal_type(right)
+            value: int | float = -right.value
+            if right.value_type is None and (written or right.__class__ is FloatLiteral or wrapper(value_type)(value) == value):
+                folded = make_literal(value, None)
+            else:
+                folded = make_literal(wrapper(value_type)(value) if right.__class__ is IntegerLiteral else value, value_type)
+        elif node.operator == '!' and right.__class__ is BooleanLiteral:
+            folded = BooleanLiteral(value=not right.value)
+        elif node.operator == '!' and right.__class__ is IntegerLiteral:
+            # `not` on an int is a bitwise not
+            value_type = literal_type(right)
+            folded = make_literal(wrapper(value_type)(~right.value), value_type)
+
+        if folded is None:
+            return node
+
+        self.folded += 1
+        self.removed += 1
+        return folded
+
+    def __fold_cast_expression(self, node: CastExpression) -> Expression:
+        value: Expression = self.__fold_expression(node.value)
+        node.value = value
+
+        if value.__class__ not in NUMBER_LITERALS or node.value_type not in NUMERIC_TYPES:
+            return node
+
+        if value.value_type is None and fits(value, node.value_type):
+            # `f64(0.1)` is the double closest to 0.1, not the float closest to it widened
+            result: int | float | None = round_float(float(value.value), node.value_type) if is_float(NUMERIC_TYPES[node.value_type]) else value.value
+        else:
+            result = convert_value(value.value, literal_type(value), node.value_type)
+        if result is None:
+            return node
+
+        self.folded += 1
+        self.removed += 1
+        return make_literal(result, node.value_type)
+    # endregion
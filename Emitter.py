@@ -0,0 +1,94 @@
+import llvmlite.binding as llvm
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# The Lime `main` is renamed to this symbol when linking an executable so the C shim can own `main`
+LIME_ENTRY_SYMBOL: str = "lime_main"
+
+C_MAIN_SHIM: str = f"""int {LIME_ENTRY_SYMBOL}(void);
+
+int main(int argc, char **argv) {{
+    (void)argc;
+    (void)argv;
+    return {LIME_ENTRY_SYMBOL}();
+}}
+"""
+
+EMIT_KINDS: list[str] = ["obj", "asm", "exe"]
+
+class Emitter:
+    """ Ahead-of-time backend that writes object files, assembly and native executables """
+    def __init__(self, target_machine: llvm.TargetMachine) -> None:
+        self.target_machine: llvm.TargetMachine = target_machine
+
+    @staticmethod
+    def default_output_path(file_path: str, kind: str) -> str:
+        """ Builds the output file name from the entry point file (ex. `main.lime` -> `main.o`) """
+        stem: str = os.path.splitext(os.path.basename(file_path))[0]
+
+        match kind:
+            case "obj":
+                return f"{stem}.obj" if sys.platform == "win32" else f"{stem}.o"
+            case "asm":
+                return f"{stem}.s"
+            case "exe":
+                return f"{stem}.exe" if sys.platform == "win32" else stem
+
+    def emit(self, module: llvm.ModuleRef, kind: str, output_path: str) -> str:
+        """ Emits the module as the requested kind and returns the path that was written """
+        match kind:
+            case "obj":
+                self.emit_object(module, output_path)
+            case "asm":
+                self.emit_assembly(module, output_path)
+            case "exe":
+                self.emit_executable(module, output_path)
+            case _:
+                raise ValueError(f"Unknown emit kind `{kind}`, expected one of {EMIT_KINDS}")
+
+        return output_path
+
+    def emit_object(self, module: llvm.ModuleRef, output_path: str) -> None:
+        with open(output_path, "wb") as f:
+            f.write(self.target_machine.emit_object(module))
+
+    def emit_assembly(self, module: llvm.ModuleRef, output_path: str) -> None:
+        with open(output_path, "w") as f:
+            f.write(self.target_machine.emit_assembly(module))
+
+    def emit_executable(self, module: llvm.ModuleRef, output_path: str) -> None:
+        """ Emits an object file and links it against a C `main` shim with the system C compiler """
+        entry: llvm.ValueRef = module.get_function("main")
+        entry.name = LIME_ENTRY_SYMBOL
+
+        self.link_objects([self.target_machine.emit_object(module)], output_path)
+
+    def link_objects(self, objects: list[bytes], output_path: str) -> None:
+        """ Links object code whose entry point is already named `LIME_ENTRY_SYMBOL` against the C `main` shim """
+        with tempfile.TemporaryDirectory(prefix="lime_") as build_dir:
+            shim_path: str = os.path.join(build_dir, "lime_main_shim.c")
+            with open(shim_path, "w") as f:
+                f.write(C_MAIN_SHIM)
+
+            obj_paths: list[str] = []
+            for i, data in enumerate(objects):
+                obj_path: str = os.path.join(build_dir, f"program_{i}.o")
+                with open(obj_path, "wb") as f:
+                    f.write(data)
+                obj_paths.append(obj_path)
+
+            self.link([shim_path, *obj_paths], output_path)
+
+    def link(self, inputs: list[str], output_path: str) -> None:
+        """ Links the inputs into an executable using `$CC` (or the first C compiler found on PATH) """
+        cc: str | None = os.environ.get("CC") or shutil.which("cc") or shutil.which("clang") or shutil.which("gcc")
+        if cc is None:
+            raise RuntimeError("Could not find a C compiler to link with. Set the `CC` environment variable.")
+
+        # `llvm.pow` lowers to a libm call
+        result = subprocess.run([cc, *inputs, "-o", output_path, "-lm"], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Linking `{output_path}` failed:\n{result.stderr}")
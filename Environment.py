@@ -1,22 +1,35 @@
 from llvmlite import ir
 
 class Environment:
-    """ Symbol Table """
+    """ Symbol Table, every name owns a slot so resolved identifiers can be read by index """
     def __init__(self, records: dict[str, tuple[ir.Value, ir.Type]] = None, parent = None, name: str = "global") -> None:
-        self.records: dict[str, tuple] = records if records else {}
+        # Name -> slot index, slots hold the (value, type) records
+        self.records: dict[str, int] = {}
+        self.slots: list[tuple[ir.Value, ir.Type]] = []
         self.parent: Environment | None = parent
         self.name: str = name
 
-    def define(self, name: str, value: ir.Value, _type: ir.Type) -> str:
-        self.records[name] = (value, _type)
-        return value
+        for record_name, (value, _type) in (records or {}).items():
+            self.define(record_name, value, _type)
+
+    def define(self, name: str, value: ir.Value, _type: ir.Type) -> int:
+        """ Defines (or redefines, keeping its slot) a name and returns its slot index """
+        index: int | None = self.records.get(name)
+        if index is None:
+            index = len(self.slots)
+            self.records[name] = index
+            self.slots.append((value, _type))
+        else:
+            self.slots[index] = (value, _type)
+
+        return index
     
     def lookup(self, name: str) -> tuple[ir.Value, ir.Type]:
         return self.__resolve(name)
     
     def __resolve(self, name: str) -> tuple[ir.Value, ir.Type]:
         if name in self.records:
-            return self.records[name]
+            return self.slots[self.records[name]]
         elif self.parent:
             return self.parent.__resolve(name)
         else:
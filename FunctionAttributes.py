@@ -0,0 +1,125 @@
+from llvmlite import ir
+
+# Memory effects, ordered so the effect of a function is the max of everything it does
+READ_NONE: int = 0
+READ_ONLY: int = 1
+READ_WRITE: int = 2
+
+# C functions Lime declares as builtins, they never call back into Lime code
+C_BUILTINS: set[str] = {'printf'}
+
+# Intrinsics that touch the memory their pointer arguments point to (the names carry a type suffix, ex. `llvm.memset.p0i8.i64`)
+MEMORY_INTRINSICS: tuple[str, ...] = ('llvm.memset', 'llvm.memcpy')
+
+class FunctionAttributes:
+    """
+        Analysis pass over a compiled module that infers attributes for every function it defines:
+        - `nounwind`: Lime has no exceptions and only calls C functions, nothing can unwind
+        - `readnone` / `readonly`: memory the function (or anything it calls) touches besides its own stack and constants
+        - `norecurse`: the function can't reach itself through the call graph
+        Calls to functions declared but not defined here (other pallets / partitions) are assumed to do anything.
+    """
+    def __init__(self, module: ir.Module) -> None:
+        self.module: ir.Module = module
+
+        # Stats, attribute -> number of functions it was added to
+        self.inferred: dict[str, int] = {'nounwind': 0, 'readnone': 0, 'readonly': 0, 'norecurse': 0}
+
+    def infer(self) -> None:
+        functions: list[ir.Function] = [
+            func for func in self.module.functions if not func.is_declaration
+        ]
+
+        effects: dict[ir.Function, int] = {}
+        callees: dict[ir.Function, set[ir.Function]] = {}
+        # Calls something that might call back into this module
+        calls_unknown: set[ir.Function] = set()
+
+        for func in functions:
+            effects[func], callees[func] = self.__scan(func)
+            if any(callee.is_declaration for callee in callees[func]):
+                calls_unknown.add(func)
+                effects[func] = READ_WRITE
+
+        # A function does whatever the functions it calls do, propagate until nothing changes
+        changed: bool = True
+        while changed:
+            changed = False
+            for func in functions:
+                effect: int = max([effects[func], *(effects[c] for c in callees[func] if c in effects)])
+                if effect != effects[func]:
+                    effects[func] = effect
+                    changed = True
+
+        for func in functions:
+            self.__add(func, 'nounwind')
+
+            if effects[func] == READ_NONE:
+                self.__add(func, 'readnone')
+            elif effects[func] == READ_ONLY:
+                self.__add(func, 'readonly')
+
+            if not self.__may_recurse(func, callees, calls_unknown):
+                self.__add(func, 'norecurse')
+
+    def __add(self, func: ir.Function, attribute: str) -> None:
+        func.attributes.add(attribute)
+        self.inferred[attribute] += 1
+
+    def __scan(self, func: ir.Function) -> tuple[int, set[ir.Function]]:
+        """ Returns the memory effect of the function's own instructions and every function it calls """
+        effect: int = READ_NONE
+        callees: set[ir.Function] = set()
+
+        for block in func.blocks:
+            for instr in block.instructions:
+                if isinstance(instr, ir.LoadInstr):
+                    if not self.__is_private_memory(instr.operands[0]):
+                        effect = max(effect, READ_ONLY)
+                elif isinstance(instr, ir.StoreInstr):
+                    if not self.__is_private_memory(instr.operands[1]):
+                        effect = READ_WRITE
+                elif isinstance(instr, ir.CallInstr):
+                    if not isinstance(instr.callee, ir.Function):
+                        effect = READ_WRITE
+                    elif instr.callee.name in C_BUILTINS:
+                        # printf and friends do I/O
+                        effect = READ_WRITE
+                    elif instr.callee.name.startswith(MEMORY_INTRINSICS):
+                        # Array initialization, writes the destination (and memcpy reads the source)
+                        if not self.__is_private_memory(instr.args[0]):
+                            effect = READ_WRITE
+                        if instr.callee.name.startswith('llvm.memcpy') and not self.__is_private_memory(instr.args[1]):
+                            effect = max(effect, READ_ONLY)
+                    elif not instr.callee.name.startswith('llvm.'):
+                        # Other intrinsics Lime uses are pure math (`llvm.powi`, `llvm.pow`) or never return (`llvm.trap`)
+                        callees.add(instr.callee)
+
+        return effect, callees
+
+    def __is_private_memory(self, ptr: ir.Value) -> bool:
+        """ Stack slots of the function itself, or constants nothing can write to """
+        while isinstance(ptr, (ir.GEPInstr, ir.CastInstr)):
+            ptr = ptr.operands[0]
+
+        if isinstance(ptr, ir.AllocaInstr):
+            return True
+        return isinstance(ptr, ir.GlobalVariable) and ptr.global_constant
+
+    def __may_recurse(self, func: ir.Function, callees: dict[ir.Function, set[ir.Function]], calls_unknown: set[ir.Function]) -> bool:
+        """ Walks everything reachable from the function, looking for the function itself or a call leaving the module """
+        seen: set[ir.Function] = set()
+        stack: list[ir.Function] = [func]
+        while stack:
+            current: ir.Function = stack.pop()
+            if current in calls_unknown:
+                return True
+
+            for callee in callees.get(current, ()):
+                if callee is func:
+                    return True
+                if callee not in seen:
+                    seen.add(callee)
+                    stack.append(callee)
+
+        return False
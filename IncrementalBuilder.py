@@ -0,0 +1,246 @@
+from Lexer import Lexer
+from Parser import Parser
+from Compiler import Compiler
+from AST import Program, FunctionStatement, LetStatement
+from ASTCache import ASTCache
+from JITCache import hash_bytes, compiler_version_hash
+from PalletLoader import find_imports, function_signature, global_signature
+
+import llvmlite.binding as llvm
+import json
+import os
+
+DEFAULT_BUILD_DIR: str = ".lime_build"
+MANIFEST_NAME: str = "manifest.json"
+
+class IncrementalBuilder:
+    """
+        Compiles the entry file and every pallet it imports into their own LLVM modules, then links them.
+        The import graph, content hashes, exported function signatures and each module's bitcode are kept
+        in the build directory, so only changed pallets (and the pallets whose imported signatures changed) are recompiled.
+    """
+    def __init__(self, build_dir: str = DEFAULT_BUILD_DIR, ast_cache: ASTCache | None = None, fold_constants: bool = True, fn_attrs: bool = True, bounds_checks: bool = True) -> None:
+        self.build_dir: str = build_dir
+        self.ast_cache: ASTCache | None = ast_cache
+        self.fold_constants: bool = fold_constants
+        self.fn_attrs: bool = fn_attrs
+        self.bounds_checks: bool = bounds_checks
+        self.compiler_hash: str = compiler_version_hash()
+
+        # Compiler options baked into the bitcode
+        self.options: dict[str, bool] = {"fold_constants": fold_constants, "fn_attrs": fn_attrs, "bounds_checks": bounds_checks}
+
+        os.makedirs(self.build_dir, exist_ok=True)
+
+        self.manifest: dict = self.__load_manifest()
+
+        # Absolute paths of the pallets (entry included) in dependency order, dependencies first
+        self.order: list[str] = []
+        self.rebuilt: list[str] = []
+        self.reused: list[str] = []
+
+        self.errors: list[str] = []
+
+    # region Manifest
+    def __load_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.build_dir, MANIFEST_NAME), "r") as f:
+                manifest: dict = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        # A different compiler (or compiler options) invalidates every module
+        if manifest.get("compiler") != self.compiler_hash or manifest.get("options") != self.options:
+            return {"compiler": self.compiler_hash, "options": self.options, "pallets": {}}
+
+        return manifest
+
+    def __save_manifest(self) -> None:
+        manifest_path: str = os.path.join(self.build_dir, MANIFEST_NAME)
+        with open(f"{manifest_path}.tmp", "w") as f:
+            json.dump(self.manifest, f, indent=4)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    def __bitcode_path(self, path: str) -> str:
+        return os.path.join(self.build_dir, f"{hash_bytes(path.encode('utf8'))}.bc")
+    # endregion
+
+    def __parse(self, path: str, source: str) -> Program | None:
+        program: Program | None = self.ast_cache.load(source) if self.ast_cache is not None else None
+        if program is not None:
+            return program
+
+        p: Parser = Parser(lexer=Lexer(source=source))
+        program = p.parse_program()
+        if len(p.errors) > 0:
+            self.errors.append(f"Error with pallet: {path}")
+            self.errors.extend(p.errors)
+            return None
+
+        if self.ast_cache is not None:
+            self.ast_cache.store(source, program)
+
+        return program
+
+    def __discover(self, entry_path: str) -> tuple[dict[str, list[str]], dict[str, str], dict[str, Program]]:
+        """ Walks the import graph, returns (imports, content hashes, programs parsed along the way) """
+        graph: dict[str, list[str]] = {}
+        hashes: dict[str, str] = {}
+        programs: dict[str, Program] = {}
+
+        visiting: set[str] = set()
+
+        def visit(path: str) -> None:
+            if path in graph:
+                return
+            if path in visiting:
+                self.errors.append(f"Import cycle detected at `{path}`")
+                return
+            visiting.add(path)
+
+            with open(path, "r") as f:
+                source: str = f.read()
+            hashes[path] = hash_bytes(source.encode("utf8"))
+
+            record: dict | None = self.manifest["pallets"].get(path)
+            if record is not None and record["hash"] == hashes[path]:
+                # Unchanged pallet, its imports can't have changed either
+                imports: list[str] = record["imports"]
+            else:
+                program: Program | None = self.__parse(path, source)
+                if program is None:
+                    visiting.discard(path)
+                    return
+
+                programs[path] = program
+                # Imports are resolved relative to the working directory, like the Compiler does
+                imports = [os.path.abspath(p) for p in find_imports(program.statements)]
+
+            for imported in imports:
+                visit(imported)
+
+            visiting.discard(path)
+            graph[path] = imports
+            self.order.append(path)
+
+        visit(os.path.abspath(entry_path))
+
+        return graph, hashes, programs
+
+    def __transitive_imports(self, graph: dict[str, list[str]], path: str) -> list[str]:
+        seen: list[str] = []
+        stack: list[str] = list(reversed(graph[path]))
+        while stack:
+            dep: str = stack.pop()
+            if dep in seen:
+                continue
+            seen.append(dep)
+            stack.extend(reversed(graph[dep]))
+
+        return seen
+
+    def __compile(self, path: str, program: Program, declarations: list[list], global_declarations: list[list]) -> bytes | None:
+        """ Compiles one pallet into its own module and returns its bitcode """
+        c: Compiler = Compiler(module_name=path, inline_imports=False, fold_constants=self.fold_constants, fn_attrs=self.fn_attrs, bounds_checks=self.bounds_checks)
+        for name, value_type in global_declarations:
+            c.declare_global(name, value_type)
+        for name, param_types, return_type in declarations:
+            c.declare_function(name, param_types, return_type)
+
+        c.compile(node=program)
+        c.module.triple = llvm.get_default_triple()
+
+        if len(c.errors) > 0:
+            self.errors.append(f"Error compiling pallet: {path}")
+            self.errors.extend(c.errors)
+            return None
+
+        module_ref: llvm.ModuleRef = llvm.parse_assembly(str(c.module))
+        module_ref.verify()
+
+        return module_ref.as_bitcode()
+
+    def build(self, entry_path: str) -> llvm.ModuleRef | None:
+        """ Builds and links every module, returns None (and fills `errors`) if anything failed """
+        graph, hashes, programs = self.__discover(entry_path)
+        if len(self.errors) > 0:
+            return None
+
+        # Other modules only see a pallet through its function and global declarations, so a dependent is
+        # recompiled only when the signatures it imports change, not when a function body does
+        changed_signatures: set[str] = set()
+
+        bitcodes: dict[str, bytes] = {}
+        for path in self.order:
+            record: dict | None = self.manifest["pallets"].get(path)
+            dirty: bool = (
+                record is None
+                or record["hash"] != hashes[path]
+                or not os.path.exists(self.__bitcode_path(path))
+                or any(dep in changed_signatures for dep in self.__transitive_imports(graph, path))
+            )
+            if not dirty:
+                with open(self.__bitcode_path(path), "rb") as f:
+                    bitcodes[path] = f.read()
+                self.reused.append(path)
+                continue
+
+            program: Program | None = programs.get(path)
+            if program is None:
+                # Unchanged but a dependency changed, parse it (usually straight from the AST cache)
+                with open(path, "r") as f:
+                    program = self.__parse(path, f.read())
+                if program is None:
+                    return None
+
+            declarations: list[list] = [
+                decl for dep in self.__transitive_imports(graph, path)
+                for decl in self.manifest["pallets"][dep]["functions"]
+            ]
+            global_declarations: list[list] = [
+                decl for dep in self.__transitive_imports(graph, path)
+                for decl in self.manifest["pallets"][dep]["globals"]
+            ]
+
+            bitcode: bytes | None = self.__compile(path, program, declarations, global_declarations)
+            if bitcode is None:
+                return None
+
+            with open(self.__bitcode_path(path), "wb") as f:
+                f.write(bitcode)
+            bitcodes[path] = bitcode
+
+            functions: list[list] = [
+                function_signature(stmt) for stmt in program.statements if isinstance(stmt, FunctionStatement)
+            ]
+            global_vars: list[list] = [
+                global_signature(stmt) for stmt in program.statements if isinstance(stmt, LetStatement)
+            ]
+            if record is None or record["functions"] != functions or record["globals"] != global_vars:
+                changed_signatures.add(path)
+
+            self.manifest["pallets"][path] = {
+                "hash": hashes[path],
+                "imports": graph[path],
+                "functions": functions,
+                "globals": global_vars
+            }
+            self.rebuilt.append(path)
+
+        self.__save_manifest()
+
+        # The entry file is last in dependency order, link every pallet into it
+        linked: llvm.ModuleRef = llvm.parse_bitcode(bitcodes[self.order[-1]])
+        for path in self.order[:-1]:
+            linked.link_in(llvm.parse_bitcode(bitcodes[path]))
+
+        if self.fn_attrs:
+            # Every call between pallets is inside the linked module now, only `main` has to stay visible
+            for func in linked.functions:
+                if not func.is_declaration and func.name != "main":
+                    func.linkage = llvm.Linkage.internal
+            for global_var in linked.global_variables:
+                if not global_var.is_declaration:
+                    global_var.linkage = llvm.Linkage.internal
+
+        return linked
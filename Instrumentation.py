@@ -0,0 +1,136 @@
+from llvmlite import ir
+import llvmlite.binding as llvm
+
+from JITCache import hash_bytes
+
+from ctypes import c_uint64
+import json
+import os
+import time
+
+COUNTER_PREFIX: str = "__lime_count"
+
+# `--instrument` writes the counts next to the entry file (`main.lime` -> `main.limeprof`), `--pgo` reads them back
+PROFILE_EXTENSION: str = ".limeprof"
+PROFILE_FORMAT_VERSION: int = 1
+
+# Counters of each kind of site. Branch sites count how often their condition was evaluated and how often it held,
+# loops count how often they were reached, entered (the first condition held) and looped back (the condition at the end held)
+SITE_COUNTERS: dict[str, tuple[str, ...]] = {
+    'function': ('calls',),
+    'if': ('evaluated', 'taken'),
+    'while': ('reached', 'entered', 'backedges'),
+    'for': ('reached', 'entered', 'backedges'),
+}
+
+# Rows printed per section of the report, the hottest first
+REPORT_ROWS: int = 20
+
+class Instrumentation:
+    """
+        `--instrument`: a global i64 counter per function entry, branch and loop, incremented inline by the generated code.
+        After `main` returns the counters are read straight out of the JIT's memory and mapped back to Lime names and lines.
+    """
+    def __init__(self, module: ir.Module) -> None:
+        self.module: ir.Module = module
+
+        # Site key -> {"kind", "function", "location", "counters": counter name -> global}
+        self.sites: dict[str, dict] = {}
+
+    def site(self, key: str, kind: str, function: str, location: str) -> None:
+        """ Declares a site and one zero initialized global per counter of its kind """
+        counters: dict[str, ir.GlobalVariable] = {}
+        for counter in SITE_COUNTERS[kind]:
+            # External linkage, the optimizer can't delete counters nothing in the module reads
+            gv: ir.GlobalVariable = ir.GlobalVariable(self.module, ir.IntType(64), f"{COUNTER_PREFIX}.{len(self.sites)}.{counter}")
+            gv.initializer = ir.Constant(ir.IntType(64), 0)
+            counters[counter] = gv
+
+        self.sites[key] = {"kind": kind, "function": function, "location": location, "counters": counters}
+
+    def count(self, builder: ir.IRBuilder, key: str, counter: str, condition: ir.Value | None = None) -> None:
+        """ Increments a counter by one, or by a bool condition (counts how often it held without a branch of its own) """
+        gv: ir.GlobalVariable = self.sites[key]["counters"][counter]
+
+        amount: ir.Value = builder.zext(condition, ir.IntType(64)) if condition is not None else ir.Constant(ir.IntType(64), 1)
+        builder.store(builder.add(builder.load(gv), amount), gv)
+
+    def read(self, engine: llvm.ExecutionEngine) -> dict[str, dict[str, int]]:
+        """ Site key -> counter name -> count, from a finalized engine whose `main` has returned """
+        return {
+            key: {counter: c_uint64.from_address(engine.get_global_value_address(gv.name)).value for counter, gv in site["counters"].items()}
+            for key, site in self.sites.items()
+        }
+
+    # region Report
+    def report(self, counts: dict[str, dict[str, int]]) -> None:
+        """ Prints the hottest functions, loops and branches """
+        functions: list[tuple[str, dict]] = self.__hottest(counts, ('function',), 'calls')
+        loops: list[tuple[str, dict]] = self.__hottest(counts, ('while', 'for'), 'entered', 'backedges')
+        branches: list[tuple[str, dict]] = self.__hottest(counts, ('if',), 'evaluated')
+
+        # Wide enough for the longest name or location
+        width: int = max([40] + [len(site['function']) for _, site in functions] + [len(self.__label(site)) for _, site in loops + branches])
+
+        print("\n==== INSTRUMENTATION: FUNCTION CALLS ====")
+        for key, site in functions:
+            print(f"{site['function']:<{width}} {counts[key]['calls']:>14,}")
+
+        if len(loops) > 0:
+            print("\n==== INSTRUMENTATION: LOOPS ====")
+            print(f"{'loop':<{width}} {'reached':>14} {'iterations':>14} {'avg trip':>10}")
+            for key, site in loops:
+                count: dict[str, int] = counts[key]
+                iterations: int = count['entered'] + count['backedges']
+                trip: float = iterations / count['reached'] if count['reached'] > 0 else 0.0
+                print(f"{self.__label(site):<{width}} {count['reached']:>14,} {iterations:>14,} {trip:>10.1f}")
+
+        if len(branches) > 0:
+            print("\n==== INSTRUMENTATION: BRANCHES ====")
+            print(f"{'if':<{width}} {'evaluated':>14} {'taken':>14} {'taken %':>10}")
+            for key, site in branches:
+                count = counts[key]
+                taken: float = count['taken'] / count['evaluated'] * 100 if count['evaluated'] > 0 else 0.0
+                print(f"{self.__label(site):<{width}} {count['evaluated']:>14,} {count['taken']:>14,} {taken:>9.1f}%")
+
+    def __hottest(self, counts: dict[str, dict[str, int]], kinds: tuple[str, ...], *counters: str) -> list[tuple[str, dict]]:
+        """ The sites of some kinds that ran at all, sorted by the sum of some of their counters """
+        sites: list[tuple[str, dict]] = [
+            (key, site) for key, site in self.sites.items()
+            if site["kind"] in kinds and any(counts[key].values())
+        ]
+        sites.sort(key=lambda item: sum(counts[item[0]][counter] for counter in counters), reverse=True)
+        return sites[:REPORT_ROWS]
+
+    def __label(self, site: dict) -> str:
+        return f"{site['kind']} at {site['location']} in {site['function']}"
+    # endregion
+
+    def profile(self, counts: dict[str, dict[str, int]], source: str) -> dict:
+        """ The counts of every site in the format `--pgo` reads, with the hash of the source they were recorded for """
+        return {
+            "version": PROFILE_FORMAT_VERSION,
+            "source_hash": hash_bytes(source.encode("utf8")),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sites": {
+                key: {"kind": site["kind"], "function": site["function"], "location": site["location"], "counts": counts[key]}
+                for key, site in self.sites.items()
+            },
+        }
+
+    def write_profile(self, output_path: str, counts: dict[str, dict[str, int]], source: str) -> None:
+        with open(output_path, "w") as f:
+            json.dump(self.profile(counts, source), f, indent=4)
+
+def profile_path(entry_path: str) -> str:
+    return f"{os.path.splitext(entry_path)[0]}{PROFILE_EXTENSION}"
+
+def load_profile(file_path: str) -> dict | None:
+    """ Returns a profile written by `write_profile`, None if it's missing or written by a different format version """
+    try:
+        with open(file_path, "r") as f:
+            profile: dict = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return profile if profile.get("version") == PROFILE_FORMAT_VERSION else None
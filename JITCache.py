@@ -0,0 +1,149 @@
+import llvmlite.binding as llvm
+import hashlib
+import json
+import os
+
+DEFAULT_CACHE_DIR: str = os.path.join(os.path.expanduser("~"), ".cache", "lime")
+DEFAULT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+OBJECT_EXTENSION: str = ".o"
+MANIFEST_EXTENSION: str = ".deps.json"
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(file_path: str) -> str | None:
+    """ Hashes the contents of a file, returns None if the file can't be read """
+    try:
+        with open(file_path, "rb") as f:
+            return hash_bytes(f.read())
+    except OSError:
+        return None
+
+def compiler_version_hash() -> str:
+    """ Hashes the compiler's own sources and the LLVM version so any compiler change invalidates the cache """
+    h = hashlib.sha256()
+    h.update(".".join(str(v) for v in llvm.llvm_version_info).encode("utf8"))
+
+    compiler_dir: str = os.path.dirname(os.path.abspath(__file__))
+    for file_name in sorted(os.listdir(compiler_dir)):
+        if file_name.endswith(".py"):
+            h.update(file_name.encode("utf8"))
+            h.update((hash_file(os.path.join(compiler_dir, file_name)) or "").encode("utf8"))
+
+    return h.hexdigest()
+
+
+class JITCache:
+    """ Persistent on-disk cache of MCJIT emitted machine code, keyed by source + compiler hashes """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+
+        self.compiler_hash: str = compiler_version_hash()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # region Keys
+    def __manifest_path(self, entry_path: str) -> str:
+        """ The manifest remembers which pallets an entry file imported the last time it was compiled """
+        name: str = hash_bytes(f"{os.getcwd()}|{os.path.abspath(entry_path)}".encode("utf8"))
+        return os.path.join(self.cache_dir, f"{name}{MANIFEST_EXTENSION}")
+
+    def __object_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{OBJECT_EXTENSION}")
+
+    def compute_key(self, source: str, pallet_paths: list[str], opt_level: int, triple: str, flags: list[str] | None = None) -> str | None:
+        """ Hashes the entry source, every (transitively) imported pallet, the opt level, the triple and any codegen flags """
+        h = hashlib.sha256()
+        h.update(self.compiler_hash.encode("utf8"))
+        h.update(f"|O{opt_level}|{triple}|{','.join(flags or [])}|".encode("utf8"))
+        h.update(source.encode("utf8"))
+
+        for pallet_path in pallet_paths:
+            pallet_hash: str | None = hash_file(pallet_path)
+            if pallet_hash is None:
+                return None
+
+            h.update(f"|{os.path.abspath(pallet_path)}:{pallet_hash}".encode("utf8"))
+
+        return h.hexdigest()
+
+    def lookup_key(self, entry_path: str, source: str, opt_level: int, triple: str, flags: list[str] | None = None) -> str | None:
+        """ Computes the key for a warm run using the pallets recorded by the previous compile """
+        try:
+            with open(self.__manifest_path(entry_path), "r") as f:
+                pallet_paths: list[str] = json.load(f)["pallets"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return self.compute_key(source, pallet_paths, opt_level, triple, flags)
+
+    def record_dependencies(self, entry_path: str, pallet_paths: list[str]) -> None:
+        self.__write(self.__manifest_path(entry_path), json.dumps({
+            "entry": os.path.abspath(entry_path),
+            "pallets": [os.path.abspath(p) for p in pallet_paths]
+        }).encode("utf8"))
+    # endregion
+
+    # region Objects
+    def load(self, key: str) -> bytes | None:
+        """ Returns the cached object for the key and marks it as recently used """
+        object_path: str = self.__object_path(key)
+        try:
+            with open(object_path, "rb") as f:
+                data: bytes = f.read()
+        except OSError:
+            return None
+
+        os.utime(object_path)
+        return data
+
+    def store(self, key: str, data: bytes) -> None:
+        self.__write(self.__object_path(key), data)
+        self.evict()
+
+    def evict(self) -> None:
+        """ Removes the least recently used objects until the cache fits in `max_bytes` """
+        entries: list[tuple[float, int, str]] = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(OBJECT_EXTENSION):
+                continue
+
+            object_path: str = os.path.join(self.cache_dir, file_name)
+            try:
+                stat: os.stat_result = os.stat(object_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, object_path))
+
+        total_bytes: int = sum(size for _, size, _ in entries)
+        for _, size, object_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+
+            try:
+                os.remove(object_path)
+            except OSError:
+                continue
+            total_bytes -= size
+
+    def __write(self, path: str, data: bytes) -> None:
+        """ Writes through a temp file so concurrent runs never read a half written entry """
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    # endregion
+
+    # region MCJIT Hooks
+    def attach(self, engine: llvm.ExecutionEngine, key: str) -> None:
+        """ Installs the llvmlite object cache hooks so MCJIT reads/writes machine code for this key """
+        def notify(module: llvm.ModuleRef, buffer: bytes) -> None:
+            self.store(key, buffer)
+
+        def getbuffer(module: llvm.ModuleRef) -> bytes | None:
+            return self.load(key)
+
+        engine.set_object_cache(notify, getbuffer)
+    # endregion
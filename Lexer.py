@@ -1,9 +1,81 @@
-from Token import Token, TokenType, lookup_ident
-from typing import Any
+from Token import Token, TokenType, KEYWORDS, ALT_KEYWORDS, TYPE_KEYWORDS, NUMBER_SUFFIXES, lookup_ident
+from typing import Any, Iterator, TextIO
+from enum import Enum
+import re
+import sys
+
+class ScannerType(Enum):
+    # Original char-by-char scanner
+    CLASSIC = "CLASSIC"
+
+    # Compiled master regex + dispatch tables
+    TABLE = "TABLE"
+
+# Number of characters the table scanner reads at a time from a stream
+CHUNK_SIZE: int = 64 * 1024
+
+# A number this close to the end of a chunk may be missing (part of) its suffix (`2.5f` | `64`)
+MAX_SUFFIX_LENGTH: int = max(len(suffix) for suffix in NUMBER_SUFFIXES)
+
+# Every token kind the table scanner can match, tried in order at the current position
+MASTER_PATTERN: re.Pattern = re.compile(r"""
+    (?P<WS>[ \t\r\n]+)
+  | (?P<NUMBER>[0-9]+(?:\.[0-9]*)?(?P<SUFFIX>(?:""" + "|".join(NUMBER_SUFFIXES) + r""")(?!\w))?)
+  | (?P<IDENT>[A-Za-z_]\w*)
+  | (?P<STRING>"[^"]*"?)
+  | (?P<DOUBLE>->|\+\+|--|[-+*/<>=!]=)
+  | (?P<SINGLE>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Same precedence as `lookup_ident`: KEYWORDS > ALT_KEYWORDS > TYPE_KEYWORDS > IDENT
+IDENT_TABLE: dict[str, TokenType] = {
+    **{t: TokenType.TYPE for t in TYPE_KEYWORDS},
+    **ALT_KEYWORDS,
+    **KEYWORDS
+}
+
+SYMBOL_TABLE: dict[str, TokenType] = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.ASTERISK,
+    '/': TokenType.SLASH,
+    '^': TokenType.POW,
+    '%': TokenType.MODULUS,
+    '<': TokenType.LT,
+    '>': TokenType.GT,
+    '=': TokenType.EQ,
+    '!': TokenType.BANG,
+    ':': TokenType.COLON,
+    ';': TokenType.SEMICOLON,
+    ',': TokenType.COMMA,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET,
+
+    '+=': TokenType.PLUS_EQ,
+    '++': TokenType.PLUS_PLUS,
+    '->': TokenType.ARROW,
+    '--': TokenType.MINUS_MINUS,
+    '-=': TokenType.MINUS_EQ,
+    '*=': TokenType.MUL_EQ,
+    '/=': TokenType.DIV_EQ,
+    '<=': TokenType.LT_EQ,
+    '>=': TokenType.GT_EQ,
+    '==': TokenType.EQ_EQ,
+    '!=': TokenType.NOT_EQ,
+}
 
 class Lexer:
-    def __init__(self, source: str) -> None:
-        self.source = source
+    def __init__(self, source: str | TextIO, scanner: ScannerType = ScannerType.TABLE) -> None:
+        # The classic scanner indexes into the source, so it needs the whole text in memory
+        if scanner is ScannerType.CLASSIC and not isinstance(source, str):
+            source = source.read()
+
+        self.source: str | TextIO = source
+        self.scanner: ScannerType = scanner
 
         self.position: int = -1
         self.read_position: int = 0
@@ -11,7 +83,13 @@ class Lexer:
 
         self.current_char: str | None = None
 
-        self.__read_char()
+        if scanner is ScannerType.CLASSIC:
+            self.__read_char()
+
+        self.__table_tokens: Iterator[Token] = self.__scan_table()
+
+        # Backs the iterator protocol, stops after the EOF token
+        self.__stream: Iterator[Token] = self.__iter_tokens()
 
     def __read_char(self) -> None:
         """ Reads the next char in the source input file """
@@ -70,6 +148,20 @@ class Lexer:
             if self.current_char is None:
                 break
 
+        if self.current_char is not None and self.__is_letter(self.current_char):
+            # Type suffix (ex. `10i64`), only when it is the whole rest of the word
+            end: int = self.position
+            while end < len(self.source) and (self.source[end].isalnum() or self.source[end] == '_'):
+                end += 1
+
+            suffix: str = self.source[self.position:end]
+            if suffix in NUMBER_SUFFIXES:
+                for _ in suffix:
+                    self.__read_char()
+
+                tt: TokenType = TokenType.FLOAT if dot_count > 0 or suffix[0] == 'f' else TokenType.INT
+                return self.__new_token(tt, output + suffix)
+
         if dot_count == 0:
             return self.__new_token(TokenType.INT, int(output))
         else:
@@ -80,7 +172,7 @@ class Lexer:
         while self.current_char is not None and (self.__is_letter(self.current_char) or self.current_char.isalnum()):
             self.__read_char()
         
-        return self.source[position:self.position]
+        return sys.intern(self.source[position:self.position])
     
     def __read_string(self) -> str:
         position: int = self.position + 1
@@ -90,10 +182,122 @@ class Lexer:
                 break
         return self.source[position:self.position]
     
-    def next_token(self) -> list[Token]:
+    def next_token(self) -> Token:
         """
             Main function for executing the Lexer
         """
+        if self.scanner is ScannerType.TABLE:
+            return next(self.__table_tokens)
+
+        return self.__next_classic_token()
+
+    def __iter__(self) -> Iterator[Token]:
+        # Hand out the underlying generator so consumers skip the Python level __next__ call
+        return self.__stream
+
+    def __next__(self) -> Token:
+        """ Iterates the token stream, ending after (and including) the first EOF token """
+        return next(self.__stream)
+
+    def __iter_tokens(self) -> Iterator[Token]:
+        # The table scanner is already a generator, so hand its tokens straight through
+        tokens: Iterator[Token] = self.__table_tokens if self.scanner is ScannerType.TABLE else iter(self.next_token, None)
+
+        for tok in tokens:
+            yield tok
+            if tok.type == TokenType.EOF:
+                return
+
+    def __source_chunks(self) -> Iterator[str]:
+        """ Yields the source text, a whole string at once or a stream in CHUNK_SIZE pieces """
+        if isinstance(self.source, str):
+            yield self.source
+            return
+
+        while True:
+            chunk: str = self.source.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __scan_table(self) -> Iterator[Token]:
+        """
+            Table driven scanner, matches whole tokens with the master pattern and dispatches on their kind.
+            Produces exactly the same Token stream (types, literals, lines and positions) as the classic scanner.
+
+            Streams are scanned chunk by chunk. A match touching the end of a (non-final) chunk may be cut short,
+            so it is carried over and re-scanned together with the next chunk. Numbers ending within a suffix's
+            length of the end are carried too, the rest of their suffix may be in the next chunk.
+        """
+        line_no: int = 1
+
+        chunks: Iterator[str] = self.__source_chunks()
+        next_chunk: str | None = next(chunks, None)
+
+        # Absolute position of buffer[0] in the source
+        offset: int = 0
+        carry: str = ""
+
+        while next_chunk is not None:
+            buffer: str = carry + next_chunk
+            buffer_len: int = len(buffer)
+
+            next_chunk = next(chunks, None)
+            is_final: bool = next_chunk is None
+
+            carry = ""
+            for match_ in MASTER_PATTERN.finditer(buffer):
+                kind: str = match_.lastgroup
+
+                if not is_final and (match_.end() == buffer_len or (kind == 'NUMBER' and buffer_len - match_.end() <= MAX_SUFFIX_LENGTH)):
+                    carry = buffer[match_.start():]
+                    break
+
+                text: str = match_.group()
+
+                if kind == 'IDENT':
+                    # Identifiers are interned so repeated names share one string (and compare by identity in dict lookups)
+                    yield Token(IDENT_TABLE.get(text, TokenType.IDENT), sys.intern(text), line_no, offset + match_.end())
+                elif kind == 'SINGLE':
+                    yield Token(SYMBOL_TABLE.get(text, TokenType.ILLEGAL), text, line_no, offset + match_.start())
+                elif kind == 'WS':
+                    if '\n' in text:
+                        line_no += text.count('\n')
+                elif kind == 'DOUBLE':
+                    yield Token(SYMBOL_TABLE[text], text, line_no, offset + match_.end() - 1)
+                elif kind == 'NUMBER':
+                    end: int = match_.end()
+                    suffix: str | None = match_.group('SUFFIX')
+                    if suffix is not None:
+                        # Suffixed numbers keep their text, the Parser splits the type off
+                        yield Token(TokenType.FLOAT if '.' in text or suffix[0] == 'f' else TokenType.INT, text, line_no, offset + end)
+                    elif end < buffer_len and buffer[end] == '.':
+                        print(f"Too many decimals in number on line {line_no}, position {offset + end}")
+                        yield Token(TokenType.ILLEGAL, text, line_no, offset + end)
+                    elif '.' in text:
+                        yield Token(TokenType.FLOAT, float(text), line_no, offset + end)
+                    else:
+                        yield Token(TokenType.INT, int(text), line_no, offset + end)
+                else:
+                    if len(text) > 1 and text[-1] == '"':
+                        yield Token(TokenType.STRING, text[1:-1], line_no, offset + match_.end() - 1)
+                    else:
+                        # Unterminated string, runs to the end of the input and pushes EOF one past it
+                        yield Token(TokenType.STRING, text[1:], line_no, offset + buffer_len)
+                        offset += 1
+
+            offset += buffer_len - len(carry)
+
+        # Like the classic scanner, every EOF token still advances the position by one
+        eof_position: int = offset
+        while True:
+            yield Token(TokenType.EOF, "", line_no, eof_position)
+            eof_position += 1
+
+    def __next_classic_token(self) -> Token:
+        """
+            Original char-by-char scanner
+        """
         tok: Token = None
 
         # Skip the whitespace and ignored characters
@@ -197,6 +401,10 @@ class Lexer:
                 tok = self.__new_token(TokenType.LBRACE, self.current_char)
             case '}':
                 tok = self.__new_token(TokenType.RBRACE, self.current_char)
+            case '[':
+                tok = self.__new_token(TokenType.LBRACKET, self.current_char)
+            case ']':
+                tok = self.__new_token(TokenType.RBRACKET, self.current_char)
             case '"':
                 tok = self.__new_token(TokenType.STRING, self.__read_string())
             case None:
@@ -0,0 +1,59 @@
+import llvmlite.binding as llvm
+import time
+
+# Inlining thresholds LLVM uses for each optimization level (see llvm::computeThresholdFromOptLevels)
+INLINE_THRESHOLDS: dict[int, int] = {
+    0: 0,
+    1: 225,
+    2: 225,
+    3: 250
+}
+
+class Optimizer:
+    def __init__(self, target_machine: llvm.TargetMachine, opt_level: int = 0) -> None:
+        self.target_machine: llvm.TargetMachine = target_machine
+        self.opt_level: int = opt_level
+
+    def __create_builder(self) -> llvm.PassManagerBuilder:
+        """ Creates the pass manager builder for the configured optimization level """
+        pmb: llvm.PassManagerBuilder = llvm.create_pass_manager_builder()
+        pmb.opt_level = self.opt_level
+        pmb.size_level = 0
+        pmb.inlining_threshold = INLINE_THRESHOLDS[self.opt_level]
+
+        # Loop passes (unroll + vectorize) only pay off at the higher levels
+        pmb.disable_unroll_loops = self.opt_level < 2
+        pmb.loop_vectorize = self.opt_level >= 2
+        pmb.slp_vectorize = self.opt_level >= 3
+
+        return pmb
+
+    def optimize(self, module: llvm.ModuleRef) -> float:
+        """ Runs the function + module pass pipeline on the parsed module and returns the time it took (ms) """
+        if self.opt_level == 0:
+            return 0.0
+
+        st: float = time.perf_counter()
+
+        pmb: llvm.PassManagerBuilder = self.__create_builder()
+
+        # Function Passes (mem2reg/SROA, instcombine, simplifycfg, ...)
+        fpm: llvm.FunctionPassManager = llvm.create_function_pass_manager(module)
+        self.target_machine.add_analysis_passes(fpm)
+        pmb.populate(fpm)
+
+        # Module Passes (inlining, GVN, loop passes, dead function elimination, ...)
+        mpm: llvm.ModulePassManager = llvm.create_module_pass_manager()
+        self.target_machine.add_analysis_passes(mpm)
+        pmb.populate(mpm)
+
+        fpm.initialize()
+        for func in module.functions:
+            fpm.run(func)
+        fpm.finalize()
+
+        mpm.run(module)
+
+        et: float = time.perf_counter()
+
+        return (et - st) * 1000
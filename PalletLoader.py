@@ -0,0 +1,141 @@
+from Lexer import Lexer
+from Parser import Parser
+from AST import Node, Statement, Program, ImportStatement, FunctionStatement, LetStatement, BlockStatement, IfStatement, WhileStatement, ForStatement
+from ASTCache import ASTCache, serialize, deserialize
+
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+import os
+
+def find_imports(statements: list[Statement]) -> list[str]:
+    """ Returns the file paths of every import statement in the statements (including nested blocks), in order """
+    file_paths: list[str] = []
+
+    stack: list[Node] = list(reversed(statements))
+    while stack:
+        stmt: Node = stack.pop()
+        if stmt is None:
+            continue
+
+        match stmt.kind:
+            case ImportStatement.kind:
+                file_paths.append(stmt.file_path)
+            case BlockStatement.kind:
+                stack.extend(reversed(stmt.statements))
+            case FunctionStatement.kind | WhileStatement.kind | ForStatement.kind:
+                stack.append(stmt.body)
+            case IfStatement.kind:
+                stack.append(stmt.alternative)
+                stack.append(stmt.consequence)
+
+    return file_paths
+
+def function_signature(stmt: FunctionStatement) -> list:
+    """ Returns [name, parameter types, return type], everything another module needs to declare the function """
+    return [stmt.name.value, [p.value_type for p in stmt.parameters], stmt.return_type]
+
+def global_signature(stmt: LetStatement) -> list:
+    """ Returns [name, type] of a top level `let`, everything another module needs to declare the global """
+    return [stmt.name.value, stmt.value_type]
+
+def parse_pallet(file_path: str) -> tuple[str, bytes | None, list[str]]:
+    """
+        Worker entry point: reads and parses one pallet.
+        Returns (source, serialized Program or None, parser errors). The AST travels back in the compact
+        ASTCache format, which is much cheaper to ship between processes than pickling the node objects.
+    """
+    with open(os.path.abspath(file_path), "r") as f:
+        pallet_code: str = f.read()
+
+    p: Parser = Parser(lexer=Lexer(source=pallet_code))
+    program: Program = p.parse_program()
+    if len(p.errors) > 0:
+        return pallet_code, None, p.errors
+
+    return pallet_code, serialize(program), []
+
+
+class PalletLoader:
+    """ Pre-pass that walks the import graph and parses every pallet before codegen, optionally in a process pool """
+    def __init__(self, workers: int = 1, ast_cache: ASTCache | None = None) -> None:
+        self.workers: int = workers
+        self.ast_cache: ASTCache | None = ast_cache
+
+        self.pallets: dict[str, Program] = {}
+        self.errors: dict[str, list[str]] = {}
+
+    def __cached(self, file_path: str) -> Program | None:
+        """ Tries the AST cache in this process before paying for a worker round trip """
+        if self.ast_cache is None:
+            return None
+
+        try:
+            with open(os.path.abspath(file_path), "r") as f:
+                return self.ast_cache.load(f.read())
+        except OSError:
+            return None
+
+    def __finish(self, file_path: str, pallet_code: str, data: bytes | None, errors: list[str]) -> list[str]:
+        """ Records a parsed pallet and returns the imports it discovered """
+        if data is None:
+            self.errors[file_path] = errors
+            return []
+
+        program: Program = deserialize(data)
+        self.pallets[file_path] = program
+
+        if self.ast_cache is not None:
+            self.ast_cache.store(pallet_code, program)
+
+        return find_imports(program.statements)
+
+    def load(self, program: Program) -> dict[str, Program]:
+        """ Parses every pallet the program (transitively) imports, returns them keyed by their import path """
+        seen: set[str] = set()
+        pending: list[str] = []
+
+        def discover(file_paths: list[str]) -> None:
+            for file_path in file_paths:
+                if file_path not in seen:
+                    seen.add(file_path)
+                    pending.append(file_path)
+
+        def take_uncached() -> list[str]:
+            """ Resolves pending pallets from the AST cache and returns the ones that still need parsing """
+            to_parse: list[str] = []
+            while pending:
+                file_path: str = pending.pop(0)
+
+                cached: Program | None = self.__cached(file_path)
+                if cached is None:
+                    to_parse.append(file_path)
+                    continue
+
+                self.pallets[file_path] = cached
+                discover(find_imports(cached.statements))
+
+            return to_parse
+
+        discover(find_imports(program.statements))
+
+        if self.workers <= 1:
+            # Serial pre-pass, no process pool overhead
+            while pending:
+                for file_path in take_uncached():
+                    discover(self.__finish(file_path, *parse_pallet(file_path)))
+            return self.pallets
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            running: dict[Future, str] = {}
+            while pending or running:
+                for file_path in take_uncached():
+                    running[pool.submit(parse_pallet, file_path)] = file_path
+
+                if not running:
+                    continue
+
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path: str = running.pop(future)
+                    discover(self.__finish(file_path, *future.result()))
+
+        return self.pallets
@@ -0,0 +1,164 @@
+from Compiler import Compiler
+from Optimizer import Optimizer
+from AST import Node, NodeType, Program, FunctionStatement, LetStatement, ImportStatement
+from ASTCache import encode, serialize, deserialize
+from PalletLoader import function_signature, global_signature
+
+from concurrent.futures import ProcessPoolExecutor, Future
+import llvmlite.binding as llvm
+import marshal
+import time
+
+def compile_partition(index: int, data: bytes, declarations: list[list], global_declarations: list[list], opt_level: int, reloc: str, entry_symbol: str | None, fold_constants: bool = True, fn_attrs: bool = True, bounds_checks: bool = True) -> tuple[bytes | None, list[str], float]:
+    """
+        Worker entry point: compiles one partition of functions into its own module, optimizes it and emits object code.
+        Functions and globals living in other partitions are declared as externals, the objects get linked back together
+        afterwards (so functions keep external linkage here, even with `fn_attrs`).
+        Returns (object code or None, compiler errors, time spent in ms).
+    """
+    st: float = time.perf_counter()
+
+    llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    c: Compiler = Compiler(module_name=f"partition_{index}", inline_imports=False, fold_constants=fold_constants, fn_attrs=fn_attrs, bounds_checks=bounds_checks)
+    for name, value_type in global_declarations:
+        c.declare_global(name, value_type)
+    for name, param_types, return_type in declarations:
+        c.declare_function(name, param_types, return_type)
+
+    c.compile(node=deserialize(data))
+    if len(c.errors) > 0:
+        return None, c.errors, (time.perf_counter() - st) * 1000
+
+    c.module.triple = llvm.get_default_triple()
+
+    module: llvm.ModuleRef = llvm.parse_assembly(str(c.module))
+    module.verify()
+
+    target_machine: llvm.TargetMachine = llvm.Target.from_default_triple().create_target_machine(opt=opt_level, reloc=reloc)
+    module.data_layout = str(target_machine.target_data)
+
+    Optimizer(target_machine=target_machine, opt_level=opt_level).optimize(module)
+
+    if entry_symbol is not None:
+        # Executables hand `main` over to the C shim, rename the definition and any declaration of it
+        for func in module.functions:
+            if func.name == "main":
+                func.name = entry_symbol
+
+    return target_machine.emit_object(module), [], (time.perf_counter() - st) * 1000
+
+
+def called_functions(nodes: list[Node]) -> set[str]:
+    """ Returns the name of every function called anywhere inside the nodes """
+    names: set[str] = set()
+
+    stack: list = list(nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, Node):
+            if node.kind == NodeType.CallExpression:
+                names.add(node.function.value)
+            stack.extend(getattr(node, name, None) for name in node.__slots__)
+
+    return names
+
+
+class ParallelCodegen:
+    """
+        Splits the functions of a program (and every pallet it imports) into partitions and compiles each
+        partition to object code in its own worker process. Calls across partitions go through external
+        declarations, so cross-partition inlining is traded for parallel codegen.
+    """
+    def __init__(self, workers: int, opt_level: int = 0, reloc: str = "default", entry_symbol: str | None = None, fold_constants: bool = True, fn_attrs: bool = True, bounds_checks: bool = True) -> None:
+        self.workers: int = workers
+        self.opt_level: int = opt_level
+        self.reloc: str = reloc
+        self.entry_symbol: str | None = entry_symbol
+        self.fold_constants: bool = fold_constants
+        self.fn_attrs: bool = fn_attrs
+        self.bounds_checks: bool = bounds_checks
+
+        # Time (ms) each partition spent in its worker, in partition order
+        self.partition_times: list[float] = []
+
+        self.errors: list[str] = []
+
+    def flatten(self, program: Program, pallets: dict[str, Program]) -> tuple[list[FunctionStatement], list[LetStatement]]:
+        """ Returns every top level function and global `let` in the order the Compiler would have inlined them """
+        functions: list[FunctionStatement] = []
+        lets: list[LetStatement] = []
+        imported: set[str] = set()
+
+        def visit(statements: list) -> None:
+            for stmt in statements:
+                match stmt.kind:
+                    case FunctionStatement.kind:
+                        functions.append(stmt)
+                    case LetStatement.kind:
+                        lets.append(stmt)
+                    case ImportStatement.kind:
+                        if stmt.file_path not in imported:
+                            imported.add(stmt.file_path)
+                            visit(pallets[stmt.file_path].statements)
+
+        visit(program.statements)
+
+        return functions, lets
+
+    def partition(self, functions: list[FunctionStatement]) -> list[list[FunctionStatement]]:
+        """ Greedily balances the functions over the workers by encoded AST size (largest first, onto the lightest partition) """
+        costs: list[int] = [len(marshal.dumps(encode(func))) for func in functions]
+
+        loads: list[int] = [0] * self.workers
+        assignments: list[list[int]] = [[] for _ in range(self.workers)]
+        for i in sorted(range(len(functions)), key=lambda i: costs[i], reverse=True):
+            lightest: int = loads.index(min(loads))
+            loads[lightest] += costs[i]
+            assignments[lightest].append(i)
+
+        # Keep source order inside each partition so calls to earlier functions still resolve
+        return [[functions[i] for i in sorted(indices)] for indices in assignments if len(indices) > 0]
+
+    def compile(self, program: Program, pallets: dict[str, Program]) -> list[bytes] | None:
+        """ Compiles every partition and returns their object code, returns None (and fills `errors`) on failure """
+        functions, lets = self.flatten(program, pallets)
+        signatures: dict[str, list] = {func.name.value: function_signature(func) for func in functions}
+        # Globals are defined by the first partition and declared by every other one
+        global_declarations: list[list] = list({stmt.name.value: global_signature(stmt) for stmt in lets}.values())
+
+        groups: list[list[FunctionStatement]] = self.partition(functions)
+
+        with ProcessPoolExecutor(max_workers=max(1, len(groups))) as pool:
+            futures: list[Future] = []
+            for index, group in enumerate(groups):
+                # Only declare what this partition calls but doesn't define, thousands of unused declarations aren't free
+                defined: set[str] = {func.name.value for func in group}
+                declarations: list[list] = [
+                    signatures[name] for name in sorted(called_functions(group))
+                    if name in signatures and name not in defined
+                ]
+
+                partition_program: Program = Program()
+                partition_program.statements = lets + group if index == 0 else group
+
+                futures.append(pool.submit(
+                    compile_partition,
+                    index, serialize(partition_program), declarations, [] if index == 0 else global_declarations,
+                    self.opt_level, self.reloc, self.entry_symbol, self.fold_constants, self.fn_attrs, self.bounds_checks
+                ))
+
+            objects: list[bytes] = []
+            for future in futures:
+                data, errors, ms = future.result()
+                self.partition_times.append(ms)
+                if data is None:
+                    self.errors.extend(errors)
+                    continue
+                objects.append(data)
+
+        return objects if len(self.errors) == 0 else None
@@ -1,16 +1,16 @@
 from Lexer import Lexer
-from Token import Token, TokenType
-from typing import Callable
-from enum import Enum, auto
+from Token import Token, TokenType, VECTOR_TYPES, split_number_suffix
+from typing import Callable, Iterable, Iterator
+from enum import IntEnum, auto
 
 from AST import Statement, Expression, Program
-from AST import ExpressionStatement, LetStatement, FunctionStatement, ReturnStatement, BlockStatement, AssignStatement, IfStatement, WhileStatement, BreakStatement, ContinueStatement, ForStatement, ImportStatement
-from AST import InfixExpression, CallExpression, PrefixExpression, PostfixExpression
-from AST import IntegerLiteral, FloatLiteral, IdentifierLiteral, BooleanLiteral, StringLiteral
+from AST import ExpressionStatement, LetStatement, FunctionStatement, ReturnStatement, BlockStatement, AssignStatement, IndexAssignStatement, IfStatement, WhileStatement, BreakStatement, ContinueStatement, ForStatement, ImportStatement
+from AST import InfixExpression, CallExpression, PrefixExpression, PostfixExpression, CastExpression, IndexExpression
+from AST import IntegerLiteral, FloatLiteral, IdentifierLiteral, BooleanLiteral, StringLiteral, ArrayLiteral
 from AST import FunctionParameter
 
 # Precedence Types
-class PrecedenceType(Enum):
+class PrecedenceType(IntEnum):
     P_LOWEST = 0
     P_EQUALS = auto()
     P_LESSGREATER = auto()
@@ -22,7 +22,7 @@ class PrecedenceType(Enum):
     P_INDEX = auto()
 
 # Precedence Mapping
-PRECEDENCES: dict[TokenType, int] = {
+PRECEDENCES: dict[TokenType, PrecedenceType] = {
     TokenType.PLUS: PrecedenceType.P_SUM,
     TokenType.MINUS: PrecedenceType.P_SUM,
     TokenType.SLASH: PrecedenceType.P_PRODUCT,
@@ -44,18 +44,71 @@ PRECEDENCES: dict[TokenType, int] = {
     # Episode 18 NEW
     TokenType.PLUS_PLUS: PrecedenceType.P_INDEX,
     TokenType.MINUS_MINUS: PrecedenceType.P_INDEX,
+    TokenType.LBRACKET: PrecedenceType.P_INDEX,
 
     # Episode 19 NEW
     # TokenType.DOT: PrecedenceType.P_CALL
 }
 
+ASSIGNMENT_OPERATORS: frozenset[TokenType] = frozenset([
+    TokenType.EQ,
+    TokenType.PLUS_EQ,
+    TokenType.MINUS_EQ,
+    TokenType.MUL_EQ,
+    TokenType.DIV_EQ
+])
+
+class TokenBuffer:
+    """ Fixed size ring buffer over a token stream, holds the current token plus `lookahead` upcoming tokens """
+    def __init__(self, tokens: Iterable[Token], lookahead: int = 1) -> None:
+        if lookahead < 1:
+            raise ValueError(f"TokenBuffer needs at least 1 token of lookahead, got {lookahead}")
+
+        self.tokens: Iterator[Token] = iter(tokens)
+        self.size: int = lookahead + 1
+
+        # Once the stream runs out the last token (EOF) is repeated
+        self.last_token: Token | None = None
+
+        self.ring: list[Token | None] = [self.__pull() for _ in range(self.size)]
+        self.head: int = 0
+
+    def __pull(self) -> Token:
+        tok: Token | None = next(self.tokens, None)
+        if tok is None:
+            return self.last_token
+
+        self.last_token = tok
+        return tok
+
+    def peek(self, n: int = 0) -> Token:
+        """ Returns the token `n` positions ahead of the current one (0 is the current token) """
+        if n >= self.size:
+            raise IndexError(f"Can only look {self.size - 1} tokens ahead, asked for {n}")
+
+        return self.ring[(self.head + n) % self.size]
+
+    def advance(self) -> None:
+        """ Drops the current token and pulls one more token into the free slot """
+        tok: Token | None = next(self.tokens, None)
+        if tok is None:
+            tok = self.last_token
+        else:
+            self.last_token = tok
+
+        self.ring[self.head] = tok
+        self.head = (self.head + 1) % self.size
+
 class Parser:
-    def __init__(self, lexer: Lexer) -> None:
-        self.lexer: Lexer = lexer
+    def __init__(self, lexer: Iterable[Token], lookahead: int = 1) -> None:
+        # Any token stream works here (a Lexer or e.g. a generator tapping a Lexer for debug output)
+        self.lexer: Iterable[Token] = lexer
         
         # Just a list of errors caught during parsing
         self.errors: list[str] = []
 
+        self.buffer: TokenBuffer = TokenBuffer(tokens=lexer, lookahead=lookahead)
+
         self.current_token: Token = None
         self.peek_token: Token = None
 
@@ -76,6 +129,9 @@ class Parser:
             # Episode 15 NEW
             TokenType.MINUS: self.__parse_prefix_expression,
             TokenType.BANG: self.__parse_prefix_expression,
+
+            TokenType.TYPE: self.__parse_cast_expression,
+            TokenType.LBRACKET: self.__parse_array_literal,
         }
         self.infix_parse_fns: dict[TokenType, Callable] = {
             TokenType.PLUS: self.__parse_infix_expression,
@@ -99,20 +155,29 @@ class Parser:
             # Episode 18 NEW
             TokenType.PLUS_PLUS: self.__parse_postfix_expression,
             TokenType.MINUS_MINUS: self.__parse_postfix_expression,
+            TokenType.LBRACKET: self.__parse_index_expression,
 
             # Episode 19 NEW
             # TokenType.DOT: self.__parse_dot_expression
         }
 
         # Populate the current_token and peek_token
-        self.__next_token()
-        self.__next_token()
+        self.current_token = self.buffer.peek(0)
+        self.peek_token = self.buffer.peek(1)
     
     # region Parser Helpers
     def __next_token(self) -> None:
-        """ Advances the lexer to retrieve the next token """
-        self.current_token = self.peek_token
-        self.peek_token = self.lexer.next_token()
+        """ Advances the token buffer to retrieve the next token """
+        buffer: TokenBuffer = self.buffer
+        buffer.advance()
+
+        # Hot path, read the ring directly instead of going through peek()
+        self.current_token = buffer.ring[buffer.head]
+        self.peek_token = buffer.ring[(buffer.head + 1) % buffer.size]
+
+    def peek_nth(self, n: int) -> Token:
+        """ Peeks `n` tokens ahead of the current token, up to the configured lookahead """
+        return self.buffer.peek(n)
 
     def __current_token_is(self, tt: TokenType) -> bool:
         return self.current_token.type == tt
@@ -122,14 +187,7 @@ class Parser:
         return self.peek_token.type == tt
     
     def __peek_token_is_assignment(self) -> bool:
-        assignment_operators: list[TokenType] = [
-            TokenType.EQ,
-            TokenType.PLUS_EQ,
-            TokenType.MINUS_EQ,
-            TokenType.MUL_EQ,
-            TokenType.DIV_EQ
-        ]
-        return self.peek_token.type in assignment_operators
+        return self.peek_token.type in ASSIGNMENT_OPERATORS
     
     def __expect_peek(self, tt: TokenType) -> bool:
         if self.__peek_token_is(tt):
@@ -140,41 +198,86 @@ class Parser:
             return False
     
     def __current_precedence(self) -> PrecedenceType:
-        prec: int | None = PRECEDENCES.get(self.current_token.type)
-        if prec is None:
-            return PrecedenceType.P_LOWEST
-        return prec
+        return PRECEDENCES.get(self.current_token.type, PrecedenceType.P_LOWEST)
     
     def __peek_precedence(self) -> PrecedenceType:
-        prec: int | None = PRECEDENCES.get(self.peek_token.type)
-        if prec is None:
-            return PrecedenceType.P_LOWEST
-        return prec
+        return PRECEDENCES.get(self.peek_token.type, PrecedenceType.P_LOWEST)
     
     def __peek_error(self, tt: TokenType) -> None:
         self.errors.append(f"Expected next token to be {tt}, got {self.peek_token.type} instead.")
 
     def __no_prefix_parse_fn_error(self, tt: TokenType):
         self.errors.append(f"No Prefix Parse Function for {tt} found")
+
+    def __parse_type(self) -> str | None:
+        """ Parses the type starting at the current token: a type name, `[T; N]` (array), `[T]` (slice) or `vecN<T>` (vector) """
+        if self.__current_token_is(TokenType.TYPE):
+            if self.current_token.literal not in VECTOR_TYPES:
+                return self.current_token.literal
+
+            vector_type: str = self.current_token.literal
+            if not self.__expect_peek(TokenType.LT):
+                return None
+
+            self.__next_token()
+            lane_type: str | None = self.__parse_type()
+            if lane_type is None or not self.__expect_peek(TokenType.GT):
+                return None
+
+            return f"{vector_type}<{lane_type}>"
+
+        if not self.__current_token_is(TokenType.LBRACKET):
+            self.errors.append(f"Expected a type, got {self.current_token.type} instead.")
+            return None
+
+        self.__next_token()
+        element_type: str | None = self.__parse_type()
+        if element_type is None:
+            return None
+
+        if self.__peek_token_is(TokenType.RBRACKET):
+            self.__next_token()
+            return f"[{element_type}]"
+
+        if not self.__expect_peek(TokenType.SEMICOLON):
+            return None
+
+        if not self.__expect_peek(TokenType.INT) or not isinstance(self.current_token.literal, int):
+            self.errors.append(f"Array lengths have to be an unsuffixed integer, got `{self.current_token.literal}`.")
+            return None
+        length: int = self.current_token.literal
+        if length == 0:
+            self.errors.append("Arrays need at least one element, got a length of `0`.")
+            return None
+
+        if not self.__expect_peek(TokenType.RBRACKET):
+            return None
+
+        return f"[{element_type}; {length}]"
     # endregion
     
-    def parse_program(self) -> None:
+    def parse_program(self) -> Program:
         """ Main execution entry to the Parser """
         program: Program = Program()
+        program.statements.extend(self.iter_statements())
+
+        return program
 
+    def iter_statements(self) -> Iterator[Statement]:
+        """ Parses and yields top level statements one at a time, so callers don't have to keep the whole program """
         while self.current_token.type != TokenType.EOF:
             stmt: Statement = self.__parse_statement()
             if stmt is not None:
-                program.statements.append(stmt)
+                yield stmt
             
             self.__next_token()
 
-        return program
-
     # region Statament Methods
     def __parse_statement(self) -> Statement:
         if self.current_token.type == TokenType.IDENT and self.__peek_token_is_assignment():
-            return self.__parse_assignment_statement()
+            stmt: AssignStatement = self.__parse_assignment_statement()
+            self.__next_token()
+            return stmt
 
         match self.current_token.type:
             case TokenType.LET:
@@ -196,9 +299,13 @@ class Parser:
             case _:
                 return self.__parse_expression_statement()
     
-    def __parse_expression_statement(self) -> ExpressionStatement:
+    def __parse_expression_statement(self) -> ExpressionStatement | IndexAssignStatement:
         expr = self.__parse_expression(PrecedenceType.P_LOWEST)
 
+        # `a[i] = 5;` only turns out to be an assignment after its target was parsed
+        if isinstance(expr, IndexExpression) and self.__peek_token_is_assignment():
+            return self.__parse_index_assignment_statement(expr)
+
         if self.__peek_token_is(TokenType.SEMICOLON):
             self.__next_token()
 
@@ -219,10 +326,11 @@ class Parser:
         if not self.__expect_peek(TokenType.COLON):
             return None
         
-        if not self.__expect_peek(TokenType.TYPE):
+        self.__next_token()
+
+        stmt.value_type = self.__parse_type()
+        if stmt.value_type is None:
             return None
-        
-        stmt.value_type = self.current_token.literal
 
         if not self.__expect_peek(TokenType.EQ):
             return None
@@ -256,7 +364,7 @@ class Parser:
         
         self.__next_token()
 
-        stmt.return_type = self.current_token.literal
+        stmt.return_type = self.__parse_type()
 
         if not self.__expect_peek(TokenType.LBRACE):
             return None
@@ -281,7 +389,7 @@ class Parser:
         
         self.__next_token()
 
-        first_param.value_type = self.current_token.literal
+        first_param.value_type = self.__parse_type()
         params.append(first_param)
 
         while self.__peek_token_is(TokenType.COMMA):
@@ -295,7 +403,7 @@ class Parser:
             
             self.__next_token()
 
-            param.value_type = self.current_token.literal
+            param.value_type = self.__parse_type()
 
             params.append(param)
 
@@ -342,6 +450,18 @@ class Parser:
 
         stmt.right_value = self.__parse_expression(PrecedenceType.P_LOWEST)
 
+        return stmt
+
+    def __parse_index_assignment_statement(self, target: IndexExpression) -> IndexAssignStatement:
+        stmt: IndexAssignStatement = IndexAssignStatement(target=target)
+
+        self.__next_token() # skips the `]`
+
+        stmt.operator = self.current_token.literal
+        self.__next_token() # skips the operator
+
+        stmt.right_value = self.__parse_expression(PrecedenceType.P_LOWEST)
+
         self.__next_token()
 
         return stmt
@@ -350,6 +470,7 @@ class Parser:
         condition: Expression = None
         consequence: BlockStatement = None
         alternative: BlockStatement = None
+        line_no: int = self.current_token.line_no
 
         self.__next_token()
 
@@ -368,11 +489,12 @@ class Parser:
             
             alternative = self.__parse_block_statement()
 
-        return IfStatement(condition=condition, consequence=consequence, alternative=alternative)
+        return IfStatement(condition=condition, consequence=consequence, alternative=alternative, line_no=line_no)
     
     def __parse_while_statement(self) -> WhileStatement:
         condition: Expression = None
         body: BlockStatement = None
+        line_no: int = self.current_token.line_no
 
         self.__next_token()  # Skip WHILE
 
@@ -383,7 +505,7 @@ class Parser:
         
         body = self.__parse_block_statement()
 
-        return WhileStatement(condition=condition, body=body)
+        return WhileStatement(condition=condition, body=body, line_no=line_no)
     
     def __parse_break_statement(self) -> BreakStatement:
         self.__next_token()
@@ -395,7 +517,7 @@ class Parser:
     
     def __parse_for_statement(self) -> ForStatement:
         """ for (let i: int = 0; i < 10; i = i + 1) { } """
-        stmt: ForStatement = ForStatement()
+        stmt: ForStatement = ForStatement(line_no=self.current_token.line_no)
 
         if not self.__expect_peek(TokenType.LPAREN):
             return None
@@ -414,7 +536,11 @@ class Parser:
         
         self.__next_token() # Skip ;
 
-        stmt.action = self.__parse_expression(PrecedenceType.P_LOWEST)
+        # `i++` is an expression, `i = i + 1` and `i += 2` are assignments
+        if self.__current_token_is(TokenType.IDENT) and self.__peek_token_is_assignment():
+            stmt.action = self.__parse_assignment_statement()
+        else:
+            stmt.action = self.__parse_expression(PrecedenceType.P_LOWEST)
 
         if not self.__expect_peek(TokenType.RPAREN):
             return None
@@ -446,7 +572,7 @@ class Parser:
             return None
         
         left_expr: Expression = prefix_fn()
-        while not self.__peek_token_is(TokenType.SEMICOLON) and precedence.value < self.__peek_precedence().value:
+        while not self.__peek_token_is(TokenType.SEMICOLON) and precedence < self.__peek_precedence():
             infix_fn: Callable | None = self.infix_parse_fns.get(self.peek_token.type)
             if infix_fn is None:
                 return left_expr
@@ -471,6 +597,18 @@ class Parser:
     
     def __parse_postfix_expression(self, left_node: Expression) -> PostfixExpression:
         return PostfixExpression(left_node=left_node, operator=self.current_token.literal)
+
+    def __parse_index_expression(self, left_node: Expression) -> IndexExpression:
+        index_expr: IndexExpression = IndexExpression(left_node=left_node)
+
+        self.__next_token()
+
+        index_expr.index = self.__parse_expression(PrecedenceType.P_LOWEST)
+
+        if not self.__expect_peek(TokenType.RBRACKET):
+            return None
+
+        return index_expr
     
     # def __parse_dot_expression(self, left_node: Expression) -> DotExpression:
     #     precedence = self.__current_precedence()
@@ -527,8 +665,12 @@ class Parser:
         """ Parses an IntegerLiteral Node from the current token """
         int_lit: IntegerLiteral = IntegerLiteral()
 
+        literal = self.current_token.literal
+        if isinstance(literal, str):
+            literal, int_lit.value_type = split_number_suffix(literal)
+
         try:
-            int_lit.value = int(self.current_token.literal)
+            int_lit.value = int(literal)
         except:
             self.errors.append(f"Could not parse `{self.current_token.literal}` as an integer.")
             return None
@@ -539,8 +681,15 @@ class Parser:
         """ Parses an FloatLiteral Node from the current token """
         float_lit: FloatLiteral = FloatLiteral()
 
+        literal = self.current_token.literal
+        if isinstance(literal, str):
+            literal, float_lit.value_type = split_number_suffix(literal)
+            if float_lit.value_type not in ("float", "f64"):
+                self.errors.append(f"`{self.current_token.literal}` has a decimal point, it can't be an integer.")
+                return None
+
         try:
-            float_lit.value = float(self.current_token.literal)
+            float_lit.value = float(literal)
         except:
             self.errors.append(f"Could not parse `{self.current_token.literal}` as an float.")
             return None
@@ -561,4 +710,59 @@ class Parser:
         prefix_expr.right_node = self.__parse_expression(PrecedenceType.P_PREFIX)
 
         return prefix_expr
+
+    def __parse_cast_expression(self) -> CastExpression:
+        """ Explicit conversion, the type name called like a function (ex. `i64(x)`, `vec4<float>(x)`) """
+        cast_expr: CastExpression = CastExpression(value_type=self.__parse_type())
+        if cast_expr.value_type is None:
+            return None
+
+        if not self.__expect_peek(TokenType.LPAREN):
+            return None
+
+        self.__next_token()
+
+        cast_expr.value = self.__parse_expression(PrecedenceType.P_LOWEST)
+
+        if not self.__expect_peek(TokenType.RPAREN):
+            return None
+
+        return cast_expr
+
+    def __parse_array_literal(self) -> ArrayLiteral:
+        """ `[a, b, c]` or `[value; N]` """
+        if self.__peek_token_is(TokenType.RBRACKET):
+            self.errors.append("Array literals need at least one element.")
+            return None
+
+        self.__next_token()
+        first: Expression = self.__parse_expression(PrecedenceType.P_LOWEST)
+
+        if self.__peek_token_is(TokenType.SEMICOLON):
+            self.__next_token()
+
+            if not self.__expect_peek(TokenType.INT) or not isinstance(self.current_token.literal, int):
+                self.errors.append(f"Array lengths have to be an unsuffixed integer, got `{self.current_token.literal}`.")
+                return None
+            repeat: int = self.current_token.literal
+            if repeat == 0:
+                self.errors.append("Array literals need at least one element, got a length of `0`.")
+                return None
+
+            if not self.__expect_peek(TokenType.RBRACKET):
+                return None
+
+            return ArrayLiteral(elements=[first], repeat=repeat)
+
+        elements: list[Expression] = [first]
+        while self.__peek_token_is(TokenType.COMMA):
+            self.__next_token()
+            self.__next_token()
+
+            elements.append(self.__parse_expression(PrecedenceType.P_LOWEST))
+
+        if not self.__expect_peek(TokenType.RBRACKET):
+            return None
+
+        return ArrayLiteral(elements=elements)
     # endregion
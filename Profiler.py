@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from typing import Iterator
+import json
+import os
+import time
+
+PROFILE_FORMATS: list[str] = ["json", "chrome"]
+
+# Top functions listed in the printed report, the JSON / trace output always has all of them
+REPORT_FUNCTIONS: int = 10
+
+class Span:
+    """ One timed region: a pipeline phase, a compiled function or a compiled pallet """
+    def __init__(self, name: str, category: str, start_ns: int, depth: int, args: dict) -> None:
+        self.name: str = name
+        self.category: str = category
+        self.start_ns: int = start_ns
+        self.end_ns: int = start_ns
+        self.depth: int = depth
+
+        # Extra details shown in the trace viewer (ex. the rebuilt pallets of an incremental build)
+        self.args: dict = args
+
+    @property
+    def ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+class Profiler:
+    """ Records nested `perf_counter_ns` spans of the pipeline for `--profile`, and writes them as JSON or a Chrome trace """
+    def __init__(self) -> None:
+        self.origin_ns: int = time.perf_counter_ns()
+        self.spans: list[Span] = []
+
+        # Depth of the next span, spans opened inside another one nest under it
+        self.depth: int = 0
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args) -> Iterator[Span]:
+        """ Times the body of the `with` block, the yielded span has its `ms` once the block exits """
+        span: Span = Span(name, category, time.perf_counter_ns(), self.depth, args)
+        self.spans.append(span)
+
+        self.depth += 1
+        try:
+            yield span
+        finally:
+            self.depth -= 1
+            span.end_ns = time.perf_counter_ns()
+
+    def totals(self, category: str) -> dict[str, float]:
+        """ Total ms per span name of a category, slowest first (a function defined twice adds up) """
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            if span.category == category:
+                totals[span.name] = totals.get(span.name, 0.0) + span.ms
+
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    # region Output
+    def report(self) -> None:
+        """ Prints the phase tree, the compiled pallets and the slowest functions """
+        print("\n==== PROFILE ====")
+        for span in self.spans:
+            if span.category == "phase":
+                print(f"{'  ' * span.depth}{span.name:<{40 - 2 * span.depth}} {span.ms:>12.3f} ms")
+
+        pallets: dict[str, float] = self.totals("pallet")
+        if len(pallets) > 0:
+            print("\n==== PALLET CODEGEN (including the pallets they import) ====")
+            for name, ms in pallets.items():
+                print(f"{name:<40} {ms:>12.3f} ms")
+
+        functions: dict[str, float] = self.totals("function")
+        if len(functions) > 0:
+            print(f"\n==== SLOWEST FUNCTIONS ({min(len(functions), REPORT_FUNCTIONS)} of {len(functions)}) ====")
+            for name, ms in list(functions.items())[:REPORT_FUNCTIONS]:
+                print(f"{name:<40} {ms:>12.3f} ms")
+
+    def to_json(self) -> dict:
+        return {
+            "spans": [
+                {
+                    "name": span.name,
+                    "category": span.category,
+                    "depth": span.depth,
+                    "start_ms": round((span.start_ns - self.origin_ns) / 1_000_000, 6),
+                    "duration_ms": round(span.ms, 6),
+                    "args": span.args,
+                }
+                for span in self.spans
+            ],
+            "pallets": {name: round(ms, 6) for name, ms in self.totals("pallet").items()},
+            "functions": {name: round(ms, 6) for name, ms in self.totals("function").items()},
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """ Trace Event Format (complete `X` events in µs), opens in chrome://tracing and Perfetto """
+        pid: int = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start_ns - self.origin_ns) / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": 0,
+                    "args": span.args,
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self, output_path: str, kind: str = "json") -> None:
+        with open(output_path, "w") as f:
+            json.dump(self.to_chrome_trace() if kind == "chrome" else self.to_json(), f, indent=4)
+    # endregion
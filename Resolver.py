@@ -0,0 +1,203 @@
+from AST import Node, Program
+from AST import ExpressionStatement, LetStatement, FunctionStatement, ReturnStatement, BlockStatement, AssignStatement, IndexAssignStatement, IfStatement, WhileStatement, BreakStatement, ContinueStatement, ForStatement, ImportStatement
+from AST import InfixExpression, CallExpression, PrefixExpression, PostfixExpression, CastExpression, IndexExpression
+from AST import IdentifierLiteral, ArrayLiteral
+
+from typing import Callable
+
+class Resolver:
+    """
+        Name resolution pass that runs before codegen. Every IdentifierLiteral gets bound to the (scope depth, slot index)
+        the Compiler stores that name at, so codegen reads variables by index instead of walking Environments by name.
+        Scopes are opened and slots are handed out in exactly the order the Compiler defines them.
+    """
+    def __init__(self, global_names: list[str], load_pallet: Callable[[str], Program | None]) -> None:
+        # Name -> slot index for every open scope, scopes[0] is the global scope
+        self.scopes: list[dict[str, int]] = [{name: i for i, name in enumerate(global_names)}]
+
+        # Returns the Program of an imported pallet, or None when imports aren't inlined into this module
+        self.load_pallet: Callable[[str], Program | None] = load_pallet
+        self.imported: set[str] = set()
+
+        self.errors: list[str] = []
+
+        self.visitors: dict[type, Callable[[Node], None]] = {
+            Program: self.__visit_program,
+
+            # Statements
+            ExpressionStatement: self.__visit_expression_statement,
+            LetStatement: self.__visit_let_statement,
+            FunctionStatement: self.__visit_function_statement,
+            BlockStatement: self.__visit_block_statement,
+            ReturnStatement: self.__visit_return_statement,
+            AssignStatement: self.__visit_assign_statement,
+            IndexAssignStatement: self.__visit_index_assign_statement,
+            IfStatement: self.__visit_if_statement,
+            WhileStatement: self.__visit_while_statement,
+            BreakStatement: self.__visit_nothing,
+            ContinueStatement: self.__visit_nothing,
+            ForStatement: self.__visit_for_statement,
+            ImportStatement: self.__visit_import_statement,
+
+            # Expressions
+            InfixExpression: self.__visit_infix_expression,
+            CallExpression: self.__visit_call_expression,
+            PrefixExpression: self.__visit_prefix_expression,
+            PostfixExpression: self.__visit_postfix_expression,
+            CastExpression: self.__visit_cast_expression,
+            IndexExpression: self.__visit_index_expression,
+            IdentifierLiteral: self.__visit_identifier_literal,
+            ArrayLiteral: self.__visit_array_literal,
+        }
+
+    def resolve(self, node: Node | None) -> None:
+        if node is None:
+            return
+
+        # Literals have nothing to resolve
+        visitor: Callable[[Node], None] | None = self.visitors.get(node.__class__)
+        if visitor is not None:
+            visitor(node)
+
+    # region Scopes
+    def __define(self, name: str) -> tuple[int, int]:
+        """ Hands out the next slot of the innermost scope (redefinitions keep their slot, like Environment.define) """
+        scope: dict[str, int] = self.scopes[-1]
+        if name not in scope:
+            scope[name] = len(scope)
+
+        return len(self.scopes) - 1, scope[name]
+
+    def __find(self, name: str) -> tuple[int, int] | None:
+        for depth in range(len(self.scopes) - 1, -1, -1):
+            index: int | None = self.scopes[depth].get(name)
+            if index is not None:
+                return depth, index
+
+        return None
+
+    def __bind(self, ident: IdentifierLiteral, usage: str) -> None:
+        slot: tuple[int, int] | None = self.__find(ident.value)
+        if slot is None:
+            self.errors.append(f"COMPILE ERROR: Identifier {ident.value} has not been declared before it was {usage}.")
+            return
+
+        ident.depth, ident.index = slot
+    # endregion
+
+    # region Statements
+    def __visit_program(self, node: Program) -> None:
+        for stmt in node.statements:
+            self.resolve(stmt)
+
+    def __visit_nothing(self, node: Node) -> None:
+        pass
+
+    def __visit_expression_statement(self, node: ExpressionStatement) -> None:
+        self.resolve(node.expr)
+
+    def __visit_let_statement(self, node: LetStatement) -> None:
+        self.resolve(node.value)
+
+        # Lets of a name that is already visible store to the existing variable
+        slot: tuple[int, int] | None = self.__find(node.name.value)
+        node.name.depth, node.name.index = slot if slot is not None else self.__define(node.name.value)
+
+    def __visit_block_statement(self, node: BlockStatement) -> None:
+        for stmt in node.statements:
+            self.resolve(stmt)
+
+    def __visit_return_statement(self, node: ReturnStatement) -> None:
+        self.resolve(node.return_value)
+
+    def __visit_function_statement(self, node: FunctionStatement) -> None:
+        # Parameters first, then the function itself so it can recurse
+        self.scopes.append({})
+        for param in node.parameters:
+            self.__define(param.name)
+        self.__define(node.name.value)
+
+        self.resolve(node.body)
+
+        self.scopes.pop()
+
+        node.name.depth, node.name.index = self.__define(node.name.value)
+
+    def __visit_assign_statement(self, node: AssignStatement) -> None:
+        self.__bind(node.ident, "re-assigned")
+        self.resolve(node.right_value)
+
+    def __visit_index_assign_statement(self, node: IndexAssignStatement) -> None:
+        self.resolve(node.target)
+        self.resolve(node.right_value)
+
+    def __visit_if_statement(self, node: IfStatement) -> None:
+        self.resolve(node.condition)
+        self.resolve(node.consequence)
+        self.resolve(node.alternative)
+
+    def __visit_while_statement(self, node: WhileStatement) -> None:
+        self.resolve(node.condition)
+        self.resolve(node.body)
+
+    def __visit_for_statement(self, node: ForStatement) -> None:
+        # Same order the Compiler emits the loop in
+        self.scopes.append({})
+
+        self.resolve(node.var_declaration)
+        self.resolve(node.body)
+        self.resolve(node.action)
+        self.resolve(node.condition)
+
+        self.scopes.pop()
+
+    def __visit_import_statement(self, node: ImportStatement) -> None:
+        if node.file_path in self.imported:
+            return
+
+        program: Program | None = self.load_pallet(node.file_path)
+        if program is None:
+            return
+        self.imported.add(node.file_path)
+
+        # Pallets are compiled straight into the importing scope
+        for stmt in program.statements:
+            self.resolve(stmt)
+    # endregion
+
+    # region Expressions
+    def __visit_infix_expression(self, node: InfixExpression) -> None:
+        self.resolve(node.left_node)
+        self.resolve(node.right_node)
+
+    def __visit_call_expression(self, node: CallExpression) -> None:
+        for arg in node.arguments:
+            self.resolve(arg)
+        self.__bind(node.function, "called")
+
+    def __visit_prefix_expression(self, node: PrefixExpression) -> None:
+        self.resolve(node.right_node)
+
+    def __visit_postfix_expression(self, node: PostfixExpression) -> None:
+        if node.left_node.__class__ is IdentifierLiteral:
+            self.__bind(node.left_node, "used in a PostfixExpression")
+        elif node.left_node.__class__ is IndexExpression:
+            # `a[i]++` is compiled as `a[i] += 1`
+            self.resolve(node.left_node)
+        else:
+            self.errors.append(f"COMPILE ERROR: `{node.operator}` needs a variable or an element of an array, slice or vector")
+
+    def __visit_cast_expression(self, node: CastExpression) -> None:
+        self.resolve(node.value)
+
+    def __visit_index_expression(self, node: IndexExpression) -> None:
+        self.resolve(node.left_node)
+        self.resolve(node.index)
+
+    def __visit_array_literal(self, node: ArrayLiteral) -> None:
+        for element in node.elements:
+            self.resolve(element)
+
+    def __visit_identifier_literal(self, node: IdentifierLiteral) -> None:
+        self.__bind(node, "used")
+    # endregion
@@ -1,76 +1,84 @@
-from enum import Enum
+from enum import IntEnum, auto
 from typing import Any
 
-class TokenType(Enum):
+class TokenType(IntEnum):
+    """ Integer token kinds, they hash and compare as plain ints in the Parser's lookups """
     # Special Tokens
-    EOF = "EOF"
-    ILLEGAL = "ILLEGAL"
+    EOF = auto()
+    ILLEGAL = auto()
 
     # Data Types
-    IDENT = "IDENT"
-    INT = "INT"
-    FLOAT = "FLOAT"
-    STRING = "STRING"
+    IDENT = auto()
+    INT = auto()
+    FLOAT = auto()
+    STRING = auto()
 
     # Arithmetic Symbols
-    PLUS = "PLUS"
-    MINUS = "MINUS"
-    ASTERISK = "ASTERISK"
-    SLASH = "SLASH"
-    POW = "POW"
-    MODULUS = "MODULUS"
+    PLUS = auto()
+    MINUS = auto()
+    ASTERISK = auto()
+    SLASH = auto()
+    POW = auto()
+    MODULUS = auto()
 
     # Prefix Symbols
-    BANG = "BANG"
+    BANG = auto()
     
     # Postfix Symbols
-    PLUS_PLUS = "PLUS_PLUS"
-    MINUS_MINUS = "MINUS_MINUS"
+    PLUS_PLUS = auto()
+    MINUS_MINUS = auto()
 
     # Assignment Symbols
-    EQ = "EQ"
-    PLUS_EQ = "PLUS_EQ"
-    MINUS_EQ = "MINUS_EQ"
-    MUL_EQ = "MUL_EQ"
-    DIV_EQ = "DIV_EQ"
+    EQ = auto()
+    PLUS_EQ = auto()
+    MINUS_EQ = auto()
+    MUL_EQ = auto()
+    DIV_EQ = auto()
 
     # Comparison Symbols
-    LT = '<'
-    GT = '>'
-    EQ_EQ = '=='
-    NOT_EQ = '!='
-    LT_EQ = '<='
-    GT_EQ = '>='
+    LT = auto()
+    GT = auto()
+    EQ_EQ = auto()
+    NOT_EQ = auto()
+    LT_EQ = auto()
+    GT_EQ = auto()
 
     # Symbols
-    COLON = "COLON"
-    COMMA = "COMMA"
-    SEMICOLON = "SEMICOLON"
-    ARROW = "ARROW"
-    LPAREN = "LPAREN"
-    RPAREN = "RPAREN"
-    LBRACE = "LBRACE"
-    RBRACE = "RBRACE"
+    COLON = auto()
+    COMMA = auto()
+    SEMICOLON = auto()
+    ARROW = auto()
+    LPAREN = auto()
+    RPAREN = auto()
+    LBRACE = auto()
+    RBRACE = auto()
+    LBRACKET = auto()
+    RBRACKET = auto()
 
     # Keywords
-    LET = "LET"
-    FN = "FN"
-    RETURN = "RETURN"
-    IF = "IF"
-    ELSE = "ELSE"
-    TRUE = "TRUE"
-    FALSE = "FALSE"
-    WHILE = "WHILE"
-    BREAK = "BREAK"
-    CONTINUE = "CONTINUE"
-    FOR = "FOR"
-    IMPORT = "IMPORT"
+    LET = auto()
+    FN = auto()
+    RETURN = auto()
+    IF = auto()
+    ELSE = auto()
+    TRUE = auto()
+    FALSE = auto()
+    WHILE = auto()
+    BREAK = auto()
+    CONTINUE = auto()
+    FOR = auto()
+    IMPORT = auto()
 
     # Typing
-    TYPE = "TYPE"
+    TYPE = auto()
+
+    def __str__(self) -> str:
+        return f"TokenType.{self.name}"
 
 
 class Token:
+    __slots__ = ("type", "literal", "line_no", "position")
+
     def __init__(self, type: TokenType, literal: Any, line_no: int, position: int) -> None:
         self.type = type
         self.literal = literal
@@ -118,7 +126,31 @@ ALT_KEYWORDS: dict[str, TokenType] = {
     "gib": TokenType.IMPORT
 }
 
-TYPE_KEYWORDS: list[str] = ["int", "float", "bool", "str", "void"]
+# SIMD vectors, the lane type follows in angle brackets (ex. `vec4<float>`)
+VECTOR_TYPES: list[str] = ["vec2", "vec4", "vec8", "vec16"]
+
+TYPE_KEYWORDS: list[str] = ["int", "float", "bool", "str", "void", "i8", "i16", "i64", "u32", "u64", "f64", *VECTOR_TYPES]
+
+# Number literal suffixes (ex. `10i64`, `2.5f64`) -> the type of the literal.
+# Suffixed number tokens keep their source text as the literal, the Parser splits the suffix off.
+NUMBER_SUFFIXES: dict[str, str] = {
+    "i8": "i8",
+    "i16": "i16",
+    "i32": "int",
+    "i64": "i64",
+    "u32": "u32",
+    "u64": "u64",
+    "f32": "float",
+    "f64": "f64"
+}
+
+def split_number_suffix(text: str) -> tuple[str, str | None]:
+    """ `10i64` -> (`10`, `i64`), unsuffixed numbers come back with None """
+    for suffix, value_type in NUMBER_SUFFIXES.items():
+        if text.endswith(suffix) and text[:-len(suffix)] != "":
+            return text[:-len(suffix)], value_type
+
+    return text, None
 
 def lookup_ident(ident: str) -> TokenType:
     tt: TokenType | None = KEYWORDS.get(ident)
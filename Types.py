@@ -0,0 +1,175 @@
+from llvmlite import ir
+
+class UnsignedIntType(ir.IntType):
+    """
+        `u32` / `u64`. The IR has no unsigned integers (it prints as a plain `iN` and compares equal to IntType),
+        the separate class only tells the Compiler to pick the unsigned instructions (udiv, icmp ult, zext, uitofp, ...).
+    """
+    # Own instance cache, so IntType(32) and UnsignedIntType(32) stay different objects
+    _instance_cache = {}
+
+class SliceType(ir.LiteralStructType):
+    """
+        `[T]`, a view of an array of any length: { pointer to the first element, length as an `int` }.
+        Arrays (`[T; N]`) are plain IR arrays, they turn into slices when passed where a slice is expected.
+    """
+    def __init__(self, element: ir.Type) -> None:
+        super().__init__([element.as_pointer(), ir.IntType(32)])
+        self.element: ir.Type = element
+
+FLOAT_TYPES: tuple[type, ...] = (ir.FloatType, ir.DoubleType)
+
+# Lime name -> IR type of every numeric type
+NUMERIC_TYPES: dict[str, ir.Type] = {
+    'i8': ir.IntType(8),
+    'i16': ir.IntType(16),
+    'int': ir.IntType(32),
+    'i64': ir.IntType(64),
+    'u32': UnsignedIntType(32),
+    'u64': UnsignedIntType(64),
+    'float': ir.FloatType(),
+    'f64': ir.DoubleType(),
+}
+
+TYPE_NAMES: dict[tuple[type, int], str] = {
+    (typ.__class__, getattr(typ, 'width', 0)): name for name, typ in NUMERIC_TYPES.items()
+}
+
+def type_name(typ: ir.Type) -> str:
+    """ The Lime name of a type, for error messages and helper function names """
+    if isinstance(typ, SliceType):
+        return f"[{type_name(typ.element)}]"
+    if isinstance(typ, ir.ArrayType):
+        return f"[{type_name(typ.element)}; {typ.count}]"
+    if isinstance(typ, ir.VectorType):
+        return f"vec{typ.count}<{type_name(typ.element)}>"
+
+    return TYPE_NAMES.get((typ.__class__, getattr(typ, 'width', 0)), str(typ))
+
+def array_type_parts(name: str) -> tuple[str, int | None] | None:
+    """ `[int; 4]` -> (`int`, 4), `[int]` -> (`int`, None), None when the name isn't an array or slice type """
+    if not name.startswith('[') or not name.endswith(']'):
+        return None
+
+    inner: str = name[1:-1]
+    # The separator of this array, not of a nested one (ex. `[[int; 4]; 8]`)
+    split: int = inner.rfind(';')
+    if split == -1 or inner.count('[', split) != inner.count(']', split):
+        return inner, None
+
+    return inner[:split].strip(), int(inner[split + 1:])
+
+def vector_type_parts(name: str) -> tuple[str, int] | None:
+    """ `vec4<float>` -> (`float`, 4), None when the name isn't a vector type """
+    if not name.startswith('vec') or not name.endswith('>') or '<' not in name:
+        return None
+
+    split: int = name.index('<')
+    return name[split + 1:-1], int(name[3:split])
+
+def is_int(typ: ir.Type) -> bool:
+    # `bool` is an i1 but not a number
+    return isinstance(typ, ir.IntType) and typ.width > 1
+
+def is_float(typ: ir.Type) -> bool:
+    return isinstance(typ, FLOAT_TYPES)
+
+def is_numeric(typ: ir.Type) -> bool:
+    return is_int(typ) or is_float(typ)
+
+def is_unsigned(typ: ir.Type) -> bool:
+    return isinstance(typ, UnsignedIntType)
+
+def same_type(left: ir.Type, right: ir.Type) -> bool:
+    """ IR types compare equal regardless of signedness, Lime types don't """
+    if isinstance(left, (ir.ArrayType, SliceType, ir.VectorType)):
+        # `[u32; 4]` and `[int; 4]` are the same IR type too
+        return left.__class__ is right.__class__ and left == right and same_type(left.element, right.element)
+
+    return left.__class__ is right.__class__ and left == right
+
+def int_range(typ: ir.IntType) -> tuple[int, int]:
+    if is_unsigned(typ):
+        return 0, (1 << typ.width) - 1
+    return -(1 << (typ.width - 1)), (1 << (typ.width - 1)) - 1
+
+def literal_type(literal) -> str:
+    """ Type name of an Integer/FloatLiteral: its suffix, otherwise `int` (`i64` when it doesn't fit) or `float` """
+    if literal.value_type is not None:
+        return literal.value_type
+    if isinstance(literal.value, float):
+        return 'float'
+
+    low, high = int_range(NUMERIC_TYPES['int'])
+    return 'int' if low <= literal.value <= high else 'i64'
+
+def can_widen(source: ir.Type, target: ir.Type) -> bool:
+    """
+        Implicit conversions: the ones that never lose the value (`i8 -> int -> i64`, `u32 -> u64`, `u32 -> i64`,
+        `float -> f64`), plus ints to floats which Lime has always done. Everything else needs an explicit `T(x)`.
+    """
+    if same_type(source, target):
+        return True
+
+    if is_int(source) and is_int(target):
+        if is_unsigned(source) == is_unsigned(target):
+            return target.width > source.width
+        # A signed target needs a spare bit for the unsigned values
+        return is_unsigned(source) and target.width > source.width
+
+    if is_int(source) and is_float(target):
+        return True
+
+    return is_float(source) and isinstance(target, ir.DoubleType)
+
+def common_type(left: ir.Type, right: ir.Type) -> ir.Type | None:
+    """ The type both operands of an infix expression get widened to, None if neither widens to the other """
+    if can_widen(left, right):
+        return right
+    if can_widen(right, left):
+        return left
+
+    return None
+
+def conversion(source: ir.Type, target: ir.Type) -> str | None:
+    """ The cast instruction between two numeric types (or from a bool), '' when the bits stay as they are, None if there is none """
+    if same_type(source, target):
+        return ''
+
+    if isinstance(source, ir.IntType) and is_int(target):
+        if target.width < source.width:
+            return 'trunc'
+        if target.width == source.width:
+            # `int` <-> `u32`, same bits
+            return ''
+        # Bools are 0 / 1, never -1
+        return 'zext' if is_unsigned(source) or source.width == 1 else 'sext'
+
+    if isinstance(source, ir.IntType) and is_float(target):
+        return 'uitofp' if is_unsigned(source) or source.width == 1 else 'sitofp'
+
+    if is_float(source) and is_int(target):
+        return 'fptoui' if is_unsigned(target) else 'fptosi'
+
+    if is_float(source) and is_float(target):
+        return 'fpext' if isinstance(target, ir.DoubleType) else 'fptrunc'
+
+    return None
+
+def convert(builder: ir.IRBuilder, value: ir.Value, source: ir.Type, target: ir.Type) -> ir.Value | None:
+    """ Emits the conversion between two numeric types (or from a bool), None if there is none """
+    if isinstance(source, ir.VectorType) or isinstance(target, ir.VectorType):
+        # Vectors convert lane by lane, one instruction for the whole vector
+        if not isinstance(source, ir.VectorType) or not isinstance(target, ir.VectorType) or source.count != target.count:
+            return None
+        instruction: str | None = conversion(source.element, target.element)
+    else:
+        instruction = conversion(source, target)
+
+    if not instruction:
+        return value if instruction == '' else None
+
+    # Global initializers have no block to emit into, their constants convert as constant expressions
+    if builder.block is None and isinstance(value, ir.Constant):
+        return getattr(value, instruction)(target)
+    return getattr(builder, instruction)(value, target)
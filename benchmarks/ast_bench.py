@@ -0,0 +1,52 @@
+""" Reports bytes per AST node and the total AST size for a large generated program """
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from AST import Node, Program
+from corpus import generate_program
+
+def node_attributes(node: Node) -> list:
+    """ Attribute values of a node, whether it stores them in a __dict__ or in __slots__ """
+    if hasattr(node, "__dict__"):
+        return list(vars(node).values())
+
+    return [getattr(node, name) for cls in type(node).__mro__ for name in getattr(cls, "__slots__", ()) if hasattr(node, name)]
+
+def count_nodes(root: Node) -> int:
+    count: int = 0
+    stack: list = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, Node):
+            count += 1
+            stack.extend(node_attributes(item))
+
+    return count
+
+if __name__ == '__main__':
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source: str = generate_program(lines)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    st: float = time.perf_counter()
+    program: Program = Parser(lexer=Lexer(source=source)).parse_program()
+    et: float = time.perf_counter()
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes: int = count_nodes(program)
+    total_bytes: int = after - before
+
+    print(f"Program: {source.count(chr(10))} lines, {nodes} AST nodes (parsed in {round((et - st) * 1000, 3)} ms with tracing)")
+    print(f"AST size: {round(total_bytes / 1024 / 1024, 2)} MiB ({round(total_bytes / nodes, 2)} bytes/node)")
@@ -0,0 +1,43 @@
+""" Compares loading a pallet's AST from the binary AST cache against lexing + parsing it """
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from AST import Program
+from ASTCache import ASTCache
+from corpus import generate_program
+
+def best_of(fn, repeat: int = 3) -> float:
+    best: float = float("inf")
+    for _ in range(repeat):
+        st: float = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - st)
+
+    return best
+
+if __name__ == '__main__':
+    sizes: list[int] = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+    with tempfile.TemporaryDirectory(prefix="lime_ast_bench_") as cache_dir:
+        cache: ASTCache = ASTCache(cache_dir=cache_dir)
+
+        print(f"{'lines':>8} {'parse ms':>10} {'load ms':>10} {'speedup':>8} {'cache KiB':>10}")
+        for lines in sizes:
+            source: str = generate_program(lines)
+
+            size_before: int = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir))
+
+            program: Program = Parser(lexer=Lexer(source=source)).parse_program()
+            cache.store(source, program)
+
+            parse_s: float = best_of(lambda: Parser(lexer=Lexer(source=source)).parse_program())
+            load_s: float = best_of(lambda: cache.load(source))
+
+            size_kib: float = (sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir)) - size_before) / 1024
+            print(f"{lines:>8} {parse_s * 1000:>10.2f} {load_s * 1000:>10.2f} {parse_s / load_s:>7.2f}x {size_kib:>10.1f}")
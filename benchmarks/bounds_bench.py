@@ -0,0 +1,72 @@
+""" Compares array loops with bounds checks, with the checks elided by the induction range and with `--no-bounds-checks` """
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from Compiler import Compiler
+from Optimizer import Optimizer
+
+import llvmlite.binding as llvm
+from ctypes import CFUNCTYPE, c_int
+
+PASSES: int = 20_000
+
+def make_program(loop: str) -> str:
+    return f"""fn sum(values: [int]) -> int {{
+    let total: int = 0;
+    {loop}
+    return total;
+}}
+
+fn main() -> int {{
+    let values: [int; 1024] = [3; 1024];
+    let total: int = 0;
+    for (let pass: int = 0; pass < {PASSES}; pass++) {{
+        values[pass % 1024] = pass;
+        total += sum(values);
+    }}
+    return total;
+}}
+"""
+
+# A while loop hides the induction range, the for loop proves `0 <= i < len(values)`
+CHECKED: str = "let i: int = 0; while i < len(values) { total += values[i]; i++; }"
+ELIDED: str = "for (let i: int = 0; i < len(values); i++) { total += values[i]; }"
+
+def run(source: str, opt_level: int, bounds_checks: bool) -> tuple[float, dict[str, int]]:
+    """ Compiles the program and returns how long `main` took in ms, plus the bounds check stats """
+    c: Compiler = Compiler(fn_attrs=False, bounds_checks=bounds_checks)
+    c.compile(node=Parser(lexer=Lexer(source=source)).parse_program())
+    if len(c.errors) > 0:
+        raise RuntimeError(c.errors)
+    c.module.triple = llvm.get_default_triple()
+
+    module: llvm.ModuleRef = llvm.parse_assembly(str(c.module))
+    module.verify()
+
+    target_machine: llvm.TargetMachine = llvm.Target.from_default_triple().create_target_machine(opt=opt_level)
+    module.data_layout = str(target_machine.target_data)
+    Optimizer(target_machine=target_machine, opt_level=opt_level).optimize(module)
+
+    engine = llvm.create_mcjit_compiler(module, target_machine)
+    engine.finalize_object()
+    cfunc = CFUNCTYPE(c_int)(engine.get_function_address("main"))
+
+    st: float = time.perf_counter()
+    cfunc()
+    return (time.perf_counter() - st) * 1000, c.bounds_check_stats
+
+if __name__ == '__main__':
+    llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    print(f"{PASSES:,} passes over a 1024 element slice")
+    for opt_level in [0, 2]:
+        for name, loop, bounds_checks in [("checked", CHECKED, True), ("elided", ELIDED, True), ("--no-bounds-checks", CHECKED, False)]:
+            ms, stats = run(make_program(loop), opt_level, bounds_checks)
+            print(f"-O{opt_level} {name:<20} {round(ms, 2):>9} ms  ({stats['emitted']} emitted, {stats['elided']} elided)")
@@ -0,0 +1,45 @@
+""" Measures Compiler (AST -> llvmlite IR) throughput in AST nodes per second """
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from Compiler import Compiler
+from AST import Node, Program
+from corpus import generate_program
+
+def count_nodes(program: Program) -> int:
+    count: int = 0
+
+    stack: list = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, Node):
+            count += 1
+            stack.extend(getattr(node, name, None) for name in node.__slots__)
+
+    return count
+
+if __name__ == '__main__':
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    runs: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    program: Program = Parser(lexer=Lexer(source=generate_program(lines))).parse_program()
+    nodes: int = count_nodes(program)
+
+    best: float | None = None
+    for _ in range(runs):
+        c: Compiler = Compiler()
+
+        st: float = time.perf_counter()
+        c.compile(node=program)
+        seconds: float = time.perf_counter() - st
+
+        best = seconds if best is None else min(best, seconds)
+
+    print(f"~{lines} lines, {nodes} nodes: best of {runs} {round(best * 1000, 2)} ms ({round(nodes / best):,} nodes/sec)")
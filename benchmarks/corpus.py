@@ -0,0 +1,42 @@
+""" Generates large synthetic Lime programs for the benchmarks """
+
+FUNCTION_TEMPLATE: str = """fn func_{i}(a: int, b: int) -> int {{
+    let total: int = 0;
+    let scale: float = {i}.5;
+
+    for (let i: int = 0; i < b; i++) {{
+        total += a * {i} + i;
+    }}
+
+    while total > 1000 {{
+        total -= 1000;
+    }}
+
+    if total == {i} {{
+        printf("func_{i} hit %i", total);
+    }} else {{
+        total = total + 1;
+    }}
+
+    return total;
+}}
+
+"""
+
+MAIN_TEMPLATE: str = """fn main() -> int {{
+    let result: int = 0;
+{calls}
+    return result;
+}}
+"""
+
+FUNCTION_LINES: int = FUNCTION_TEMPLATE.count("\n")
+
+def generate_program(lines: int = 100_000) -> str:
+    """ Builds a valid Lime program of roughly `lines` lines made of many small functions """
+    count: int = max(1, lines // FUNCTION_LINES)
+
+    functions: str = "".join(FUNCTION_TEMPLATE.format(i=i) for i in range(count))
+    calls: str = "".join(f"    result += func_{i}({i}, 3);\n" for i in range(min(count, 100)))
+
+    return functions + MAIN_TEMPLATE.format(calls=calls)
@@ -0,0 +1,230 @@
+""" Times every phase of the pipeline over the programs in `benchmarks/programs` and compares the results against a saved baseline """
+import contextlib
+import ctypes
+import io
+import json
+import os
+import platform
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Token import Token
+from Parser import Parser
+from Compiler import Compiler
+from Optimizer import Optimizer
+from PalletLoader import PalletLoader
+from AST import Program
+
+import llvmlite
+import llvmlite.binding as llvm
+from llvmlite import ir
+from ctypes import CFUNCTYPE, c_int
+
+PROGRAMS_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs")
+
+PHASES: list[str] = ["lex", "parse", "compile", "llvm_parse_verify", "optimize", "jit_finalize", "execute"]
+
+libc = ctypes.CDLL(None)
+
+def parse_arguments() -> Namespace:
+    arg_parser: ArgumentParser = ArgumentParser(description="LimeLang benchmark harness")
+    arg_parser.add_argument("--programs", nargs="*", default=None, help="Names of the programs to run (default: every `.lime` file in benchmarks/programs)")
+    arg_parser.add_argument("-O", "--opt-level", type=int, choices=[0, 1, 2, 3], default=0, help="LLVM optimization level (default: 0)")
+    arg_parser.add_argument("--runs", type=int, default=5, help="Times every program is compiled and run, the fastest time of each phase is kept (default: 5)")
+    arg_parser.add_argument("-o", "--output", type=str, default=None, help="Writes the results as JSON to this path")
+    arg_parser.add_argument("--baseline", type=str, default=None, help="Results JSON to compare against, exits with 1 when a phase regressed")
+    arg_parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown of a phase that counts as a regression (default: 0.10)")
+    arg_parser.add_argument("--min-ms", type=float, default=0.5, help="Ignores slowdowns smaller than this many ms, they are timer noise (default: 0.5)")
+
+    return arg_parser.parse_args()
+
+@contextlib.contextmanager
+def silenced_stdout():
+    """ Sends the program's printf output (C stdio, not Python's sys.stdout) to /dev/null """
+    sys.stdout.flush()
+    saved: int = os.dup(1)
+    devnull: int = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        yield
+    finally:
+        # printf buffers when stdout isn't a terminal, flush before the real stdout comes back
+        libc.fflush(None)
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+def run_once(source: str, opt_level: int) -> tuple[int, dict[str, float]]:
+    """ Compiles and runs one program, returns what `main` returned and the time of each phase in ms """
+    phases: dict[str, float] = {}
+
+    def timed(phase: str, fn: Callable):
+        st: float = time.perf_counter()
+        value = fn()
+        phases[phase] = (time.perf_counter() - st) * 1000
+        return value
+
+    tokens: list[Token] = timed("lex", lambda: list(Lexer(source=source)))
+
+    def parse() -> tuple[Program, dict[str, Program]]:
+        p: Parser = Parser(lexer=tokens)
+        program: Program = p.parse_program()
+        if len(p.errors) > 0:
+            raise RuntimeError(p.errors)
+
+        loader: PalletLoader = PalletLoader(workers=1, ast_cache=None)
+        pallets: dict[str, Program] = loader.load(program)
+        if len(loader.errors) > 0:
+            raise RuntimeError(loader.errors)
+        return program, pallets
+    program, pallets = timed("parse", parse)
+
+    def compile() -> ir.Module:
+        c: Compiler = Compiler(pallets=pallets)
+        # Warnings (ex. a pallet imported twice) aren't part of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            c.compile(node=program)
+        if len(c.errors) > 0:
+            raise RuntimeError(c.errors)
+        c.module.triple = llvm.get_default_triple()
+        return c.module
+    module: ir.Module = timed("compile", compile)
+
+    def parse_verify() -> llvm.ModuleRef:
+        parsed: llvm.ModuleRef = llvm.parse_assembly(str(module))
+        parsed.verify()
+        return parsed
+    parsed: llvm.ModuleRef = timed("llvm_parse_verify", parse_verify)
+
+    target_machine: llvm.TargetMachine = llvm.Target.from_default_triple().create_target_machine(opt=opt_level)
+    parsed.data_layout = str(target_machine.target_data)
+    timed("optimize", lambda: Optimizer(target_machine=target_machine, opt_level=opt_level).optimize(parsed))
+
+    def jit_finalize() -> llvm.ExecutionEngine:
+        engine: llvm.ExecutionEngine = llvm.create_mcjit_compiler(parsed, target_machine)
+        engine.finalize_object()
+        return engine
+    engine: llvm.ExecutionEngine = timed("jit_finalize", jit_finalize)
+
+    cfunc = CFUNCTYPE(c_int)(engine.get_function_address("main"))
+    with silenced_stdout():
+        result: int = timed("execute", cfunc)
+
+    return result, phases
+
+def run_program(name: str, opt_level: int, runs: int) -> dict:
+    """ Best of `runs` for every phase, a run's total is the sum of its phases """
+    with open(os.path.join(PROGRAMS_DIR, f"{name}.lime"), "r") as f:
+        source: str = f.read()
+
+    best: dict[str, float] = {}
+    result: int | None = None
+    for _ in range(runs):
+        run_result, phases = run_once(source, opt_level)
+        if result is not None and run_result != result:
+            raise RuntimeError(f"`{name}` returned {run_result}, an earlier run returned {result}")
+        result = run_result
+
+        for phase, ms in phases.items():
+            best[phase] = min(ms, best.get(phase, ms))
+
+    return {
+        "result": result,
+        "phases": {phase: round(best[phase], 4) for phase in PHASES},
+        "total": round(sum(best.values()), 4),
+    }
+
+def compare(results: dict, baseline: dict, threshold: float, min_ms: float) -> list[str]:
+    """ Returns a message for every changed result and every phase that got slower than the baseline allows """
+    regressions: list[str] = []
+
+    if results["meta"]["opt_level"] != baseline["meta"]["opt_level"]:
+        regressions.append(f"baseline was measured at -O{baseline['meta']['opt_level']}, these results at -O{results['meta']['opt_level']}")
+
+    for name, current in results["programs"].items():
+        previous: dict | None = baseline["programs"].get(name)
+        if previous is None:
+            continue
+
+        if current["result"] != previous["result"]:
+            regressions.append(f"{name}: returned {current['result']}, baseline returned {previous['result']}")
+
+        for phase, ms in current["phases"].items():
+            before: float | None = previous["phases"].get(phase)
+            if before is None:
+                continue
+
+            if ms - before > min_ms and ms > before * (1 + threshold):
+                regressions.append(f"{name}: {phase} {before} ms -> {ms} ms (+{round((ms / before - 1) * 100, 1)}%)")
+
+    return regressions
+
+def print_results(results: dict, baseline: dict | None) -> None:
+    print(f"{'program':<16}" + "".join(f"{phase:>19}" for phase in PHASES) + f"{'total':>12}")
+    for name, current in results["programs"].items():
+        previous: dict | None = baseline["programs"].get(name) if baseline is not None else None
+
+        row: str = f"{name:<16}"
+        for phase in PHASES:
+            cell: str = f"{current['phases'][phase]:.3f}"
+            if previous is not None and previous["phases"].get(phase):
+                cell += f" ({(current['phases'][phase] / previous['phases'][phase] - 1) * 100:+.0f}%)"
+            row += f"{cell:>19}"
+        print(row + f"{current['total']:>12.3f}")
+
+if __name__ == '__main__':
+    args: Namespace = parse_arguments()
+
+    llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    names: list[str] = args.programs or sorted(f[:-len(".lime")] for f in os.listdir(PROGRAMS_DIR) if f.endswith(".lime"))
+
+    results: dict = {
+        "meta": {
+            "opt_level": args.opt_level,
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "llvmlite": llvmlite.__version__,
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "programs": {},
+    }
+
+    # Imports resolve against the working directory, the programs import their pallets relative to their own folder
+    cwd: str = os.getcwd()
+    os.chdir(PROGRAMS_DIR)
+    try:
+        for name in names:
+            results["programs"][name] = run_program(name, args.opt_level, args.runs)
+    finally:
+        os.chdir(cwd)
+
+    baseline: dict | None = None
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"\nWrote results to {args.output}")
+
+    if baseline is not None:
+        regressions: list[str] = compare(results, baseline, args.threshold, args.min_ms)
+        if len(regressions) > 0:
+            print(f"\n==== {len(regressions)} REGRESSION(S) ====")
+            for regression in regressions:
+                print(regression)
+            exit(1)
+
+        print("\nNo regressions against the baseline")
@@ -0,0 +1,49 @@
+""" Compares tokens/sec of the classic and table driven Lexer scanners """
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer, ScannerType
+from Token import Token, TokenType
+from corpus import generate_program
+
+def lex_all(source: str, scanner: ScannerType) -> list[Token]:
+    lexer: Lexer = Lexer(source=source, scanner=scanner)
+
+    tokens: list[Token] = []
+    while True:
+        tok: Token = lexer.next_token()
+        tokens.append(tok)
+        if tok.type == TokenType.EOF:
+            return tokens
+
+def bench(source: str, scanner: ScannerType, repeat: int = 3) -> tuple[list[Token], float]:
+    """ Returns the tokens and the best wall-clock time in seconds """
+    best: float = float("inf")
+    for _ in range(repeat):
+        st: float = time.perf_counter()
+        tokens: list[Token] = lex_all(source, scanner)
+        best = min(best, time.perf_counter() - st)
+
+    return tokens, best
+
+if __name__ == '__main__':
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source: str = generate_program(lines)
+
+    print(f"Lexing {source.count(chr(10))} lines ({len(source)} chars)")
+
+    results: dict[ScannerType, tuple[list[Token], float]] = {}
+    for scanner in ScannerType:
+        tokens, seconds = bench(source, scanner)
+        results[scanner] = (tokens, seconds)
+        print(f"{scanner.value:>8}: {len(tokens)} tokens in {round(seconds * 1000, 3)} ms ({round(len(tokens) / seconds):,} tokens/sec)")
+
+    classic_tokens, classic_seconds = results[ScannerType.CLASSIC]
+    table_tokens, table_seconds = results[ScannerType.TABLE]
+
+    same: bool = [(t.type, t.literal, t.line_no, t.position) for t in classic_tokens] == [(t.type, t.literal, t.line_no, t.position) for t in table_tokens]
+    print(f"Identical token streams: {same}")
+    print(f"Speedup: {round(classic_seconds / table_seconds, 2)}x")
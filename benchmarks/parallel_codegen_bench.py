@@ -0,0 +1,56 @@
+""" Measures wall-clock codegen (IR -> optimized object code) of one large program against the number of codegen workers """
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from Compiler import Compiler
+from Optimizer import Optimizer
+from ParallelCodegen import ParallelCodegen
+from AST import Program, FunctionStatement
+from corpus import generate_program
+
+import llvmlite.binding as llvm
+
+def compile_serial(program: Program, opt_level: int) -> bytes:
+    """ The single module path main.py takes without `--codegen-jobs` """
+    c: Compiler = Compiler()
+    c.compile(node=program)
+    c.module.triple = llvm.get_default_triple()
+
+    module: llvm.ModuleRef = llvm.parse_assembly(str(c.module))
+    module.verify()
+
+    target_machine: llvm.TargetMachine = llvm.Target.from_default_triple().create_target_machine(opt=opt_level)
+    module.data_layout = str(target_machine.target_data)
+    Optimizer(target_machine=target_machine, opt_level=opt_level).optimize(module)
+
+    return target_machine.emit_object(module)
+
+if __name__ == '__main__':
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    opt_level: int = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    program: Program = Parser(lexer=Lexer(source=generate_program(lines))).parse_program()
+    function_count: int = sum(1 for stmt in program.statements if isinstance(stmt, FunctionStatement))
+
+    print(f"~{lines} lines, {function_count} functions, -O{opt_level} ({os.cpu_count()} CPUs)")
+
+    st: float = time.perf_counter()
+    compile_serial(program, opt_level)
+    baseline: float = time.perf_counter() - st
+    print(f"serial:       {round(baseline * 1000, 2):>10} ms")
+
+    for workers in [2, 4, 8]:
+        st = time.perf_counter()
+        objects: list[bytes] | None = ParallelCodegen(workers=workers, opt_level=opt_level).compile(program, {})
+        seconds: float = time.perf_counter() - st
+
+        print(f"{workers} worker(s):  {round(seconds * 1000, 2):>10} ms  ({round(baseline / seconds, 2)}x, {len(objects)} objects)")
@@ -0,0 +1,45 @@
+""" Measures how the PalletLoader pre-pass scales with worker processes on a project with many pallets """
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from AST import Program
+from PalletLoader import PalletLoader
+from corpus import generate_program
+
+def write_project(project_dir: str, pallet_count: int, pallet_lines: int) -> str:
+    """ Writes `pallet_count` pallets plus a main.lime importing all of them, returns the entry source """
+    for i in range(pallet_count):
+        # Rename the generated functions so the pallets don't clash with each other
+        source: str = generate_program(pallet_lines).replace("func_", f"p{i}_func_").replace("fn main()", f"fn p{i}_main()")
+        with open(os.path.join(project_dir, f"pallet_{i}.lime"), "w") as f:
+            f.write(source)
+
+    imports: str = "".join(f'import "pallet_{i}.lime";\n' for i in range(pallet_count))
+    return imports + "fn main() -> int {\n    return 0;\n}\n"
+
+if __name__ == '__main__':
+    pallet_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    pallet_lines: int = int(sys.argv[2]) if len(sys.argv) > 2 else 3_000
+
+    with tempfile.TemporaryDirectory(prefix="lime_pallets_") as project_dir:
+        entry_source: str = write_project(project_dir, pallet_count, pallet_lines)
+        os.chdir(project_dir)
+
+        program: Program = Parser(lexer=Lexer(source=entry_source)).parse_program()
+
+        print(f"{pallet_count} pallets x ~{pallet_lines} lines ({os.cpu_count()} CPUs)")
+
+        baseline: float | None = None
+        for workers in [1, 2, 4, 8]:
+            st: float = time.perf_counter()
+            pallets: dict[str, Program] = PalletLoader(workers=workers).load(program)
+            seconds: float = time.perf_counter() - st
+
+            baseline = baseline or seconds
+            print(f"{workers} worker(s): {round(seconds * 1000, 2):>10} ms  ({round(baseline / seconds, 2)}x, {len(pallets)} pallets)")
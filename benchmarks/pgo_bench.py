@@ -0,0 +1,97 @@
+""" Compiles programs with skewed branches at -O2 without a profile, then again with the counts of an `--instrument` run (`--pgo`) """
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from Compiler import Compiler
+from Optimizer import Optimizer
+
+import llvmlite.binding as llvm
+from ctypes import CFUNCTYPE, c_int
+
+OPT_LEVEL: int = 2
+RUNS: int = 5
+
+# The error path is never taken, without a profile LLVM has to guess which side of every `if` is hot
+BRANCHES: str = """fn rare(x: int) -> int {
+    let total: int = 0;
+    for (let i: int = 0; i < 64; i++) {
+        total += (x * i) % 7;
+    }
+    return total;
+}
+
+fn step(x: int) -> int {
+    if x % 1000003 == 999999 {
+        return rare(x);
+    }
+    if x % 3 == 0 {
+        return x / 3;
+    }
+    return x + 1;
+}
+
+fn main() -> int {
+    let total: int = 0;
+    for (let i: int = 0; i < 20000000; i++) {
+        total += step(i);
+    }
+    return total;
+}
+"""
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs", "recursion.lime"), "r") as f:
+    RECURSION: str = f.read()
+
+PROGRAMS: dict[str, str] = {
+    "branches": BRANCHES,
+    "recursion": RECURSION,
+}
+
+def run(source: str, instrument: bool = False, profile: dict | None = None) -> tuple[float, int, Compiler, llvm.ExecutionEngine]:
+    """ Compiles the program and returns how long `main` took in ms, what it returned, the Compiler and the engine """
+    c: Compiler = Compiler(instrument=instrument, profile=profile)
+    c.compile(node=Parser(lexer=Lexer(source=source)).parse_program())
+    if len(c.errors) > 0:
+        raise RuntimeError(c.errors)
+    c.module.triple = llvm.get_default_triple()
+
+    module: llvm.ModuleRef = llvm.parse_assembly(str(c.module))
+    module.verify()
+
+    target_machine: llvm.TargetMachine = llvm.Target.from_default_triple().create_target_machine(opt=OPT_LEVEL)
+    module.data_layout = str(target_machine.target_data)
+    Optimizer(target_machine=target_machine, opt_level=OPT_LEVEL).optimize(module)
+
+    engine = llvm.create_mcjit_compiler(module, target_machine)
+    engine.finalize_object()
+    cfunc = CFUNCTYPE(c_int)(engine.get_function_address("main"))
+
+    st: float = time.perf_counter()
+    result: int = cfunc()
+    return (time.perf_counter() - st) * 1000, result, c, engine
+
+def best(source: str, profile: dict | None) -> tuple[float, int]:
+    times, result = [], None
+    for _ in range(RUNS):
+        ms, result, _, _ = run(source, profile=profile)
+        times.append(ms)
+    return min(times), result
+
+if __name__ == '__main__':
+    llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    for name, source in PROGRAMS.items():
+        # The training run, its counts become the profile of the second compile
+        _, _, instrumented, engine = run(source, instrument=True)
+        profile: dict = instrumented.instrumentation.profile(instrumented.instrumentation.read(engine), source)
+
+        plain_ms, plain_result = best(source, None)
+        pgo_ms, pgo_result = best(source, profile)
+        print(f"{name:<10} -O{OPT_LEVEL} {round(plain_ms, 2):>9} ms   -O{OPT_LEVEL} --pgo {round(pgo_ms, 2):>9} ms  ({round(plain_ms / pgo_ms, 2)}x, results {plain_result} / {pgo_result})")
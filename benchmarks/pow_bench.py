@@ -0,0 +1,86 @@
+""" Compares the `^` lowering against a hand-rolled multiply loop (runtime and constant exponents, ints and floats) """
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from Compiler import Compiler
+from Optimizer import Optimizer
+
+import llvmlite.binding as llvm
+from ctypes import CFUNCTYPE, c_int
+
+ITERATIONS: int = 2_000_000
+
+NAIVE_POW: str = """fn naive_pow(b: int, e: int) -> int {
+    let r: int = 1;
+    for (let i: int = 0; i < e; i++) {
+        r *= b;
+    }
+    return r;
+}
+
+fn naive_fpow(b: float, e: int) -> float {
+    let r: float = 1.0;
+    for (let i: int = 0; i < e; i++) {
+        r *= b;
+    }
+    return r;
+}
+
+"""
+
+def make_program(statement: str) -> str:
+    return NAIVE_POW + f"""fn main() -> int {{
+    let total: int = 0;
+    for (let i: int = 0; i < {ITERATIONS}; i++) {{
+        {statement}
+    }}
+    return total;
+}}
+"""
+
+CASES: list[tuple[str, str, str]] = [
+    # (name, naive loop body, `^` loop body)
+    ("int, runtime exponent", "total += naive_pow(3, 20 + i % 10);", "total += 3 ^ (20 + i % 10);"),
+    ("int, constant exponent", "total += naive_pow(i, 25);", "total += i ^ 25;"),
+    ("float, int exponent", "if naive_fpow(1.0001, 20 + i % 10) > 1.002 { total += 1; }", "if 1.0001 ^ (20 + i % 10) > 1.002 { total += 1; }"),
+]
+
+def run(source: str, opt_level: int) -> float:
+    """ Compiles the program and returns how long `main` took in ms """
+    c: Compiler = Compiler()
+    c.compile(node=Parser(lexer=Lexer(source=source)).parse_program())
+    if len(c.errors) > 0:
+        raise RuntimeError(c.errors)
+    c.module.triple = llvm.get_default_triple()
+
+    module: llvm.ModuleRef = llvm.parse_assembly(str(c.module))
+    module.verify()
+
+    target_machine: llvm.TargetMachine = llvm.Target.from_default_triple().create_target_machine(opt=opt_level)
+    module.data_layout = str(target_machine.target_data)
+    Optimizer(target_machine=target_machine, opt_level=opt_level).optimize(module)
+
+    engine = llvm.create_mcjit_compiler(module, target_machine)
+    engine.finalize_object()
+    cfunc = CFUNCTYPE(c_int)(engine.get_function_address("main"))
+
+    st: float = time.perf_counter()
+    cfunc()
+    return (time.perf_counter() - st) * 1000
+
+if __name__ == '__main__':
+    llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    print(f"{ITERATIONS:,} powers per case")
+    for opt_level in [0, 2]:
+        for name, naive, fast in CASES:
+            naive_ms: float = run(make_program(naive), opt_level)
+            fast_ms: float = run(make_program(fast), opt_level)
+            print(f"-O{opt_level} {name:<24} loop {round(naive_ms, 2):>9} ms   ^ {round(fast_ms, 2):>9} ms  ({round(naive_ms / fast_ms, 2)}x)")
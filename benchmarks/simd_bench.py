@@ -0,0 +1,85 @@
+""" Compares a scalar dot product loop against the same loop hand-vectorized with `vec8<float>` """
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from Compiler import Compiler
+from Optimizer import Optimizer
+
+import llvmlite.binding as llvm
+from ctypes import CFUNCTYPE, c_int
+
+PASSES: int = 20_000
+
+def make_program(dot: str) -> str:
+    return f"""{dot}
+
+fn main() -> int {{
+    let a: [float; 1024] = [0.5; 1024];
+    let b: [float; 1024] = [2.0; 1024];
+    let total: float = 0.0;
+    for (let pass: int = 0; pass < {PASSES}; pass++) {{
+        a[pass % 1024] = 1.5;
+        total += dot(a, b);
+    }}
+    return int(total);
+}}
+"""
+
+SCALAR: str = """fn dot(a: [float], b: [float]) -> float {
+    let total: float = 0.0;
+    for (let i: int = 0; i < len(a); i++) {
+        total += a[i] * b[i];
+    }
+    return total;
+}"""
+
+VECTOR: str = """fn dot(a: [float], b: [float]) -> float {
+    let total: vec8<float> = 0.0;
+    let i: int = 0;
+    while i + 8 <= len(a) {
+        let x: vec8<float> = [a[i], a[i + 1], a[i + 2], a[i + 3], a[i + 4], a[i + 5], a[i + 6], a[i + 7]];
+        let y: vec8<float> = [b[i], b[i + 1], b[i + 2], b[i + 3], b[i + 4], b[i + 5], b[i + 6], b[i + 7]];
+        total += x * y;
+        i += 8;
+    }
+    return reduce_add(total);
+}"""
+
+def run(source: str, opt_level: int) -> tuple[float, int]:
+    """ Compiles the program and returns how long `main` took in ms and what it returned """
+    c: Compiler = Compiler(bounds_checks=False)
+    c.compile(node=Parser(lexer=Lexer(source=source)).parse_program())
+    if len(c.errors) > 0:
+        raise RuntimeError(c.errors)
+    c.module.triple = llvm.get_default_triple()
+
+    module: llvm.ModuleRef = llvm.parse_assembly(str(c.module))
+    module.verify()
+
+    target_machine: llvm.TargetMachine = llvm.Target.from_default_triple().create_target_machine(opt=opt_level)
+    module.data_layout = str(target_machine.target_data)
+    Optimizer(target_machine=target_machine, opt_level=opt_level).optimize(module)
+
+    engine = llvm.create_mcjit_compiler(module, target_machine)
+    engine.finalize_object()
+    cfunc = CFUNCTYPE(c_int)(engine.get_function_address("main"))
+
+    st: float = time.perf_counter()
+    result: int = cfunc()
+    return (time.perf_counter() - st) * 1000, result
+
+if __name__ == '__main__':
+    llvm.initialize()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    print(f"{PASSES:,} dot products of 1024 floats")
+    for opt_level in [0, 2, 3]:
+        scalar_ms, scalar_result = run(make_program(SCALAR), opt_level)
+        vector_ms, vector_result = run(make_program(VECTOR), opt_level)
+        print(f"-O{opt_level} scalar {round(scalar_ms, 2):>9} ms   vec8<float> {round(vector_ms, 2):>9} ms  ({round(scalar_ms / vector_ms, 2)}x, results {scalar_result} / {vector_result})")
@@ -0,0 +1,57 @@
+""" Reports memory per Token and the parse speed of the Parser on a large generated program """
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer
+from Parser import Parser
+from Token import Token, TokenType
+from corpus import generate_program
+
+def lex_all(source: str) -> list[Token]:
+    lexer: Lexer = Lexer(source=source)
+
+    tokens: list[Token] = []
+    while True:
+        tok: Token = lexer.next_token()
+        tokens.append(tok)
+        if tok.type == TokenType.EOF:
+            return tokens
+
+def token_memory(source: str) -> tuple[int, int]:
+    """ Returns (token count, bytes allocated for the tokens and their literals) """
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    tokens: list[Token] = lex_all(source)
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Don't count the list holding the tokens
+    return len(tokens), after - before - sys.getsizeof(tokens)
+
+def parse_time(source: str, repeat: int = 3) -> float:
+    """ Returns the best wall-clock time (seconds) to lex + parse the source """
+    best: float = float("inf")
+    for _ in range(repeat):
+        st: float = time.perf_counter()
+        parser: Parser = Parser(lexer=Lexer(source=source))
+        parser.parse_program()
+        best = min(best, time.perf_counter() - st)
+
+    return best
+
+if __name__ == '__main__':
+    lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source: str = generate_program(lines)
+
+    count, total_bytes = token_memory(source)
+    seconds: float = parse_time(source)
+
+    print(f"Program: {source.count(chr(10))} lines, {count} tokens")
+    print(f"Token memory: {round(total_bytes / count, 2)} bytes/token ({round(total_bytes / 1024 / 1024, 2)} MiB total)")
+    print(f"Lex + parse: {round(seconds * 1000, 3)} ms ({round(source.count(chr(10)) / seconds):,} lines/sec)")
@@ -1,9 +1,22 @@
 from Lexer import Lexer
+from Token import Token
 from Parser import Parser
 from Compiler import Compiler
+from Optimizer import Optimizer
+from Emitter import Emitter, EMIT_KINDS, LIME_ENTRY_SYMBOL
+from JITCache import JITCache, DEFAULT_CACHE_DIR, hash_bytes
+from ASTCache import ASTCache
+from PalletLoader import PalletLoader
+from ParallelCodegen import ParallelCodegen
+from IncrementalBuilder import IncrementalBuilder, DEFAULT_BUILD_DIR
+from Profiler import Profiler, PROFILE_FORMATS
+from Instrumentation import PROFILE_EXTENSION, profile_path, load_profile
 from AST import Program
 import json
-import time
+import multiprocessing
+import os
+import sys
+from typing import Iterable, Iterator, TextIO
 from argparse import ArgumentParser, Namespace, ArgumentError
 
 from llvmlite import ir
@@ -17,12 +30,71 @@ def parse_arguments() -> Namespace:
         description="LimeLang v0.0.3-alpha"
     )
     # Required Arguments
-    arg_parser.add_argument("file_path", type=str, help="Path to your entry point lime file (ex. `main.lime`)")
+    arg_parser.add_argument("file_path", type=str, help="Path to your entry point lime file (ex. `main.lime`), or `-` to read the program from stdin")
     arg_parser.add_argument("--debug", action="store_true", help="Prints internal debug information")
+    arg_parser.add_argument("-O", "--opt-level", type=int, choices=[0, 1, 2, 3], default=0, help="LLVM optimization level to run before JIT compiling (default: 0)")
+    arg_parser.add_argument("--no-fold", action="store_true", help="Disables AST constant folding and simplification before codegen")
+    arg_parser.add_argument("--no-fn-attrs", action="store_true", help="Keeps every function external with the C calling convention and no inferred attributes (for A/B benchmarking)")
+    arg_parser.add_argument("--no-bounds-checks", action="store_true", help="Leaves out every array bounds check (out of bounds indexes are undefined behavior instead of a trap)")
+    arg_parser.add_argument("--emit", type=str, choices=EMIT_KINDS, default=None, help="Compile ahead-of-time to an object file, assembly or a native executable instead of running")
+    arg_parser.add_argument("-o", "--output", type=str, default=None, help="Output path for `--emit` (defaults to the entry file name)")
+    arg_parser.add_argument("--incremental", action="store_true", help="Compile each pallet into its own module and only recompile changed pallets and their dependents")
+    arg_parser.add_argument("--build-dir", type=str, default=DEFAULT_BUILD_DIR, help=f"Directory for incremental build state (default: {DEFAULT_BUILD_DIR})")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Always recompile instead of reusing cached JIT machine code")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of worker processes used to parse imported pallets (default: 1, parses in-process)")
+    arg_parser.add_argument("--codegen-jobs", type=int, default=1, help="Number of worker processes that each compile a partition of the functions to object code (default: 1, compiles one module in-process)")
+    arg_parser.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help=f"Directory for cached JIT machine code (default: {DEFAULT_CACHE_DIR})")
+    arg_parser.add_argument("--instrument", action="store_true", help=f"Counts every function call, loop iteration and branch while the program runs, prints the hottest ones when `main` returns and saves them for `--pgo` next to the entry file (`{PROFILE_EXTENSION}`)")
+    arg_parser.add_argument("--pgo", type=str, nargs="?", const="", default=None, help=f"Profile guided optimization with the counts of an `--instrument` run (default: the entry file's `{PROFILE_EXTENSION}`)")
+    arg_parser.add_argument("--profile", action="store_true", help="Prints the time of every phase (LLVM setup, IR parse/verify, JIT finalize, ...) plus the compile time of each function and pallet")
+    arg_parser.add_argument("--profile-output", type=str, default=None, help="Writes the profile to this path (implies `--profile`)")
+    arg_parser.add_argument("--profile-format", type=str, choices=PROFILE_FORMATS, default="json", help="Format of `--profile-output`, `chrome` writes a trace for chrome://tracing or Perfetto (default: json)")
 
     return arg_parser.parse_args()
 
 
+def debug_token_stream(tokens: Iterable[Token]) -> Iterator[Token]:
+    """ Prints every token while passing it through to the parser """
+    for tok in tokens:
+        print(tok)
+        yield tok
+
+
+def print_timings(timings: dict[str, float]) -> None:
+    for phase, ms in timings.items():
+        print(f"=== {phase} in: {round(ms, 6)} ms. ===")
+
+
+def initialize_llvm(profiler: Profiler) -> None:
+    with profiler.span("Initialized LLVM"):
+        llvm.initialize()
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+
+
+def run_entry(engine: llvm.ExecutionEngine, profiler: Profiler) -> tuple[int, float]:
+    """ Runs the `main` function of a finalized engine and returns (result, execution time in ms) """
+    # Run the function with the name 'main'. This is the entry point function of the entire program
+    entry = engine.get_function_address('main')
+    cfunc = CFUNCTYPE(c_int)(entry)
+
+    with profiler.span("Executed") as span:
+        result = cfunc()
+
+    return result, span.ms
+
+
+def finish_profile(profiler: Profiler, args: Namespace) -> None:
+    """ Prints the `--profile` report and writes `--profile-output` """
+    if not args.profile and args.profile_output is None:
+        return
+
+    profiler.report()
+    if args.profile_output is not None:
+        profiler.write(args.profile_output, kind=args.profile_format)
+        print(f"Wrote {args.profile_format} profile to {args.profile_output}")
+
+
 LEXER_DEBUG: bool = False
 PARSER_DEBUG: bool = False
 COMPILER_DEBUG: bool = False
@@ -31,85 +103,304 @@ RUN_CODE: bool = True
 PROD_DEBUG: bool = False
 
 if __name__ == '__main__':
+    # Needed for the pallet parsing process pool inside the pyinstaller exe
+    multiprocessing.freeze_support()
+
     args = parse_arguments()
 
     if args.debug:
         PROD_DEBUG = True
 
-    # Read from input file
-    with open(args.file_path, "r") as f:
-        code: str = f.read()
-
-    if LEXER_DEBUG:
-        print("===== LEXER DEBUG =====")
-        debug_lex: Lexer = Lexer(source=code)
-        while debug_lex.current_char is not None:
-            print(debug_lex.next_token())
-
-    l: Lexer = Lexer(source=code)
-    p: Parser = Parser(lexer=l)
-
-    parse_st: float = time.time()
-    program: Program = p.parse_program()
-    parse_et: float = time.time()
-    if len(p.errors) > 0:
-        for err in p.errors:
-            print(err)
+    # Every phase is timed, `--profile` also breaks codegen down per function and pallet and prints the report
+    profiler: Profiler = Profiler()
+    profiling: bool = args.profile or args.profile_output is not None
+
+    # Read from input file, `-` streams the program from stdin instead
+    read_stdin: bool = args.file_path == "-"
+    if read_stdin:
+        code: TextIO = sys.stdin
+    else:
+        with profiler.span("Read source"):
+            with open(args.file_path, "r") as f:
+                code: str = f.read()
+
+    if args.codegen_jobs > 1 and args.emit in ("obj", "asm"):
+        print("`--codegen-jobs` produces one object per partition, it can only JIT or `--emit exe`")
         exit(1)
 
-    if PARSER_DEBUG:
-        print("===== PARSER DEBUG =====")
-        with open("debug/ast.json", "w") as f:
-            json.dump(program.json(), f, indent=4)
-        print("Wrote AST to debug/ast.json successfully")
-
-    c: Compiler = Compiler()
-    compiler_st: float = time.time()
-    c.compile(node=program)
-    compiler_et: float = time.time()
-
-    # Output steps
-    module: ir.Module = c.module
-    module.triple = llvm.get_default_triple()
-
-    if COMPILER_DEBUG:
-        with open("debug/ir.ll", "w") as f:
-            f.write(str(module))
-
-    if len(c.errors) > 0:
-        print(f"==== COMPILER ERRORS ====")
-        for err in c.errors:
-            print(err)
+    if args.instrument and (args.emit is not None or args.incremental or args.codegen_jobs > 1):
+        print("`--instrument` reads its counters out of the JIT once `main` returns, it can't be combined with `--emit`, `--incremental` or `--codegen-jobs`")
         exit(1)
 
-    if RUN_CODE:
-        llvm.initialize()
-        llvm.initialize_native_target()
-        llvm.initialize_native_asmprinter()
+    # Counts of an earlier `--instrument` run, they weigh branches and mark functions hot / cold
+    profile: dict | None = None
+    if args.pgo is not None:
+        if args.incremental or args.codegen_jobs > 1:
+            print("`--pgo` compiles one module, it can't be combined with `--incremental` or `--codegen-jobs`")
+            exit(1)
+        if read_stdin and args.pgo == "":
+            print("`--pgo` needs the path of the profile when the program is read from stdin")
+            exit(1)
 
-        try:
-            llvm_ir_parsed = llvm.parse_assembly(str(module))
-            llvm_ir_parsed.verify()
-        except Exception as e:
-            print(e)
-            raise
+        pgo_path: str = args.pgo or profile_path(args.file_path)
+        profile = load_profile(pgo_path)
+        if profile is None:
+            print(f"`{pgo_path}` isn't a profile, record one with `--instrument` first")
+            exit(1)
+        if not read_stdin and profile["source_hash"] != hash_bytes(code.encode("utf8")):
+            print(f"[Lime Warning]: `{pgo_path}` was recorded for a different version of `{args.file_path}`, branches and functions that moved keep no weights\n")
 
-        target_machine = llvm.Target.from_default_triple().create_target_machine()
+    # The JIT cache only applies when we are running the code (not emitting, instrumenting or dumping debug output)
+    cache: JITCache | None = None
+    cache_key: str | None = None
+    # Flags that change the generated code, part of the cache key
+    cache_flags: list[str] = [flag for flag, enabled in (("no-fold", args.no_fold), ("no-fn-attrs", args.no_fn_attrs), ("no-bounds-checks", args.no_bounds_checks)) if enabled]
+    if profile is not None:
+        # A new recording of the profile changes the generated code too
+        cache_flags.append(f"pgo-{hash_bytes(json.dumps(profile['sites'], sort_keys=True).encode('utf8'))}")
+    if RUN_CODE and args.emit is None and args.codegen_jobs <= 1 and not args.instrument and not args.no_cache and not read_stdin and not (LEXER_DEBUG or PARSER_DEBUG or COMPILER_DEBUG):
+        with profiler.span("Looked up JIT cache"):
+            cache = JITCache(cache_dir=args.cache_dir)
+            cache_key = cache.lookup_key(args.file_path, code, args.opt_level, llvm.get_default_triple(), cache_flags)
+            cache_hit: bool = cache_key is not None and cache.load(cache_key) is not None
 
-        engine = llvm.create_mcjit_compiler(llvm_ir_parsed, target_machine)
-        engine.finalize_object()
+        if cache_hit:
+            # Warm run, skip lexing, parsing and codegen entirely and let MCJIT load the cached object
+            initialize_llvm(profiler)
 
-        # Run the function with the name 'main'. This is the entry point function of the entire program
-        entry = engine.get_function_address('main')
-        cfunc = CFUNCTYPE(c_int)(entry)
+            with profiler.span("Loaded from cache") as load_span:
+                with profiler.span("Created target machine"):
+                    target_machine = llvm.Target.from_default_triple().create_target_machine(opt=args.opt_level)
 
-        st = time.time()
+                empty_module = llvm.parse_assembly("")
+                empty_module.triple = llvm.get_default_triple()
 
-        result = cfunc()
+                engine = llvm.create_mcjit_compiler(empty_module, target_machine)
+                cache.attach(engine, cache_key)
+                with profiler.span("Finalized object"):
+                    engine.finalize_object()
+
+            result, execute_ms = run_entry(engine, profiler)
+
+            if PROD_DEBUG:
+                print(f"\n\n=== Loaded from cache in: {round(load_span.ms, 6)} ms. ===")
+            print(f'=== Executed in {round(execute_ms, 6)} ms. ===\n\nProgram returned: {result}')
+            finish_profile(profiler, args)
+            exit(0)
+
+    ast_cache: ASTCache | None = ASTCache(cache_dir=os.path.join(args.cache_dir, "ast")) if not args.no_cache else None
+
+    # Phase name -> time in ms, printed with --debug
+    timings: dict[str, float] = {}
+
+    # Object code per partition when compiling with `--codegen-jobs`, otherwise everything lives in `llvm_ir_parsed`
+    objects: list[bytes] | None = None
+
+    if args.incremental:
+        if read_stdin:
+            print("`--incremental` needs an entry file, it can't build a program read from stdin")
+            exit(1)
+
+        initialize_llvm(profiler)
+
+        # Each pallet gets its own module, only changed pallets (and their dependents) are recompiled
+        builder: IncrementalBuilder = IncrementalBuilder(build_dir=args.build_dir, ast_cache=ast_cache, fold_constants=not args.no_fold, fn_attrs=not args.no_fn_attrs, bounds_checks=not args.no_bounds_checks)
+        with profiler.span("Built") as build_span:
+            llvm_ir_parsed = builder.build(args.file_path)
+            build_span.args.update(rebuilt=builder.rebuilt, reused=builder.reused)
+        if len(builder.errors) > 0:
+            print(f"==== BUILD ERRORS ====")
+            for err in builder.errors:
+                print(err)
+            exit(1)
+
+        timings[f"Built ({len(builder.rebuilt)} rebuilt, {len(builder.reused)} reused)"] = build_span.ms
 
-        et = time.time()
+        pallet_paths: list[str] = builder.order[:-1]
+    else:
+        l: Lexer = Lexer(source=code)
+        tokens: Iterable[Token] = l
+
+        if LEXER_DEBUG:
+            # Dump the tokens as the parser pulls them from the one and only token stream
+            print("===== LEXER DEBUG =====")
+            tokens = debug_token_stream(l)
+
+        p: Parser = Parser(lexer=tokens)
+
+        # The lexer is streamed, this includes lexing
+        with profiler.span("Parsed") as parse_span:
+            program: Program = p.parse_program()
+        if len(p.errors) > 0:
+            for err in p.errors:
+                print(err)
+            exit(1)
+
+        if PARSER_DEBUG:
+            print("===== PARSER DEBUG =====")
+            with open("debug/ast.json", "w") as f:
+                json.dump(program.json(), f, indent=4)
+            print("Wrote AST to debug/ast.json successfully")
+
+        # Parse every imported pallet up front (in parallel with --jobs) so the Compiler only does codegen
+        pallet_loader: PalletLoader = PalletLoader(workers=args.jobs, ast_cache=ast_cache)
+        with profiler.span("Parsed pallets") as pallets_span:
+            pallets: dict[str, Program] = pallet_loader.load(program)
+        if len(pallet_loader.errors) > 0:
+            for file_path, errors in pallet_loader.errors.items():
+                print(f"Error with imported pallet: {file_path}")
+                for err in errors:
+                    print(err)
+            exit(1)
+
+        timings["Parsed"] = parse_span.ms
+        timings[f"Parsed {len(pallets)} pallet(s)"] = pallets_span.ms
+
+        if args.codegen_jobs > 1:
+            initialize_llvm(profiler)
+
+            # Compile (and optimize) partitions of the functions to object code in parallel, the objects are linked below
+            codegen: ParallelCodegen = ParallelCodegen(
+                workers=args.codegen_jobs,
+                opt_level=args.opt_level,
+                reloc="pic" if args.emit is not None else "default",
+                entry_symbol=LIME_ENTRY_SYMBOL if args.emit == "exe" else None,
+                fold_constants=not args.no_fold,
+                fn_attrs=not args.no_fn_attrs,
+                bounds_checks=not args.no_bounds_checks
+            )
+            with profiler.span("Compiled partitions") as codegen_span:
+                objects = codegen.compile(program, pallets)
+                codegen_span.args.update(partition_ms=codegen.partition_times)
+            if objects is None:
+                print(f"==== COMPILER ERRORS ====")
+                for err in codegen.errors:
+                    print(err)
+                exit(1)
+
+            timings[f"Compiled {len(objects)} partition(s)"] = codegen_span.ms
+            for i, ms in enumerate(codegen.partition_times):
+                timings[f"  Partition {i} compiled"] = ms
+
+            pallet_paths: list[str] = list(pallets.keys())
+        else:
+            c: Compiler = Compiler(ast_cache=ast_cache, pallets=pallets, fold_constants=not args.no_fold, fn_attrs=not args.no_fn_attrs, bounds_checks=not args.no_bounds_checks, profiler=profiler if profiling else None, instrument=args.instrument, profile=profile)
+            with profiler.span("Compiled") as compile_span:
+                c.compile(node=program)
+
+            timings["Compiled"] = compile_span.ms
+
+            if PROD_DEBUG and c.folder is not None:
+                print(f"=== Constant folding removed {c.folder.removed} node(s) ({c.folder.folded} expression(s) folded, {c.folder.pruned} if(s) pruned) ===")
+            if PROD_DEBUG and c.function_attributes is not None:
+                inferred: str = ", ".join(f"{attribute} on {count}" for attribute, count in c.function_attributes.inferred.items())
+                print(f"=== Inferred function attributes: {inferred} function(s) ===")
+            if PROD_DEBUG and c.bounds_check_stats['emitted'] + c.bounds_check_stats['elided'] > 0:
+                print(f"=== Bounds checks: {c.bounds_check_stats['emitted']} emitted, {c.bounds_check_stats['elided']} elided ===")
+            if PROD_DEBUG and profile is not None:
+                print(f"=== PGO: {c.pgo_stats['weighted']} branch(es) weighted, {c.pgo_stats['hot']} hot and {c.pgo_stats['cold']} cold function(s) ===")
+
+            # Output steps
+            module: ir.Module = c.module
+            module.triple = llvm.get_default_triple()
+
+            if COMPILER_DEBUG:
+                with open("debug/ir.ll", "w") as f:
+                    f.write(str(module))
+
+            if len(c.errors) > 0:
+                print(f"==== COMPILER ERRORS ====")
+                for err in c.errors:
+                    print(err)
+                exit(1)
+
+            pallet_paths: list[str] = list(c.global_parsed_pallets.keys())
+
+            if RUN_CODE or args.emit is not None:
+                initialize_llvm(profiler)
+
+                try:
+                    with profiler.span("Printed IR"):
+                        llvm_ir = str(module)
+                    with profiler.span("Parsed LLVM IR"):
+                        llvm_ir_parsed = llvm.parse_assembly(llvm_ir)
+                    with profiler.span("Verified"):
+                        llvm_ir_parsed.verify()
+                except Exception as e:
+                    print(e)
+                    raise
+
+    if RUN_CODE or args.emit is not None:
+        # Emitted objects get linked into (PIE) executables, so they need position independent code
+        with profiler.span("Created target machine"):
+            target_machine = llvm.Target.from_default_triple().create_target_machine(
+                opt=args.opt_level,
+                reloc="pic" if args.emit is not None else "default"
+            )
+
+        if objects is None:
+            llvm_ir_parsed.data_layout = str(target_machine.target_data)
+
+            optimizer: Optimizer = Optimizer(target_machine=target_machine, opt_level=args.opt_level)
+            with profiler.span(f"Optimized (-O{args.opt_level})") as optimize_span:
+                optimizer.optimize(llvm_ir_parsed)
+            timings[f"Optimized (-O{args.opt_level})"] = optimize_span.ms
+
+    if args.emit is not None:
+        emitter: Emitter = Emitter(target_machine=target_machine)
+        output_path: str = args.output if args.output is not None else Emitter.default_output_path(args.file_path, args.emit)
+
+        with profiler.span("Emitted") as emit_span:
+            if objects is not None:
+                emitter.link_objects(objects, output_path)
+            else:
+                emitter.emit(llvm_ir_parsed, kind=args.emit, output_path=output_path)
+
+        timings["Emitted"] = emit_span.ms
 
         if PROD_DEBUG:
-            print(f"\n\n=== Parsed in: {round((parse_et - parse_st) * 1000, 6)} ms. ===")
-            print(f"=== Compiled in: {round((compiler_et - compiler_st) * 1000, 6)} ms. ===")
-        print(f'=== Executed in {round((et - st) * 1000, 6)} ms. ===\n\nProgram returned: {result}')
+            print_timings(timings)
+        print(f"Wrote {args.emit} to {output_path}")
+        finish_profile(profiler, args)
+        exit(0)
+
+    if RUN_CODE:
+        if objects is not None:
+            # MCJIT resolves the calls between the partition objects when it loads them
+            empty_module = llvm.parse_assembly("")
+            empty_module.triple = llvm.get_default_triple()
+
+            with profiler.span("Created JIT engine"):
+                engine = llvm.create_mcjit_compiler(empty_module, target_machine)
+                for data in objects:
+                    engine.add_object_file(llvm.ObjectFileRef.from_data(data))
+        else:
+            with profiler.span("Created JIT engine"):
+                engine = llvm.create_mcjit_compiler(llvm_ir_parsed, target_machine)
+
+        if cache is not None:
+            # Record every imported pallet so the next run can compute this key without parsing
+            cache.record_dependencies(args.file_path, pallet_paths)
+
+            cache_key = cache.compute_key(code, pallet_paths, args.opt_level, llvm.get_default_triple(), cache_flags)
+            if cache_key is not None:
+                cache.attach(engine, cache_key)
+
+        with profiler.span("Finalized object") as finalize_span:
+            engine.finalize_object()
+        timings["Finalized object"] = finalize_span.ms
+
+        result, execute_ms = run_entry(engine, profiler)
+
+        if PROD_DEBUG:
+            print("\n")
+            print_timings(timings)
+        print(f'=== Executed in {round(execute_ms, 6)} ms. ===\n\nProgram returned: {result}')
+        if args.instrument:
+            counts: dict[str, dict[str, int]] = c.instrumentation.read(engine)
+            c.instrumentation.report(counts)
+
+            if not read_stdin:
+                c.instrumentation.write_profile(profile_path(args.file_path), counts, code)
+                print(f"\nWrote profile to {profile_path(args.file_path)}, compile with `--pgo` to use it")
+        finish_profile(profiler, args)
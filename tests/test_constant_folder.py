@@ -0,0 +1,71 @@
+""" Identities only disappear where the folder can tell the other operand is a scalar number """
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AST import Program, InfixExpression, IdentifierLiteral, IntegerLiteral
+from Lexer import Lexer
+from Parser import Parser
+from ConstantFolder import ConstantFolder
+
+SOURCE: str = """fn scale(x: int, v: vec4<float>, s: str) -> int {
+    let y: f64 = f64(x) / 1 - 0;
+    let w: vec4<float> = v * 1;
+    let t: str = s * 1;
+    return 2 * 3 + x * 1;
+}
+"""
+
+def fold(source: str) -> tuple[Program, ConstantFolder]:
+    program: Program = Parser(lexer=Lexer(source=source)).parse_program()
+    folder: ConstantFolder = ConstantFolder(load_pallet=lambda file_path: None)
+    folder.fold(program)
+    return program, folder
+
+def test_identities_of_scalar_variables() -> None:
+    program, folder = fold(SOURCE)
+    lets, ret = program.statements[0].body.statements[:3], program.statements[0].body.statements[3]
+
+    # `2 * 3 + x * 1` -> `6 + x`
+    value = ret.return_value
+    assert isinstance(value, InfixExpression) and value.operator == '+'
+    assert isinstance(value.left_node, IntegerLiteral) and value.left_node.value == 6
+    assert isinstance(value.right_node, IdentifierLiteral) and value.right_node.value == 'x'
+
+    # `f64(x) / 1 - 0` -> `f64(x)`
+    assert not isinstance(lets[0].value, InfixExpression)
+
+    # Vectors and strings are left for the Compiler to type check
+    assert isinstance(lets[1].value, InfixExpression)
+    assert isinstance(lets[2].value, InfixExpression)
+
+    assert folder.folded == 4
+
+def test_redeclared_and_shadowed_names() -> None:
+    program, _ = fold("""let n: vec4<int> = 1;
+fn f(n: int) -> int {
+    return n - 0;
+}
+fn g() -> vec4<int> {
+    return n - 0;
+}
+""")
+    assert isinstance(program.statements[1].body.statements[0].return_value, IdentifierLiteral)
+    assert isinstance(program.statements[2].body.statements[0].return_value, InfixExpression)
+
+def test_for_loop_assignment_action() -> None:
+    program, _ = fold("""fn main() -> int {
+    for (let i: int = 0; i < 100; i += 2 * 4) {
+    }
+    return 0;
+}
+""")
+    action = program.statements[0].body.statements[0].action
+    assert isinstance(action.right_value, IntegerLiteral) and action.right_value.value == 8
+
+if __name__ == '__main__':
+    test_identities_of_scalar_variables()
+    test_redeclared_and_shadowed_names()
+    test_for_loop_assignment_action()
+    print("Identities fold exactly where the operand is a scalar number")
@@ -0,0 +1,39 @@
+""" The table scanner has to produce the same tokens whether it gets the whole source or a stream cut into chunks """
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Lexer as lexer_module
+from Lexer import Lexer
+
+# Suffixed literals of every length, so some chunk boundary lands inside each of them (`2.5f` | `64`)
+SOURCE: str = """fn main() -> int {
+    let a: f64 = 2.5f64;
+    let b: i8 = 12i8;
+    let c: u64 = 7u64 + 300u32;
+    let d: i16 = 3i16 * 2;
+    let y: int = 3 + 7;
+    let z: float = 1.25 * 4.;
+    return y;
+}
+"""
+
+def tokens(source) -> list[tuple]:
+    return [(t.type, t.literal, t.line_no, t.position) for t in Lexer(source=source)]
+
+def test_chunked_stream_matches_whole_source() -> None:
+    expected: list[tuple] = tokens(SOURCE)
+
+    chunk_size: int = lexer_module.CHUNK_SIZE
+    try:
+        for size in range(1, 17):
+            lexer_module.CHUNK_SIZE = size
+            assert tokens(io.StringIO(SOURCE)) == expected, f"CHUNK_SIZE = {size}"
+    finally:
+        lexer_module.CHUNK_SIZE = chunk_size
+
+if __name__ == '__main__':
+    test_chunked_stream_matches_whole_source()
+    print("Chunked streams lex the same as the whole source")